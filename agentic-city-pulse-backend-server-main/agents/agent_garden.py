@@ -1,12 +1,10 @@
 import base64
 import os
+import asyncio
 import logging
+import threading
 from datetime import datetime
-import google.generativeai as genai
 import json
-import speech_recognition as sr 
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,6 +12,12 @@ load_dotenv('.env')
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro-vision")
+# Optional overrides pointing the model and speech clients at other servers (e.g. the offline benchmark fakes)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")
+SPEECH_API_ENDPOINT = os.getenv("SPEECH_API_ENDPOINT")
+
+# Categories the civic prompts ask the model to use
+CIVIC_CATEGORIES = ['TRAFFIC_CONGESTION', 'DRAINAGE_ISSUE', 'FLOOD', 'WATER_LOGGING', 'ROAD_BLOCK', 'TREE_IN_BETWEEN', 'ELECTRICITY_ISSUE']
 
 CIVIC_IMAGE_PROMPT = """
 You are an AI assistant specializing in civic issue analyzing. For the given image and associated metadata, determine the situation.
@@ -61,9 +65,6 @@ Text:
 {text_data}
 """
 
-# Configure Gemini
-genai.configure(api_key=API_KEY)
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -82,11 +83,64 @@ def log_warning(message):
     print(f"[{timestamp}] [WARNING] {message}")
     logger.warning(message)
 
+_genai = None
+_genai_lock = threading.Lock()
+
+def get_genai():
+    """Import and configure google.generativeai on first use"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                if GEMINI_API_ENDPOINT:
+                    genai.configure(api_key=API_KEY, transport="rest",
+                                    client_options={"api_endpoint": GEMINI_API_ENDPOINT})
+                else:
+                    genai.configure(api_key=API_KEY)
+                _genai = genai
+    return _genai
+
+def preload_image_path():
+    """Import the dependencies of the image analysis path"""
+    get_genai()
+
+def preload_audio_path():
+    """Import the dependencies of the audio analysis path"""
+    get_genai()
+    import speech_recognition  # noqa: F401
+    import pydub.silence  # noqa: F401
+
+def parse_civic_result(result) -> list:
+    """
+    Parse a civic analysis answer (JSON, possibly wrapped in a ```json fence)
+    into a list of event dicts. Returns an empty list if it isn't valid JSON.
+    """
+    if isinstance(result, (list, dict)):
+        data = result
+    else:
+        text = str(result or "").strip()
+        if text.startswith("```"):
+            text = text.strip("`").strip()
+            if text.lower().startswith("json"):
+                text = text[4:]
+        starts = [i for i in (text.find("["), text.find("{")) if i >= 0]
+        if not starts:
+            return []
+        try:
+            data, _ = json.JSONDecoder().raw_decode(text[min(starts):])
+        except ValueError:
+            return []
+    if isinstance(data, dict):
+        data = [data]
+    return [item for item in data if isinstance(item, dict)]
+
 class CivicIssueReporting:
-    def __init__(self, file_path, mime_type, file_metadata):
+    def __init__(self, file_path, mime_type, file_metadata, text=None):
         self.file = file_path
         self.mime_type = mime_type
         self.file_metadata = file_metadata
+        self.text = text
 
     async def analyze_input(self, analysis_type, metadata):
         """Analyze input based on MIME type and analysis type"""
@@ -96,6 +150,8 @@ class CivicIssueReporting:
                 result = await self.process_image()
             elif analysis_type == 'SPEECH':
                 result = await self.process_audio()
+            elif analysis_type == 'TEXT':
+                result = await self.process_text()
             else:
                 raise ValueError(f"Unsupported analysis type: {analysis_type}")
             return result
@@ -107,10 +163,10 @@ class CivicIssueReporting:
         """Process image file - convert to base64 and analyze with Gemini"""
         try:
             image_parts = self.image_file_to_base64(self.file)
-            model = genai.GenerativeModel(GEMINI_MODEL)
+            model = get_genai().GenerativeModel(GEMINI_MODEL)
 
             prompt = CIVIC_IMAGE_PROMPT.replace("{metadata}", json.dumps(self.file_metadata))
-            response = model.generate_content([
+            response = await asyncio.to_thread(model.generate_content, [
                 prompt,
                 {"mime_type": "image/jpeg", "data" : image_parts[0]}
             ])
@@ -125,22 +181,41 @@ class CivicIssueReporting:
     async def process_audio(self):
         """Convert speech to text and analyze using Gemini"""
         try:
-            transcription = self.get_text()
-            model = genai.GenerativeModel("gemini-pro")
-            prompt = CIVIC_TEXT_PROMPT_TEMPLATE.replace("{metadata}", json.dumps(self.file_metadata)).replace("{text_data}", transcription)
-            response = model.generate_content(
-                prompt
-            )
-            json_text = response.text.strip().lstrip("```json").rstrip("```")
-            print(f"respose: {json_text}")
-            return response.text
-
+            transcription = await asyncio.to_thread(self.get_text)
+            return await asyncio.to_thread(self.analyze_text, transcription)
         except Exception as e:
             log_error(f"Audio processing failed: {str(e)}")
             raise
 
+    async def process_text(self):
+        """Analyze a typed complaint (or an uploaded text file) using Gemini"""
+        try:
+            text = self.text
+            if text is None and self.file:
+                with open(self.file, encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            if not text or not text.strip():
+                raise ValueError("No text to analyze")
+            return await asyncio.to_thread(self.analyze_text, text)
+        except Exception as e:
+            log_error(f"Text processing failed: {str(e)}")
+            raise
+
+    def analyze_text(self, text):
+        """Run the civic text prompt over a complaint or transcript (blocking; call it off the event loop)"""
+        model = get_genai().GenerativeModel("gemini-pro")
+        prompt = CIVIC_TEXT_PROMPT_TEMPLATE.replace("{metadata}", json.dumps(self.file_metadata)).replace("{text_data}", text)
+        response = model.generate_content(
+            prompt
+        )
+        return response.text
+
     def get_text(self):
         """Convert audio file to text using speech recognition"""
+        import speech_recognition as sr
+        from pydub import AudioSegment
+        from pydub.silence import split_on_silence
+
         r = sr.Recognizer()
         try:
             sound = AudioSegment.from_file(self.file)
@@ -162,7 +237,10 @@ class CivicIssueReporting:
                     with sr.AudioFile(chunk_filename) as source:
                         r.adjust_for_ambient_noise(source)
                         audio = r.record(source)
-                        text = r.recognize_google(audio)
+                        if SPEECH_API_ENDPOINT:
+                            text = r.recognize_google(audio, endpoint=SPEECH_API_ENDPOINT)
+                        else:
+                            text = r.recognize_google(audio)
                 except sr.UnknownValueError:
                     log_warning(f"Could not recognize speech in chunk {i}")
                     continue
@@ -0,0 +1,169 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+ALL = "*"
+
+# Window name -> (bucket width in seconds, number of buckets)
+WINDOWS = {
+    "5m": (10, 30),
+    "1h": (60, 60),
+    "24h": (900, 96),
+}
+
+class RollingWindow:
+    """
+    Event count over a sliding window, kept in a ring buffer of fixed-width
+    buckets with a running total. Adding and reading are O(1) (advancing
+    clears at most one bucket per elapsed bucket width, never more than the
+    ring size).
+    """
+
+    __slots__ = ("width", "counts", "head", "total")
+
+    def __init__(self, width: int, buckets: int):
+        self.width = width
+        self.counts = [0] * buckets
+        self.head = None
+        self.total = 0
+
+    def _advance(self, bucket: int):
+        if self.head is None or bucket - self.head >= len(self.counts):
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+        else:
+            for b in range(self.head + 1, bucket + 1):
+                i = b % len(self.counts)
+                self.total -= self.counts[i]
+                self.counts[i] = 0
+        self.head = bucket
+
+    def add(self, ts: float, n: int = 1):
+        bucket = int(ts // self.width)
+        if self.head is None or bucket > self.head:
+            self._advance(bucket)
+        elif bucket <= self.head - len(self.counts):
+            # Older than the window
+            return
+        self.counts[bucket % len(self.counts)] += n
+        self.total += n
+
+    def count(self, now: float) -> int:
+        bucket = int(now // self.width)
+        if self.head is not None and bucket > self.head:
+            self._advance(bucket)
+        return self.total
+
+    @property
+    def seconds(self) -> int:
+        return self.width * len(self.counts)
+
+def _area_key(item: Dict[str, Any]) -> Optional[str]:
+    """Normalized area name: ``areaName``, else the first part of ``area``"""
+    area = item.get("areaName") or (str(item.get("area") or "").split(",")[0])
+    area = " ".join(str(area).lower().split())
+    return area or None
+
+class AggregateIndex:
+    """
+    Rolling report counts per category x area over 5 minute, 1 hour and
+    24 hour windows, updated on every ingested event.
+
+    Each event updates its (category, area) cell plus the rollups (category,
+    all areas), (all categories, area) and (all, all), so any of those
+    combinations is answered from one dictionary lookup. Windows slide in
+    bucket steps: 10 s for 5m, 1 min for 1h and 15 min for 24h.
+    """
+
+    def __init__(self, windows: Dict[str, Tuple[int, int]] = None, max_seen: int = 200000):
+        self.windows = dict(windows or WINDOWS)
+        self._cells: Dict[Tuple[str, str], Dict[str, RollingWindow]] = {}
+        self._seen = OrderedDict()
+        self.max_seen = max_seen
+        self._lock = threading.Lock()
+        self.events = 0
+
+    def _cell(self, key: Tuple[str, str]) -> Dict[str, RollingWindow]:
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = {name: RollingWindow(*spec) for name, spec in self.windows.items()}
+        return cell
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """Count one item with ``category`` and ``created_utc`` (and optionally an area); ids are counted once"""
+        category = item.get("category")
+        if not category:
+            return False
+        category = str(category).upper()
+        area = _area_key(item)
+        ts = item.get("created_utc") or time.time()
+        keys = [(category, ALL), (ALL, ALL)]
+        if area:
+            keys += [(category, area), (ALL, area)]
+        with self._lock:
+            event_id = item.get("id")
+            if event_id is not None:
+                if event_id in self._seen:
+                    return False
+                self._seen[event_id] = None
+                if len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+            for key in keys:
+                for window in self._cell(key).values():
+                    window.add(ts)
+            self.events += 1
+        return True
+
+    def ingest(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Count many items; returns how many were new and had a category"""
+        return sum(1 for item in items if self.add(item))
+
+    @staticmethod
+    def _summary(window: RollingWindow, now: float) -> Dict[str, Any]:
+        count = window.count(now)
+        return {"count": count, "per_hour": round(count * 3600 / window.seconds, 2)}
+
+    def query(self, category: str = None, area: str = None, now: float = None) -> Dict[str, Any]:
+        """Counts and hourly rates in every window for one category/area (``None`` means all)"""
+        now = now or time.time()
+        key = (category.upper() if category else ALL, " ".join(area.lower().split()) if area else ALL)
+        with self._lock:
+            cell = self._cells.get(key)
+            windows = {
+                name: self._summary(cell[name], now) if cell else {"count": 0, "per_hour": 0.0}
+                for name in self.windows
+            }
+        return {"category": key[0], "area": key[1], "windows": windows, "as_of": now}
+
+    def breakdown(self, window: str = "1h", by: str = "area", category: str = None, area: str = None,
+                  limit: int = 20, now: float = None) -> List[Dict[str, Any]]:
+        """
+        Busiest areas (``by="area"``, optionally within one category) or
+        categories (``by="category"``, optionally within one area) in a window
+        """
+        if window not in self.windows:
+            raise ValueError(f"Unknown window {window!r}; expected one of {list(self.windows)}")
+        now = now or time.time()
+        fixed = (category.upper() if category else ALL) if by == "area" else \
+            (" ".join(area.lower().split()) if area else ALL)
+        rows = []
+        with self._lock:
+            for (cat, place), cell in self._cells.items():
+                key, other = (place, cat) if by == "area" else (cat, place)
+                if key == ALL or other != fixed:
+                    continue
+                summary = self._summary(cell[window], now)
+                if summary["count"]:
+                    rows.append({by: key, **summary})
+        rows.sort(key=lambda row: row["count"], reverse=True)
+        return rows[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"events": self.events, "cells": len(self._cells), "windows": list(self.windows)}
+
+_index = AggregateIndex()
+
+def get_aggregate_index() -> AggregateIndex:
+    """Process-wide rolling aggregates"""
+    return _index
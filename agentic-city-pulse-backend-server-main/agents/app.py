@@ -4,17 +4,14 @@ import mimetypes
 import logging
 from datetime import datetime
 from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn
-from agent_garden import CivicIssueReporting
-import magic
-from datetime import datetime
+from agent_garden import CivicIssueReporting, preload_image_path, preload_audio_path
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
-from fractions import Fraction
-from get_metadata import extract_image_metadata, extract_audio_metadata, extract_gps_location
+from get_metadata import extract_image_metadata, extract_audio_metadata, extract_gps_location, preload_image_metadata
+from warmup import WarmUp
+from event_store import get_event_store
+from civic_events import record_civic_analysis
 
 # Configure logging
 logging.basicConfig(
@@ -50,13 +47,44 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+def detect_mime_type(file_path, filename):
+    """Detect MIME type with python-magic, falling back to the file extension"""
+    try:
+        import magic
+        return magic.from_file(file_path, mime=True)
+    except Exception:
+        mime_type, _ = mimetypes.guess_type(filename)
+        return mime_type
+
+def _preload_image():
+    import magic  # noqa: F401
+    preload_image_metadata()
+    preload_image_path()
+
+def _preload_audio():
+    import magic  # noqa: F401
+    preload_audio_path()
+
+# Heavy dependencies are imported on first use; warm up the configured paths
+warmup = WarmUp()
+warmup.register("image", _preload_image)
+warmup.register("audio", _preload_audio)
+
 @app.on_event("startup")
 async def startup_event():
     log_warning("API server starting up")
+    warmup.start()
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once the configured paths are warmed up"""
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     log_warning("API server shutting down")
+    get_event_store().flush()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -109,11 +137,7 @@ async def process_file_upload(file: UploadFile, session_id: str):
             f.write(content)
         
         # Get MIME type using python-magic for better accuracy
-        try:
-            mime_type = magic.from_file(temp_file_path, mime=True)
-        except Exception:
-            # Fallback to mimetypes if magic fails
-            mime_type, _ = mimetypes.guess_type(file.filename)
+        mime_type = detect_mime_type(temp_file_path, file.filename)
         
         if not mime_type:
             raise HTTPException(status_code=400, detail="Could not determine file type")
@@ -164,6 +188,7 @@ async def process_file_upload(file: UploadFile, session_id: str):
         logger.info(f"Starting {analysis_type} analysis for session {session_id}")
         result = await civic_agent.analyze_input(analysis_type, combined_metadata)
         logger.info(f"Analysis completed for session {session_id}")
+        record_civic_analysis(session_id, analysis_type, result, combined_metadata)
         
         # Cleanup temporary files
         try:
@@ -201,5 +226,6 @@ async def process_file_upload(file: UploadFile, session_id: str):
 
 
 if __name__ == "__main__":
+    import uvicorn
     log_warning("Starting uvicorn server")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
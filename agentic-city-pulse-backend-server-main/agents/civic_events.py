@@ -0,0 +1,120 @@
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Optional
+
+from event_store import get_event_store
+from event_hub import get_event_hub
+from incidents import get_incident_index, civic_event_items
+from geo_index import get_geo_index
+from aggregates import get_aggregate_index
+from event_table import get_event_table
+
+logger = logging.getLogger(__name__)
+
+# event_ids of analyses recorded by this process, so the store tail doesn't ingest them twice
+_recorded: "OrderedDict[str, None]" = OrderedDict()
+_recorded_lock = threading.Lock()
+_RECORDED_MAX = 10000
+
+def _remember(event_id: str):
+    with _recorded_lock:
+        _recorded[event_id] = None
+        while len(_recorded) > _RECORDED_MAX:
+            _recorded.popitem(last=False)
+
+def _recorded_here(event_id: str) -> bool:
+    with _recorded_lock:
+        return event_id in _recorded
+
+def ingest_civic_items(items: List[Dict[str, Any]]):
+    """Publish civic event items to stream subscribers and add them to the in-memory indexes"""
+    if not items:
+        return
+    get_event_hub().publish("civic_analysis", items)
+    get_incident_index().ingest(items)
+    get_geo_index().ingest(items)
+    get_aggregate_index().ingest(items)
+    get_event_table().extend(items)
+
+def record_civic_analysis(session_id: str, analysis_type: str, result, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Record one civic analysis: append it to the event store, then publish it
+    and update the incident, geo, aggregate and event-table views of this
+    process. Shared by both API servers; other processes using the same
+    store pick it up through ``CivicStoreTail``. Never fails the request.
+    """
+    event_id = f"civic:{session_id}"
+    try:
+        get_event_store().append(
+            "civic_analysis",
+            {
+                "session_id": session_id,
+                "analysis_type": analysis_type,
+                "result": result,
+                "metadata": metadata,
+            },
+            event_id=event_id,
+            source=analysis_type.lower(),
+        )
+        _remember(event_id)
+        items = civic_event_items(session_id, analysis_type, result, metadata, time.time())
+        ingest_civic_items(items)
+        return items
+    except Exception as e:
+        logger.error(f"Failed to record civic analysis: {str(e)}")
+        return []
+
+class CivicStoreTail:
+    """
+    Follows the event store for civic analyses written by other processes
+    (e.g. ``agents/app.py`` next to the hackathon server) and feeds them to
+    this process's stream and indexes. Polls by sequence number every
+    ``interval`` seconds; analyses recorded in this process are skipped.
+    """
+
+    def __init__(self, store=None, interval: float = 2.0):
+        self.store = store or get_event_store()
+        self.interval = interval
+        self.cursor = 0
+        self.ingested = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def poll(self) -> int:
+        """Ingest civic analyses written since the last poll; returns how many items were added"""
+        events = self.store.query(kinds=["civic_analysis"], after_seq=self.cursor)
+        if not events:
+            return 0
+        self.cursor = events[-1]["seq"]
+        items = list(self._items(event for event in events if not _recorded_here(event["event_id"])))
+        ingest_civic_items(items)
+        self.ingested += len(items)
+        return len(items)
+
+    @staticmethod
+    def _items(events: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+        for event in events:
+            payload = event["payload"]
+            yield from civic_event_items(payload.get("session_id"), payload.get("analysis_type") or "unknown",
+                                         payload.get("result"), payload.get("metadata"), event["created_utc"])
+
+    def start(self, after_seq: int):
+        """Start polling from ``after_seq`` (the last event already loaded by a rebuild)"""
+        self.cursor = after_seq
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="civic-store-tail", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Civic store tail failed: {str(e)}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
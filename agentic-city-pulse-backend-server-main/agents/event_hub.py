@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+from typing import Dict, List, Any, Iterable, Optional
+
+def _normalize(values: Optional[Iterable[str]]):
+    if not values:
+        return None
+    return {v.strip().lower() for v in values if v and v.strip()} or None
+
+class Subscription:
+    """
+    One connected client: its filters and a bounded buffer of pending events.
+
+    When the buffer is full the oldest event is dropped and counted, so a
+    slow consumer loses old events instead of holding memory or slowing
+    the publisher.
+    """
+
+    def __init__(self, categories: Iterable[str] = None, areas: Iterable[str] = None,
+                 sources: Iterable[str] = None, buffer_size: int = 256):
+        self.categories = _normalize(categories)
+        self.areas = _normalize(areas)
+        self.sources = _normalize(sources)
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.sources and (event.get("source") or "").lower() not in self.sources:
+            return False
+        if self.categories and (event.get("category") or "").lower() not in self.categories:
+            return False
+        if self.areas:
+            area = (event.get("area") or "").lower()
+            if not area or not any(wanted in area for wanted in self.areas):
+                return False
+        return True
+
+    def _push(self, event: Dict[str, Any]):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: float = None) -> Dict[str, Any]:
+        """
+        Wait for events and drain the buffer. Returns ``{"events", "dropped"}``
+        where ``dropped`` counts events lost since the previous call; an empty
+        batch means the timeout passed (use it for heartbeats).
+        """
+        if not self.buffer and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        events = list(self.buffer)
+        self.buffer.clear()
+        dropped, self.dropped = self.dropped, 0
+        return {"events": events, "dropped": dropped}
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+class EventHub:
+    """
+    In-process publish/subscribe hub for new civic events.
+
+    Publishers (scheduler threads, request handlers) call ``publish`` from any
+    thread; delivery happens on the event loop that subscribers live on, so
+    work per cycle is proportional to new events times matching clients, not
+    to how often clients would otherwise poll.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._subscribers: List[Subscription] = []
+        self._loop = None
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, categories: Iterable[str] = None, areas: Iterable[str] = None,
+                  sources: Iterable[str] = None, buffer_size: int = None) -> Subscription:
+        """Register a client; must be called from the event loop that will consume it"""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(categories, areas, sources, buffer_size or self.buffer_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, kind: str, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Publish items of one kind (``reddit_post``, ``tweet``, ``civic_analysis``).
+        Items carry ``id``, ``source`` and ``created_utc`` and optionally
+        ``category`` and ``area``. Safe to call from any thread.
+        """
+        if not self._subscribers or self._loop is None:
+            return 0
+        events = [
+            {
+                "seq": next(self._seq),
+                "kind": kind,
+                "id": item.get("id"),
+                "source": item.get("source"),
+                "category": item.get("category"),
+                "area": item.get("area") or item.get("subreddit"),
+                "created_utc": item.get("created_utc"),
+                "data": item,
+            }
+            for item in items
+        ]
+        if not events:
+            return 0
+        self.published += len(events)
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, events)
+        except RuntimeError:
+            # Loop closed (server shutting down)
+            return 0
+        return len(events)
+
+    def _deliver(self, events: List[Dict[str, Any]]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for event in events:
+                if subscription.matches(event):
+                    subscription._push(event)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "buffered": sum(len(s.buffer) for s in subscribers),
+        }
+
+_hub = EventHub()
+
+def get_event_hub() -> EventHub:
+    """Process-wide event hub"""
+    return _hub
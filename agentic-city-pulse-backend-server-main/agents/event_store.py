@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT,
+    kind TEXT NOT NULL,
+    source TEXT,
+    created_utc REAL NOT NULL,
+    ingested_utc REAL NOT NULL,
+    day TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_day ON events (day);
+CREATE INDEX IF NOT EXISTS events_kind_created ON events (kind, created_utc);
+CREATE INDEX IF NOT EXISTS events_event_id ON events (event_id);
+"""
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_pulse_events.db")
+
+def _day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+class EventStore:
+    """
+    Append-only local event store for scraped posts and civic analyses.
+
+    Backed by SQLite in WAL mode so one writer and many readers (including
+    other processes) can share the file. Appends are buffered and written in
+    batches by a background thread.
+
+    All events live in one table, so ``seq`` is a single global order that
+    cursors can follow. Each row carries its UTC ``day`` (indexed), which is
+    the unit for retention: days older than ``retention_days`` are removed
+    with an indexed DELETE, and SQLite reuses the freed pages for later
+    inserts (there is no VACUUM, so the file does not shrink). Compaction
+    drops superseded duplicates of the same ``event_id`` and checkpoints the
+    WAL. The file defaults to ``city_pulse_events.db`` next to this module, so
+    both servers share one store whatever directory they are started from.
+    """
+
+    def __init__(self, path: str = None, batch_size: int = 200, flush_interval: float = 1.0,
+                 retention_days: int = 30, maintenance_interval: float = 3600):
+        self.path = path or os.getenv("EVENT_STORE_PATH", DEFAULT_PATH)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.maintenance_interval = maintenance_interval
+        self._buffer: List[tuple] = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._flush_needed = threading.Event()
+
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._writer.commit()
+        self._thread = threading.Thread(target=self._flush_loop, name="event-store", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        # One read connection per thread; WAL readers don't block the writer
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def append(self, kind: str, payload: Dict[str, Any], event_id: str = None,
+               source: str = None, created_utc: float = None):
+        """Queue one event; it is written with the next batch"""
+        now = time.time()
+        created = created_utc or now
+        row = (event_id, kind, source, created, now, _day(created), json.dumps(payload, default=str))
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._flush_needed.set()
+
+    def append_many(self, kind: str, items: Iterable[Dict[str, Any]], source: str = None):
+        """Queue items that carry their own ``id`` and ``created_utc``"""
+        for item in items:
+            self.append(kind, item, event_id=item.get("id"), source=source or item.get("source"),
+                        created_utc=item.get("created_utc"))
+
+    def flush(self) -> int:
+        """Write buffered events in one transaction; returns how many were written"""
+        with self._buffer_lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return 0
+        with self._write_lock:
+            with self._writer:
+                self._writer.executemany(
+                    "INSERT INTO events (event_id, kind, source, created_utc, ingested_utc, day, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        return len(rows)
+
+    def _flush_loop(self):
+        last_maintenance = time.monotonic()
+        while not self._stop.is_set():
+            self._flush_needed.wait(self.flush_interval)
+            self._flush_needed.clear()
+            try:
+                self.flush()
+                if time.monotonic() - last_maintenance >= self.maintenance_interval:
+                    last_maintenance = time.monotonic()
+                    self.apply_retention()
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Event store flush failed: {str(e)}")
+
+    @staticmethod
+    def _row_to_event(row) -> Dict[str, Any]:
+        seq, event_id, kind, source, created_utc, payload = row
+        return {
+            "seq": seq,
+            "event_id": event_id,
+            "kind": kind,
+            "source": source,
+            "created_utc": created_utc,
+            "payload": json.loads(payload),
+        }
+
+    def query(self, kinds: Iterable[str] = None, since: float = None, until: float = None,
+              after_seq: int = None, until_seq: int = None, limit: int = None,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Read events filtered by kind, creation time and/or sequence number (``after_seq`` < seq <= ``until_seq``)"""
+        clauses, params = [], []
+        if kinds:
+            kinds = list(kinds)
+            clauses.append(f"kind IN ({','.join('?' * len(kinds))})")
+            params.extend(kinds)
+        if since is not None:
+            clauses.append("created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_utc < ?")
+            params.append(until)
+        if after_seq is not None:
+            clauses.append("seq > ?")
+            params.append(after_seq)
+        if until_seq is not None:
+            clauses.append("seq <= ?")
+            params.append(until_seq)
+        sql = "SELECT seq, event_id, kind, source, created_utc, payload FROM events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_utc DESC, seq DESC" if newest_first else " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._row_to_event(row) for row in self._reader().execute(sql, params)]
+
+    def last_seq(self) -> int:
+        """Sequence number of the newest written event (0 when empty)"""
+        return self._reader().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def partitions(self) -> Dict[str, int]:
+        """Row count per UTC day"""
+        rows = self._reader().execute("SELECT day, COUNT(*) FROM events GROUP BY day ORDER BY day")
+        return dict(rows.fetchall())
+
+    def apply_retention(self) -> int:
+        """Delete every event whose UTC day is older than ``retention_days``"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        with self._write_lock:
+            with self._writer:
+                deleted = self._writer.execute("DELETE FROM events WHERE day < ?", (cutoff,)).rowcount
+        if deleted:
+            logger.info(f"Event store retention removed {deleted} events before {cutoff}")
+        return deleted
+
+    def compact(self) -> int:
+        """Keep only the latest row per event_id and checkpoint the WAL"""
+        with self._write_lock:
+            with self._writer:
+                deleted = self._writer.execute(
+                    "DELETE FROM events WHERE event_id IS NOT NULL AND seq NOT IN "
+                    "(SELECT MAX(seq) FROM events WHERE event_id IS NOT NULL GROUP BY event_id)"
+                ).rowcount
+            self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def close(self):
+        self._stop.set()
+        self._flush_needed.set()
+        self._thread.join(timeout=10)
+        self.flush()
+        with self._write_lock:
+            self._writer.close()
+
+_store: Optional[EventStore] = None
+_store_lock = threading.Lock()
+
+def get_event_store() -> EventStore:
+    """Process-wide event store, opened on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EventStore()
+    return _store
@@ -0,0 +1,283 @@
+import math
+import time
+import functools
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+_M_PER_DEG = math.pi * 6371000.0 / 180.0
+
+class StringDictionary:
+    """Dictionary encoding: each distinct string is stored once and rows hold its integer code"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Code for ``value`` (added if new); -1 for empty values"""
+        if not value:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """Code for an existing value, or None"""
+        return self._codes.get(value) if value else None
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code] if code >= 0 else None
+
+# Column name -> (dtype, fill value for missing data)
+COLUMNS = {
+    "created_utc": (np.float64, np.nan),
+    "latitude": (np.float32, np.nan),
+    "longitude": (np.float32, np.nan),
+    "category": (np.int16, -1),
+    "source": (np.int16, -1),
+    "area": (np.int32, -1),
+    "road": (np.int32, -1),
+}
+ENCODED = ("category", "source", "area", "road")
+
+def _locked(method):
+    """Run a read under the table lock so it never sees a half-compacted table"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def _normalize(value) -> Optional[str]:
+    return " ".join(str(value).lower().split()) if value else None
+
+class EventTable:
+    """
+    Compact columnar table of events for vectorized filtering and grouping.
+
+    Timestamps and coordinates are NumPy arrays; category, source, area and
+    road are dictionary-encoded into small integer columns. A row costs
+    about 30 bytes plus its id, versus several hundred for a dict, and
+    filters, group-bys and top-k run as array operations instead of Python
+    loops. Columns grow by doubling, so appends are amortized O(1).
+    """
+
+    def __init__(self, capacity: int = 1024, retention: float = 7 * 24 * 3600):
+        self.retention = retention
+        self._size = 0
+        self._columns = {name: np.full(capacity, fill, dtype=dtype) for name, (dtype, fill) in COLUMNS.items()}
+        self.ids: List[str] = []
+        self._id_set = set()
+        self.dictionaries = {name: StringDictionary() for name in ENCODED}
+        self._lock = threading.RLock()
+        self._last_compact = 0.0
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a column's filled rows"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        capacity = len(self._columns["created_utc"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, (dtype, fill) in COLUMNS.items():
+            grown = np.full(capacity, fill, dtype=dtype)
+            grown[:self._size] = self._columns[name][:self._size]
+            self._columns[name] = grown
+
+    def extend(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Append items (``id``, ``created_utc``, ``category``, ``source``, optional coordinates,
+        ``areaName``/``roadName`` or ``area``); returns how many were new"""
+        rows = {name: [] for name in COLUMNS}
+        ids = []
+        with self._lock:
+            for item in items:
+                event_id = item.get("id")
+                if event_id is None or event_id in self._id_set:
+                    continue
+                self._id_set.add(event_id)
+                ids.append(event_id)
+                area = item.get("areaName") or str(item.get("area") or "").split(",")[0]
+                rows["created_utc"].append(item.get("created_utc") or time.time())
+                rows["latitude"].append(item.get("latitude") if item.get("latitude") is not None else np.nan)
+                rows["longitude"].append(item.get("longitude") if item.get("longitude") is not None else np.nan)
+                rows["category"].append(self.dictionaries["category"].encode(str(item.get("category") or "").upper()))
+                rows["source"].append(self.dictionaries["source"].encode(item.get("source")))
+                rows["area"].append(self.dictionaries["area"].encode(_normalize(area)))
+                rows["road"].append(self.dictionaries["road"].encode(_normalize(item.get("roadName"))))
+            if not ids:
+                return 0
+            self._reserve(len(ids))
+            start, end = self._size, self._size + len(ids)
+            for name, (dtype, _) in COLUMNS.items():
+                self._columns[name][start:end] = np.asarray(rows[name], dtype=dtype)
+            self.ids.extend(ids)
+            self._size = end
+            now = time.time()
+            if now - self._last_compact >= self.retention / 168:
+                self._compact(now - self.retention)
+                self._last_compact = now
+        return len(ids)
+
+    def append(self, item: Dict[str, Any]) -> bool:
+        return self.extend([item]) == 1
+
+    def _compact(self, cutoff: float):
+        """Drop rows created before ``cutoff`` (one vectorized pass, about once an hour)"""
+        keep = self._columns["created_utc"][:self._size] >= cutoff
+        if keep.all():
+            return
+        kept = np.flatnonzero(keep)
+        for name in COLUMNS:
+            column = self._columns[name]
+            column[:len(kept)] = column[kept]
+            column[len(kept):self._size] = COLUMNS[name][1]
+        dropped = [self.ids[i] for i in np.flatnonzero(~keep)]
+        self._id_set.difference_update(dropped)
+        self.ids = [self.ids[i] for i in kept]
+        self._size = len(kept)
+
+    def _codes(self, name: str, values) -> Optional[List[int]]:
+        if isinstance(values, str):
+            values = [values]
+        normalize = (lambda v: str(v).upper()) if name == "category" else \
+            (lambda v: str(v)) if name == "source" else _normalize
+        return [code for code in (self.dictionaries[name].lookup(normalize(v)) for v in values) if code is not None]
+
+    @_locked
+    def mask(self, since: float = None, until: float = None, category=None, source=None, area=None, road=None,
+             near: Tuple[float, float, float] = None) -> np.ndarray:
+        """
+        Boolean row mask. ``category``/``source``/``area``/``road`` take one
+        value or a list; ``near`` is ``(lat, lon, radius_m)``.
+        """
+        size = self._size
+        mask = np.ones(size, dtype=bool)
+        created = self._columns["created_utc"][:size]
+        if since is not None:
+            mask &= created >= since
+        if until is not None:
+            mask &= created < until
+        for name, values in (("category", category), ("source", source), ("area", area), ("road", road)):
+            if values:
+                codes = self._codes(name, values)
+                if not codes:
+                    # None of the values has been seen
+                    mask[:] = False
+                    continue
+                column = self._columns[name][:size]
+                mask &= column == codes[0] if len(codes) == 1 else np.isin(column, codes)
+        if near is not None:
+            lat, lon, radius = near
+            dy = (self._columns["latitude"][:size] - np.float32(lat)) * np.float32(_M_PER_DEG)
+            dx = (self._columns["longitude"][:size] - np.float32(lon)) * np.float32(_M_PER_DEG * math.cos(math.radians(lat)))
+            # NaN coordinates compare False, so unlocated rows drop out
+            mask &= dx * dx + dy * dy <= np.float32(radius * radius)
+        return mask
+
+    @_locked
+    def count_by(self, by: str, mask: np.ndarray = None) -> Dict[str, int]:
+        """Row count per value of an encoded column (group-by count)"""
+        codes = self._columns[by][:self._size]
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.dictionaries[by]))
+        decode = self.dictionaries[by].decode
+        return {decode(code): int(counts[code]) for code in np.flatnonzero(counts)}
+
+    @_locked
+    def top_k(self, by: str, k: int = 10, mask: np.ndarray = None) -> List[Tuple[str, int]]:
+        """The ``k`` most frequent values of an encoded column, most frequent first"""
+        codes = self._columns[by][:self._size]
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.dictionaries[by]))
+        if not counts.size:
+            return []
+        k = min(k, int(np.count_nonzero(counts)))
+        top = np.argpartition(counts, -k)[-k:] if k < counts.size else np.arange(counts.size)
+        top = top[np.argsort(counts[top], kind="stable")[::-1]]
+        decode = self.dictionaries[by].decode
+        return [(decode(code), int(counts[code])) for code in top if counts[code]]
+
+    @_locked
+    def histogram(self, bucket_seconds: int = 3600, mask: np.ndarray = None) -> Dict[int, int]:
+        """Row count per time bucket (bucket start as Unix seconds)"""
+        created = self._columns["created_utc"][:self._size]
+        if mask is not None:
+            created = created[mask]
+        buckets, counts = np.unique((created // bucket_seconds).astype(np.int64), return_counts=True)
+        return {int(b) * bucket_seconds: int(c) for b, c in zip(buckets, counts)}
+
+    @_locked
+    def rows(self, mask: np.ndarray = None, limit: int = 100, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """Materialize matching rows as dicts (only here do rows become Python objects)"""
+        indices = np.flatnonzero(mask) if mask is not None else np.arange(self._size)
+        created = self._columns["created_utc"][indices]
+        if newest_first:
+            indices = indices[np.argsort(created, kind="stable")[::-1]]
+        indices = indices[:limit]
+        result = []
+        for i in indices:
+            row = {"id": self.ids[i], "created_utc": float(self._columns["created_utc"][i])}
+            lat, lon = self._columns["latitude"][i], self._columns["longitude"][i]
+            row["latitude"] = None if np.isnan(lat) else round(float(lat), 6)
+            row["longitude"] = None if np.isnan(lon) else round(float(lon), 6)
+            for name in ENCODED:
+                row[name] = self.dictionaries[name].decode(int(self._columns[name][i]))
+            result.append(row)
+        return result
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """Approximate footprint: column arrays (filled rows), ids and dictionaries"""
+        columns = sum(self._columns[name][:self._size].nbytes for name in COLUMNS)
+        ids = sum(len(event_id) + 49 for event_id in self.ids) + 8 * len(self.ids)
+        dictionaries = sum(len(value) + 49 for d in self.dictionaries.values() for value in d.values)
+        return {"columns": columns, "ids": ids, "dictionaries": dictionaries, "total": columns + ids + dictionaries}
+
+    def summarize(self, group_by: Sequence[str] = ("category", "area"), k: int = 10, limit: int = 0,
+                  bucket_seconds: int = None, **filters) -> Dict[str, Any]:
+        """
+        Filter once and report the match count, top ``k`` values for each
+        ``group_by`` column, optionally a time histogram and the newest
+        ``limit`` rows, all against the same consistent view of the table.
+        """
+        with self._lock:
+            mask = self.mask(**filters)
+            summary = {"count": int(np.count_nonzero(mask))}
+            summary["top"] = {by: [{"value": value, "count": count} for value, count in self.top_k(by, k, mask)]
+                              for by in group_by}
+            if bucket_seconds:
+                summary["histogram"] = self.histogram(bucket_seconds, mask)
+            if limit:
+                summary["rows"] = self.rows(mask, limit=limit)
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self._size,
+            "capacity": len(self._columns["created_utc"]),
+            "distinct": {name: len(d) for name, d in self.dictionaries.items()},
+            "memory_bytes": self.memory_bytes()["total"],
+        }
+
+_table = EventTable()
+
+def get_event_table() -> EventTable:
+    """Process-wide columnar event table"""
+    return _table
@@ -0,0 +1,256 @@
+import math
+import time
+import bisect
+import heapq
+import itertools
+import functools
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_M = 6371000.0
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 6) -> str:
+    """Standard base32 geohash of a point"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+def geohash_bounds(cell: str) -> Tuple[float, float, float, float]:
+    """``(min_lat, max_lat, min_lon, max_lon)`` of a geohash cell"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+@functools.lru_cache(maxsize=65536)
+def geohash_neighbourhood(cell: str) -> Tuple[str, ...]:
+    """The cell and its (up to) eight neighbours"""
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds(cell)
+    height, width = max_lat - min_lat, max_lon - min_lon
+    lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = []
+    for dlat in (-height, 0.0, height):
+        if not -90.0 <= lat + dlat <= 90.0:
+            continue
+        for dlon in (-width, 0.0, width):
+            neighbour = geohash_encode(lat + dlat, (lon + dlon + 180.0) % 360.0 - 180.0, len(cell))
+            if neighbour not in cells:
+                cells.append(neighbour)
+    return tuple(cells)
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def parse_coordinates(value) -> Optional[Tuple[float, float]]:
+    """
+    Read a ``(latitude, longitude)`` pair from the shapes the models and
+    ``extract_gps_location`` produce: a dict with latitude/longitude (or
+    lat/lng), a ``[lat, lon]`` list, or a ``"lat, lon"`` string.
+    """
+    lat = lon = None
+    try:
+        if isinstance(value, dict):
+            if value.get("has_location") is False:
+                return None
+            lat = value.get("latitude", value.get("lat"))
+            lon = value.get("longitude", value.get("lng", value.get("lon")))
+        elif isinstance(value, (list, tuple)) and len(value) == 2:
+            lat, lon = value
+        elif isinstance(value, str) and "," in value:
+            lat, lon = value.split(",", 1)
+        if lat is None or lon is None:
+            return None
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0) or (lat == 0.0 and lon == 0.0):
+        return None
+    return lat, lon
+
+
+_M_PER_DEG = math.pi * _EARTH_RADIUS_M / 180.0
+
+class _Cell:
+    __slots__ = ("times", "entries")
+
+    def __init__(self):
+        # Parallel lists ordered by created_utc, so ``since`` is a bisect
+        self.times: List[float] = []
+        self.entries: List[Tuple[float, float, Dict[str, Any]]] = []
+
+class GeoEventIndex:
+    """
+    Grid index over events that have coordinates, for "near me" queries.
+
+    Events are bucketed into fixed lat/lon cells (``cell_deg`` degrees,
+    about 280 m at the default) and kept in time order within each cell. A
+    query visits only the occupied cells that intersect the search circle,
+    closest cell first, and stops as soon as no remaining cell can hold
+    anything nearer than the ``limit`` results it already has. Distances use
+    the equirectangular approximation, which is well under 1% off at city
+    scale.
+    """
+
+    def __init__(self, cell_deg: float = 0.0025, retention: float = 7 * 24 * 3600):
+        self.cell_deg = cell_deg
+        self.retention = retention
+        self._cells: Dict[Tuple[int, int], _Cell] = {}
+        self._ids: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _key(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.cell_deg), math.floor(longitude / self.cell_deg)
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        """Index one item with ``id``, ``latitude``/``longitude`` and ``created_utc``"""
+        coordinates = parse_coordinates((item.get("latitude"), item.get("longitude")))
+        if coordinates is None or not item.get("id"):
+            return False
+        ts = item.get("created_utc") or time.time()
+        key = self._key(*coordinates)
+        with self._lock:
+            if item["id"] in self._ids:
+                return False
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = _Cell()
+            if not cell.times or ts >= cell.times[-1]:
+                cell.times.append(ts)
+                cell.entries.append((coordinates[0], coordinates[1], item))
+            else:
+                i = bisect.bisect_right(cell.times, ts)
+                cell.times.insert(i, ts)
+                cell.entries.insert(i, (coordinates[0], coordinates[1], item))
+            self._ids[item["id"]] = key
+            if ts - self._last_prune >= self.retention / 168:
+                self._prune(ts)
+        return True
+
+    def ingest(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Index many items; returns how many had coordinates and were new"""
+        return sum(1 for item in items if self.add(item))
+
+    def _prune(self, ts: float):
+        # About once an hour of event time at the default retention; drops expired prefixes per cell
+        self._last_prune = ts
+        cutoff = max(ts, time.time()) - self.retention
+        for key in list(self._cells):
+            cell = self._cells[key]
+            expired = bisect.bisect_left(cell.times, cutoff)
+            if not expired:
+                continue
+            for _, _, item in cell.entries[:expired]:
+                self._ids.pop(item["id"], None)
+            del cell.times[:expired]
+            del cell.entries[:expired]
+            if not cell.times:
+                del self._cells[key]
+
+    def _rings(self, ci: int, cj: int, max_ring: int):
+        """Occupied cells by Chebyshev ring around ``(ci, cj)``, generated lazily"""
+        cells = self._cells
+        yield [(ci, cj)] if (ci, cj) in cells else []
+        for r in range(1, max_ring + 1):
+            ring = [(ci + di, cj + dj) for di in (-r, r) for dj in range(-r, r + 1)]
+            ring += [(ci + di, cj + dj) for di in range(-r + 1, r) for dj in (-r, r)]
+            yield [key for key in ring if key in cells]
+
+    def near(self, latitude: float, longitude: float, radius_m: float = 2000.0, since: float = None,
+             limit: int = 50, category: str = None) -> List[Dict[str, Any]]:
+        """
+        Events within ``radius_m`` of a point, nearest first, at most ``limit``
+        (k-nearest within the radius). ``since`` keeps events created at or
+        after that Unix time; ``category`` keeps one category.
+        """
+        if limit < 1:
+            return []
+        size = self.cell_deg
+        m_lat = _M_PER_DEG
+        m_lon = _M_PER_DEG * max(math.cos(math.radians(latitude)), 1e-6)
+        category = category.upper() if category else None
+        ci, cj = self._key(latitude, longitude)
+        lat_lo, lon_lo = self._key(latitude - radius_m / m_lat, longitude - radius_m / m_lon)
+        lat_hi, lon_hi = self._key(latitude + radius_m / m_lat, longitude + radius_m / m_lon)
+        # Every cell in Chebyshev ring r is at least (r - 1) whole cells away from the point
+        min_side = size * min(m_lat, m_lon)
+
+        best = []  # max-heap of (-squared distance, tiebreak, item) holding the nearest ``limit`` so far
+        counter = itertools.count()
+        bound2 = radius_m * radius_m
+        with self._lock:
+            cells = self._cells
+            if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > 4 * len(cells):
+                # Sparse index: cheaper to filter the occupied cells than to walk the bounding box
+                rings = [[(i, j) for i, j in cells if lat_lo <= i <= lat_hi and lon_lo <= j <= lon_hi]]
+                min_side = 0.0
+            else:
+                rings = self._rings(ci, cj, max(lat_hi - ci, ci - lat_lo, lon_hi - cj, cj - lon_lo))
+            for r, ring in enumerate(rings):
+                if r > 1 and ((r - 1) * min_side) ** 2 > bound2:
+                    break
+                ordered = []
+                for i, j in ring:
+                    dy = max(i * size - latitude, 0.0, latitude - (i + 1) * size) * m_lat
+                    dx = max(j * size - longitude, 0.0, longitude - (j + 1) * size) * m_lon
+                    ordered.append((dx * dx + dy * dy, cells[(i, j)]))
+                ordered.sort(key=lambda pair: pair[0])
+                for gap2, cell in ordered:
+                    if gap2 > bound2:
+                        break
+                    start = bisect.bisect_left(cell.times, since) if since is not None else 0
+                    entries = cell.entries
+                    for k in range(start, len(entries)):
+                        lat, lon, item = entries[k]
+                        dy = (lat - latitude) * m_lat
+                        dx = (lon - longitude) * m_lon
+                        d2 = dx * dx + dy * dy
+                        if d2 > bound2 or (category and item.get("category") != category):
+                            continue
+                        if len(best) < limit:
+                            heapq.heappush(best, (-d2, next(counter), item))
+                        else:
+                            heapq.heapreplace(best, (-d2, next(counter), item))
+                        if len(best) == limit:
+                            bound2 = -best[0][0]
+        return [dict(item, distance_m=round(math.sqrt(-d2), 1)) for d2, _, item in sorted(best, reverse=True)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"events": len(self._ids), "cells": len(self._cells), "cell_deg": self.cell_deg}
+
+_index = GeoEventIndex()
+
+def get_geo_index() -> GeoEventIndex:
+    """Process-wide spatial index of located events"""
+    return _index
@@ -1,16 +1,31 @@
 import os
-import tempfile
-import mimetypes
 import logging
 from datetime import datetime
-import magic
-from datetime import datetime
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
-from fractions import Fraction
+
+logger = logging.getLogger(__name__)
+
+def log_info(message):
+    logger.info(message)
+
+def log_error(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [ERROR] {message}")
+    logger.error(message)
+
+def log_warning(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [WARNING] {message}")
+    logger.warning(message)
+
+def preload_image_metadata():
+    """Import PIL and its EXIF tables ahead of the first image upload"""
+    from PIL import Image, ExifTags  # noqa: F401
 
 def extract_image_metadata(image_path):
     """Extract basic metadata from image file"""
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+
     metadata = {}
     try:
         with Image.open(image_path) as image:
@@ -46,6 +61,9 @@ def extract_image_metadata(image_path):
 
 def extract_gps_location(image_path):
     """Extract GPS location (latitude, longitude) from image EXIF data"""
+    from PIL import Image
+    from PIL.ExifTags import TAGS, GPSTAGS
+
     location_data = {
         "latitude": None,
         "longitude": None,
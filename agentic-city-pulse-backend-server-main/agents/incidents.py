@@ -0,0 +1,300 @@
+import time
+import zlib
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from agent_garden import parse_civic_result
+from geo_index import geohash_encode, geohash_neighbourhood, distance_m, parse_coordinates
+
+logger = logging.getLogger(__name__)
+
+def civic_event_items(session_id: str, analysis_type: str, result, metadata: Dict[str, Any],
+                      created_utc: float) -> List[Dict[str, Any]]:
+    """
+    Turn one civic analysis into event items (``id``, ``source``, ``category``,
+    ``area``, ``latitude``/``longitude``, ``created_utc`` plus the model's
+    fields). Photo GPS from the upload's metadata wins over coordinates the
+    model read from the content. Normal (no-issue) results are left out.
+    """
+    gps = parse_coordinates((metadata or {}).get("location"))
+    items = []
+    for i, event in enumerate(parse_civic_result(result)):
+        category = str(event.get("eventName") or "").strip().upper().replace(" ", "_")
+        if not category or category.startswith("NORMAL"):
+            continue
+        coordinates = gps or parse_coordinates(event.get("location_coordinates"))
+        items.append({
+            **event,
+            "id": f"civic:{session_id}:{i}",
+            "source": analysis_type.lower(),
+            "category": category,
+            "area": ", ".join(str(event[k]) for k in ("areaName", "roadName", "cityName") if event.get(k)),
+            "latitude": coordinates[0] if coordinates else None,
+            "longitude": coordinates[1] if coordinates else None,
+            "created_utc": created_utc,
+            "session_id": session_id,
+        })
+    return items
+
+def stored_event_items(store, since: float = None,
+                       kinds: Iterable[str] = ("civic_analysis", "reddit_post", "tweet"),
+                       after_seq: int = None, until_seq: int = None) -> Iterable[Dict[str, Any]]:
+    """Event items recorded in the event store, oldest first; civic analyses are expanded per event"""
+    for event in store.query(kinds=list(kinds), since=since, after_seq=after_seq, until_seq=until_seq):
+        payload = event["payload"]
+        if event["kind"] == "civic_analysis":
+            yield from civic_event_items(payload.get("session_id"), payload.get("analysis_type") or "unknown",
+                                         payload.get("result"), payload.get("metadata"), event["created_utc"])
+        else:
+            yield payload
+
+def _place_key(item: Dict[str, Any]) -> str:
+    """Normalized area/road name used to merge events without coordinates"""
+    parts = [item.get("areaName"), item.get("roadName")]
+    if not any(parts):
+        parts = [item.get("area")]
+    return " / ".join(" ".join(str(p).lower().split()) for p in parts if p) or "city"
+
+class Incident:
+    """One real-world situation and the events that reported it"""
+
+    def __init__(self, incident_id: str, category: str, place: str, created_utc: float):
+        self.id = incident_id
+        self.category = category
+        self.place = place
+        self.cell = None
+        self.latitude = None
+        self.longitude = None
+        self.located = 0
+        self.first_seen = created_utc
+        self.last_seen = created_utc
+        self.event_ids: List[str] = []
+        self.sources = Counter()
+        self.areas = Counter()
+        self.roads = Counter()
+        self.samples: List[Dict[str, Any]] = []
+
+    def add(self, item: Dict[str, Any], coordinates: Optional[Tuple[float, float]], ts: float, max_samples: int):
+        self.event_ids.append(item["id"])
+        self.first_seen = min(self.first_seen, ts)
+        self.last_seen = max(self.last_seen, ts)
+        self.sources[item.get("source") or "unknown"] += 1
+        if item.get("areaName"):
+            self.areas[str(item["areaName"])] += 1
+        if item.get("roadName"):
+            self.roads[str(item["roadName"])] += 1
+        if coordinates is not None:
+            # Running mean of the located reports
+            self.located += 1
+            if self.latitude is None:
+                self.latitude, self.longitude = coordinates
+            else:
+                self.latitude += (coordinates[0] - self.latitude) / self.located
+                self.longitude += (coordinates[1] - self.longitude) / self.located
+        self.samples.append({
+            "id": item["id"],
+            "source": item.get("source"),
+            "text": item.get("description") or item.get("title"),
+            "created_utc": ts,
+        })
+        if len(self.samples) > max_samples:
+            del self.samples[0]
+
+    def to_dict(self, active: bool, samples: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "category": self.category,
+            "status": "active" if active else "resolved",
+            "event_count": len(self.event_ids),
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "geohash": self.cell,
+            "place": self.place,
+            "areas": [name for name, _ in self.areas.most_common(3)],
+            "roads": [name for name, _ in self.roads.most_common(3)],
+            "sources": dict(self.sources),
+        }
+        if samples:
+            data["samples"] = list(self.samples)
+        return data
+
+class IncidentIndex:
+    """
+    Incremental spatio-temporal clustering of civic events into incidents.
+
+    An event joins an open incident of the same category when it is within
+    ``merge_radius_m`` of the incident's centroid (or, without coordinates,
+    names the same area/road) and within ``window`` seconds of its reports.
+    Located incidents are indexed by geohash cell, so a new event only looks
+    at incidents in its own cell and the eight around it; cost per event is
+    constant however many events or incidents there are. ``merge_radius_m``
+    should not exceed the cell's shorter side (about 600 m at precision 6)
+    so the neighbourhood always covers it.
+    """
+
+    def __init__(self, precision: int = 6, merge_radius_m: float = 500.0, window: float = 3 * 3600,
+                 retention: float = 48 * 3600, max_samples: int = 10, area_radius_m: float = 3000.0):
+        self.precision = precision
+        self.merge_radius_m = merge_radius_m
+        self.area_radius_m = area_radius_m
+        self.window = window
+        self.retention = retention
+        self.max_samples = max_samples
+        self._incidents: Dict[str, Incident] = {}
+        self._cells: Dict[Tuple[str, str], List[Incident]] = {}
+        self._places: Dict[Tuple[str, str], Incident] = {}
+        self._members: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self.events = 0
+
+    def _is_open(self, incident: Incident, ts: float) -> bool:
+        return incident.first_seen - self.window <= ts <= incident.last_seen + self.window
+
+    def _nearest(self, category: str, cell: str, coordinates: Tuple[float, float], ts: float) -> Optional[Incident]:
+        best, best_distance = None, self.merge_radius_m
+        for neighbour in geohash_neighbourhood(cell):
+            bucket = self._cells.get((category, neighbour))
+            if not bucket:
+                continue
+            # Closed incidents leave the cell index (they stay queryable until retention)
+            bucket[:] = [incident for incident in bucket if incident.last_seen + self.window >= ts
+                         and incident.id in self._incidents]
+            for incident in bucket:
+                if not self._is_open(incident, ts):
+                    continue
+                distance = distance_m(coordinates[0], coordinates[1], incident.latitude, incident.longitude)
+                if distance <= best_distance:
+                    best, best_distance = incident, distance
+        return best
+
+    def _new_id(self, category: str, event_id: str) -> str:
+        # Derived from the first report, so a rebuild from the event store gives the same ids
+        incident_id = f"inc-{zlib.crc32(f'{category}:{event_id}'.encode()):08x}"
+        suffix = 1
+        while incident_id in self._incidents:
+            suffix += 1
+            incident_id = f"inc-{zlib.crc32(f'{category}:{event_id}'.encode()):08x}-{suffix}"
+        return incident_id
+
+    def add(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cluster one event item (needs ``id`` and ``category``); returns the
+        incident it joined or started, or None if the item has no category
+        or was already added.
+        """
+        category = item.get("category")
+        if not category or not item.get("id"):
+            return None
+        category = str(category).upper()
+        ts = item.get("created_utc") or time.time()
+        coordinates = parse_coordinates((item.get("latitude"), item.get("longitude")))
+        place = _place_key(item)
+        with self._lock:
+            if item["id"] in self._members:
+                return None
+            cell = geohash_encode(*coordinates, self.precision) if coordinates else None
+            incident = self._nearest(category, cell, coordinates, ts) if coordinates else None
+            if incident is None and (place != "city" or coordinates is None):
+                # No nearby located incident: fall back to the named area/road
+                candidate = self._places.get((category, place))
+                if candidate is not None and candidate.id in self._incidents and self._is_open(candidate, ts) and (
+                        coordinates is None or candidate.latitude is None
+                        or distance_m(coordinates[0], coordinates[1], candidate.latitude,
+                                      candidate.longitude) <= self.area_radius_m):
+                    incident = candidate
+            if incident is None:
+                incident = Incident(self._new_id(category, item["id"]), category, place, ts)
+                self._incidents[incident.id] = incident
+            incident.add(item, coordinates, ts, self.max_samples)
+            if coordinates and incident.cell is None:
+                incident.cell = cell
+                self._cells.setdefault((category, cell), []).append(incident)
+            if place != "city" or coordinates is None:
+                self._places[(category, place)] = incident
+            self._members[item["id"]] = incident.id
+            self.events += 1
+            self._maybe_prune(ts)
+            return incident.to_dict(self._is_active(incident), samples=False)
+
+    def ingest(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Add many items; returns how many were clustered"""
+        return sum(1 for item in items if self.add(item) is not None)
+
+    def _is_active(self, incident: Incident, now: float = None) -> bool:
+        return incident.last_seen + self.window >= (now or time.time())
+
+    def _maybe_prune(self, ts: float):
+        # Amortized: one sweep per retention/48 seconds of event time
+        if ts - self._last_prune < self.retention / 48:
+            return
+        self._last_prune = ts
+        cutoff = max(ts, time.time()) - self.retention
+        for incident_id in [i for i, incident in self._incidents.items() if incident.last_seen < cutoff]:
+            incident = self._incidents.pop(incident_id)
+            for event_id in incident.event_ids:
+                self._members.pop(event_id, None)
+        self._places = {key: incident for key, incident in self._places.items() if incident.id in self._incidents}
+        self._cells = {key: [i for i in bucket if i.id in self._incidents]
+                       for key, bucket in self._cells.items()}
+        self._cells = {key: bucket for key, bucket in self._cells.items() if bucket}
+
+    def query(self, category: str = None, area: str = None, active_only: bool = True,
+              limit: int = 50, samples: bool = False) -> List[Dict[str, Any]]:
+        """Incidents, most recently reported first, filtered by category and area substring"""
+        now = time.time()
+        area = area.strip().lower() if area else None
+        with self._lock:
+            incidents = list(self._incidents.values())
+        results = []
+        for incident in sorted(incidents, key=lambda i: i.last_seen, reverse=True):
+            active = self._is_active(incident, now)
+            if active_only and not active:
+                continue
+            if category and incident.category != category.upper():
+                continue
+            if area and area not in incident.place and not any(
+                    area in name.lower() for name in list(incident.areas) + list(incident.roads)):
+                continue
+            results.append(incident.to_dict(active, samples=samples))
+            if len(results) >= limit:
+                break
+        return results
+
+    def get(self, incident_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            incident = self._incidents.get(incident_id)
+            if incident is None:
+                return None
+            data = incident.to_dict(self._is_active(incident))
+            data["event_ids"] = list(incident.event_ids)
+            return data
+
+    def rebuild(self, store, kinds: Iterable[str] = ("civic_analysis", "reddit_post", "tweet"),
+                until_seq: int = None) -> int:
+        """Re-cluster the events of the last ``retention`` seconds from the event store"""
+        added = self.ingest(stored_event_items(store, since=time.time() - self.retention, kinds=kinds,
+                                               until_seq=until_seq))
+        logger.info(f"Incident index rebuilt from {added} stored events")
+        return added
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            incidents = list(self._incidents.values())
+        return {
+            "events": self.events,
+            "incidents": len(incidents),
+            "active": sum(1 for incident in incidents if self._is_active(incident, now)),
+            "indexed_cells": len(self._cells),
+        }
+
+_index = IncidentIndex()
+
+def get_incident_index() -> IncidentIndex:
+    """Process-wide incident index"""
+    return _index
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+# Leaf frames of threads that are parked rather than working (pool workers, idle event loops, timers)
+IDLE_FRAMES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("selectors.py", "select"),
+    ("queue.py", "get"), ("thread.py", "_worker"),
+}
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running"""
+
+def _frame_key(code) -> Tuple[str, str, int]:
+    return (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+
+class Profile:
+    """Samples of one run: call stacks (root first) per thread, with counts"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Dict[str, Counter] = {}
+        self.samples = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.sampling_seconds = 0.0
+
+    def add(self, thread: str, stack: Tuple[Tuple[str, str, int], ...]):
+        self.stacks.setdefault(thread, Counter())[stack] += 1
+
+    def collapsed(self) -> str:
+        """Folded stacks (``thread;outer;...;inner count`` per line), as read by flamegraph.pl and speedscope"""
+        lines = []
+        for thread, stacks in sorted(self.stacks.items()):
+            for stack, count in stacks.most_common():
+                names = [thread.replace(";", ":")] + [
+                    f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":") for name, filename, line in stack]
+                lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """
+        speedscope file (https://www.speedscope.app/file-format-schema.json):
+        one sampled profile per thread. Identical stacks are merged and
+        weighted by their sample count, so the time-order view is not meaningful.
+        """
+        frames, index = [], {}
+        profiles = []
+        for thread, stacks in sorted(self.stacks.items(), key=lambda item: -sum(item[1].values())):
+            samples, weights = [], []
+            for stack, count in stacks.most_common():
+                ids = []
+                for frame in stack:
+                    if frame not in index:
+                        index[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    ids.append(index[frame])
+                samples.append(ids)
+                weights.append(round(count * self.interval, 6))
+            total = round(sum(weights), 6)
+            profiles.append({"type": "sampled", "name": thread, "unit": "seconds", "startValue": 0,
+                             "endValue": total, "samples": samples, "weights": weights})
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"city-pulse {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}",
+            "exporter": "city-pulse sampling_profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "threads": len(self.stacks),
+            "duration_s": round(self.duration, 3),
+            "interval_s": self.interval,
+            # Share of wall time the sampler itself held the interpreter
+            "overhead": round(self.sampling_seconds / self.duration, 4) if self.duration else 0.0,
+        }
+
+class SamplingProfiler:
+    """
+    On-demand wall-clock sampling profiler for every Python thread in the
+    process (request handlers, the asyncio loop, scheduler and executor
+    threads).
+
+    Nothing runs between profiles: no thread, hook or tracer is installed,
+    so leaving it enabled costs nothing. ``run`` starts a sampler thread
+    that reads ``sys._current_frames()`` every ``interval`` seconds for
+    ``seconds`` and then exits. Only one profile runs at a time. Parked
+    threads (waiting on locks, queues or selectors) are left out unless
+    ``include_idle`` is set.
+    """
+
+    def __init__(self, max_seconds: float = 120.0, min_interval: float = 0.001, max_depth: int = 128):
+        self.max_seconds = max_seconds
+        self.min_interval = min_interval
+        self.max_depth = max_depth
+        self._busy = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._busy.locked()
+
+    def run(self, seconds: float, interval: float = 0.01, include_idle: bool = False) -> Profile:
+        """Sample all threads for ``seconds`` (blocks the caller); raises ProfilerBusy if one is running"""
+        seconds = min(max(seconds, 0.0), self.max_seconds)
+        interval = max(interval, self.min_interval)
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            profile = Profile(interval)
+            sampler = threading.Thread(target=self._sample, args=(profile, seconds, include_idle),
+                                       name="sampling-profiler", daemon=True)
+            sampler.start()
+            sampler.join()
+            return profile
+        finally:
+            self._busy.release()
+
+    def _sample(self, profile: Profile, seconds: float, include_idle: bool):
+        me = threading.get_ident()
+        started = time.perf_counter()
+        deadline = started + seconds
+        next_sample = started
+        names: Dict[int, str] = {}
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+                continue
+            # Skip missed ticks rather than sampling back to back to catch up
+            next_sample = max(next_sample + profile.interval, now)
+            begin = time.perf_counter()
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                stack = self._stack(frame)
+                leaf = (os.path.basename(stack[-1][1]), stack[-1][0].rsplit(".", 1)[-1])
+                if not include_idle and leaf in IDLE_FRAMES:
+                    continue
+                profile.add(names.get(ident, f"thread-{ident}"), stack)
+            profile.samples += 1
+            del frames
+            profile.sampling_seconds += time.perf_counter() - begin
+        profile.duration = time.perf_counter() - started
+
+    def _stack(self, frame) -> Tuple[Tuple[str, str, int], ...]:
+        stack: List[Tuple[str, str, int]] = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(_frame_key(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+_profiler: Optional[SamplingProfiler] = None
+_profiler_lock = threading.Lock()
+
+def get_sampling_profiler() -> SamplingProfiler:
+    """Process-wide profiler (created on first use; it holds no threads until a profile runs)"""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler(max_seconds=float(os.getenv("PROFILE_MAX_SECONDS", "120")))
+    return _profiler
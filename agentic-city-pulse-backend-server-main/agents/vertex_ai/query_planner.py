@@ -0,0 +1,351 @@
+import re
+import logging
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Words naming a field in a question -> candidate field names (first one present in the data wins)
+FIELD_ALIASES = {
+    "category": ("eventName", "category", "type"),
+    "type": ("eventName", "category", "type"),
+    "issue": ("eventName", "category", "type"),
+    "event": ("eventName", "category", "type"),
+    "area": ("areaName", "area", "locality"),
+    "neighbourhood": ("areaName", "area", "locality"),
+    "neighborhood": ("areaName", "area", "locality"),
+    "locality": ("areaName", "area", "locality"),
+    "place": ("areaName", "area", "locality"),
+    "road": ("roadName", "road", "street"),
+    "street": ("roadName", "road", "street"),
+    "city": ("cityName", "city"),
+    "source": ("source",),
+}
+TIME_FIELDS = ("created_at", "createdAt", "timestamp", "timeStamp", "created_utc", "date", "time")
+TIME_BUCKETS = {"day": "day", "date": "day", "hour": "hour"}
+# Category tokens too generic to identify a category on their own
+GENERIC_TOKENS = {"issue", "issues", "problem", "report", "reported", "normal", "image", "road", "main",
+                  "other", "event", "in", "between", "no", "of"}
+MAX_CATEGORICAL_VALUES = 200
+# Group-bys with more values than this are computed locally instead of one count() per value
+MAX_PUSHDOWN_GROUPS = 25
+
+_ANALYTICAL = re.compile(
+    r"\b(how many|count|number of|total|most|least|fewest|top|breakdown|distribution|per|"
+    r"average|avg|mean|sum|maximum|minimum|highest|lowest|busiest|trend)\b"
+)
+_COUNTING = re.compile(r"\b(how many|count|number of|total)\b")
+_GROUP = re.compile(r"\b(?:by|per|each|every|across|which|what|busiest|top\s+\d+)\s+(\w+)")
+_TOP = re.compile(r"\btop\s+(\d+)\b")
+_ASCENDING = re.compile(r"\b(least|fewest|lowest|minimum)\b")
+_RANKING = re.compile(r"\b(most|top|highest|busiest|worst|least|fewest|lowest)\b")
+_SINGLE = re.compile(r"\b(?:which|what)\s+\w+\s+(?:has|had|have|is|was|sees|saw|gets|got|reported)\b"
+                     r"|\bbusiest\s+\w*[^s\W]\b")
+_NUMERIC_AGGREGATE = re.compile(r"\b(average|avg|mean|sum|total|max(?:imum)?|min(?:imum)?)\s+(?:of\s+)?(?:the\s+)?(\w+)")
+_AGGREGATE_NAMES = {"average": "avg", "avg": "avg", "mean": "avg", "sum": "sum", "total": "sum",
+                    "max": "max", "maximum": "max", "min": "min", "minimum": "min"}
+_LAST_N = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+(hour|day|week|month)s?\b")
+_LAST_ONE = re.compile(r"\b(?:last|past|previous|this)\s+(hour|day|week|month|24 hours)\b")
+_UNIT_SECONDS = {"hour": 3600, "day": 86400, "24 hours": 86400, "week": 7 * 86400, "month": 30 * 86400}
+
+def _singular(word: str) -> str:
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def _phrase(value: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", str(value).lower()))
+
+def to_datetime(value: Any) -> Optional[datetime]:
+    """UTC datetime for an ISO string, epoch seconds or datetime (naive values are taken as UTC)"""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    elif isinstance(value, str) and value:
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+class QueryPlan:
+    """Structured form of an analytical question"""
+
+    def __init__(self):
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.group_by: Optional[str] = None
+        self.bucket: Optional[str] = None
+        self.groups: Optional[List[Any]] = None
+        self.aggregate = "count"
+        self.field: Optional[str] = None
+        self.time_field: Optional[str] = None
+        self.since: Optional[datetime] = None
+        self.until: Optional[datetime] = None
+        self.descending = True
+        self.chronological = False
+        self.limit = 20
+
+    def describe(self) -> Dict[str, Any]:
+        plan = {"aggregate": self.aggregate if not self.field else f"{self.aggregate}({self.field})"}
+        if self.filters:
+            plan["filters"] = [f"{field} {op} {value}" for field, op, value in self.filters]
+        if self.group_by:
+            plan["group_by"] = f"{self.group_by} by {self.bucket}" if self.bucket else self.group_by
+            plan["order"] = "chronological" if self.chronological else "descending" if self.descending else "ascending"
+            plan["limit"] = self.limit
+        if self.since or self.until:
+            plan["time_range"] = {"field": self.time_field,
+                                  "since": self.since.isoformat() if self.since else None,
+                                  "until": self.until.isoformat() if self.until else None}
+        return plan
+
+class QueryPlanner:
+    """
+    Turns analytical questions ("count issues by category last week",
+    "which area has most drainage complaints") into a ``QueryPlan``.
+
+    Rule based: field words map to fields through ``FIELD_ALIASES``, filter
+    values are matched against the values actually present in the loaded
+    records, and time phrases become a range on the first known time field.
+    Questions that are not analytical get no plan and go to retrieval.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        values = defaultdict(dict)
+        counts = defaultdict(int)
+        numeric = set()
+        for record in records:
+            for field, value in record.items():
+                if isinstance(value, bool) or value is None:
+                    continue
+                if isinstance(value, (int, float)):
+                    numeric.add(field)
+                elif isinstance(value, str) and 0 < len(value) <= 60:
+                    field_values = values[field]
+                    if len(field_values) <= MAX_CATEGORICAL_VALUES:
+                        spellings = field_values.setdefault(_phrase(value), [])
+                        if value not in spellings:
+                            spellings.append(value)
+                    counts[field] += 1
+        # Categorical: bounded number of distinct values that actually repeat
+        self.categorical = {field: vals for field, vals in values.items()
+                            if len(vals) <= MAX_CATEGORICAL_VALUES and len(vals) < counts[field]}
+        self.fields = set(values) | numeric
+        self.numeric = numeric
+        self.time_field = next(
+            (f for f in TIME_FIELDS if any(to_datetime(r.get(f)) for r in records[:50])), None)
+
+    def _field(self, word: str) -> Optional[str]:
+        for candidate in FIELD_ALIASES.get(_singular(word), ()):
+            if candidate in self.fields:
+                return candidate
+        return None
+
+    def _match_values(self, question: str, tokens: List[str]) -> List[Tuple[str, List[Any]]]:
+        matches = []
+        for field, values in self.categorical.items():
+            found = []
+            for phrase, raws in values.items():
+                if not phrase:
+                    continue
+                if re.search(r"\b" + re.escape(phrase) + r"s?\b", question):
+                    found.extend(raws)
+                elif raws[0].isupper() or "_" in raws[0]:
+                    # Category constants (DRAINAGE_ISSUE) also match on a distinctive word ("drainage complaints")
+                    for token in phrase.split():
+                        if token in GENERIC_TOKENS or len(token) < 4:
+                            continue
+                        stem = token[:max(4, len(token) - 2)]
+                        if any(word.startswith(stem) for word in tokens):
+                            found.extend(raws)
+                            break
+            if found:
+                matches.append((field, found))
+        return matches
+
+    def _time_range(self, question: str, now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        if re.search(r"\byesterday\b", question):
+            return midnight - timedelta(days=1), midnight
+        if re.search(r"\btoday\b", question):
+            return midnight, None
+        match = _LAST_N.search(question)
+        if match:
+            return now - timedelta(seconds=int(match.group(1)) * _UNIT_SECONDS[match.group(2)]), None
+        match = _LAST_ONE.search(question)
+        if match:
+            return now - timedelta(seconds=_UNIT_SECONDS[match.group(1)]), None
+        return None, None
+
+    def plan(self, question: str, now: datetime = None) -> Optional[QueryPlan]:
+        """Plan for an analytical question, or None"""
+        q = question.lower()
+        if not _ANALYTICAL.search(q):
+            return None
+        tokens = re.findall(r"[a-z0-9]+", q)
+        plan = QueryPlan()
+
+        for word in _GROUP.findall(q):
+            if _singular(word) in TIME_BUCKETS and self.time_field:
+                plan.group_by, plan.bucket = self.time_field, TIME_BUCKETS[_singular(word)]
+                break
+            field = self._field(word)
+            if field:
+                plan.group_by = field
+                if field in self.categorical:
+                    plan.groups = [raw for raws in self.categorical[field].values() for raw in raws]
+                break
+        if plan.group_by:
+            plan.descending = not _ASCENDING.search(q)
+            # "issues per day" reads as a timeline unless a ranking is asked for
+            plan.chronological = bool(plan.bucket) and not _RANKING.search(q)
+            top = _TOP.search(q)
+            if top:
+                plan.limit = int(top.group(1))
+            elif _SINGLE.search(q):
+                plan.limit = 1
+
+        for name, word in _NUMERIC_AGGREGATE.findall(q):
+            field = next((f for f in self.numeric if word in f.lower()), None)
+            if field:
+                plan.aggregate, plan.field = _AGGREGATE_NAMES[name], field
+                break
+
+        for field, found in self._match_values(q, tokens):
+            plan.filters.append((field, "==", found[0]) if len(found) == 1 else (field, "in", found))
+
+        # "most serious issues" alone is not a query this planner can answer
+        if not (plan.group_by or plan.field or _COUNTING.search(q)):
+            return None
+
+        if self.time_field:
+            plan.since, plan.until = self._time_range(q, now or datetime.now(timezone.utc))
+            if plan.since or plan.until:
+                plan.time_field = self.time_field
+        return plan
+
+def _matches(record: Dict[str, Any], plan: QueryPlan) -> bool:
+    for field, op, value in plan.filters:
+        if (record.get(field) not in value) if op == "in" else (record.get(field) != value):
+            return False
+    if plan.time_field:
+        ts = to_datetime(record.get(plan.time_field))
+        if ts is None or (plan.since and ts < plan.since) or (plan.until and ts >= plan.until):
+            return False
+    return True
+
+def _group_key(record: Dict[str, Any], plan: QueryPlan) -> Any:
+    value = record.get(plan.group_by)
+    if plan.bucket:
+        ts = to_datetime(value)
+        if ts is None:
+            return None
+        return ts.date().isoformat() if plan.bucket == "day" else ts.strftime("%Y-%m-%dT%H:00")
+    return value
+
+def _finish(values: Dict[Any, List[float]], plan: QueryPlan, counts: Dict[Any, int]) -> List[Dict[str, Any]]:
+    name = plan.aggregate if not plan.field else f"{plan.aggregate}_{plan.field}"
+    rows = []
+    for key in counts:
+        if plan.aggregate == "count":
+            result = counts[key]
+        else:
+            numbers = values.get(key)
+            if not numbers:
+                continue
+            result = {"sum": sum, "max": max, "min": min}.get(plan.aggregate, lambda v: sum(v) / len(v))(numbers)
+            result = round(result, 3)
+        rows.append({plan.group_by: key, name: result} if plan.group_by else {name: result})
+    if plan.chronological:
+        rows.sort(key=lambda row: row[plan.group_by])
+        rows = rows[-plan.limit:]
+    elif plan.group_by:
+        # Ties rank by group value, so local and pushed-down results agree
+        rows.sort(key=lambda row: str(row[plan.group_by]))
+        rows.sort(key=lambda row: row[name], reverse=plan.descending)
+        rows = rows[:plan.limit]
+    return rows
+
+def run_local(plan: QueryPlan, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Execute a plan over loaded records; returns the result rows"""
+    counts = defaultdict(int)
+    values = defaultdict(list)
+    if not plan.group_by:
+        counts[None] = 0
+    for record in records:
+        if not _matches(record, plan):
+            continue
+        key = _group_key(record, plan) if plan.group_by else None
+        if key is None and plan.group_by:
+            continue
+        counts[key] += 1
+        if plan.field:
+            value = record.get(plan.field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[key].append(value)
+    return _finish(values, plan, counts)
+
+def _where(query, field: str, op: str, value: Any):
+    try:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+        return query.where(filter=FieldFilter(field, op, value))
+    except ImportError:
+        return query.where(field, op, value)
+
+def _count(query) -> int:
+    result = query.count(alias="count").get()
+    return int(result[0][0].value)
+
+def run_firestore(plan: QueryPlan, collection_ref, datetime_fields: Iterable[str] = (),
+                  numeric_fields: Iterable[str] = ()) -> Optional[List[Dict[str, Any]]]:
+    """
+    Execute a count plan as Firestore filters plus ``count()`` aggregation
+    queries (one per group for a group-by), so the whole collection is
+    counted without reading its documents. Returns None when the plan cannot
+    be pushed down: other aggregates, time buckets, too many groups, or a
+    time range on a field that is not stored as a timestamp or number.
+
+    Group values come from the loaded records, so a group-by is only
+    answered here when the groups are shown to be complete: one more
+    ``count()`` of all matching documents must equal the sum of the group
+    counts. Otherwise some documents hold values (or lack the field) that
+    the loaded records never showed, and None is returned so the caller
+    counts locally instead of reporting partial totals as the collection's.
+    """
+    if plan.aggregate != "count" or plan.bucket:
+        return None
+    if plan.group_by and (not plan.groups or len(plan.groups) > MAX_PUSHDOWN_GROUPS):
+        return None
+    query = collection_ref
+    for field, op, value in plan.filters:
+        query = _where(query, field, op, value)
+    if plan.since or plan.until:
+        if plan.time_field in datetime_fields:
+            convert = lambda dt: dt
+        elif plan.time_field in numeric_fields:
+            convert = lambda dt: dt.timestamp()
+        else:
+            return None
+        if plan.since:
+            query = _where(query, plan.time_field, ">=", convert(plan.since))
+        if plan.until:
+            query = _where(query, plan.time_field, "<", convert(plan.until))
+    counts = {}
+    total = _count(query)
+    if plan.group_by:
+        for value in plan.groups:
+            count = _count(_where(query, plan.group_by, "==", value))
+            if count:
+                counts[value] = count
+        if sum(counts.values()) != total:
+            logger.info(f"{plan.group_by} has values outside the {len(plan.groups)} loaded ones; not pushed down")
+            return None
+    else:
+        counts[None] = total
+    return _finish({}, plan, counts)
@@ -0,0 +1,232 @@
+import re
+import json
+import math
+import heapq
+import logging
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields that say what and where an issue is count more than free text
+FIELD_WEIGHTS = {
+    "eventName": 3.0,
+    "category": 3.0,
+    "areaName": 2.5,
+    "roadName": 2.0,
+    "cityName": 1.5,
+    "title": 2.0,
+    "description": 1.0,
+}
+DEFAULT_FIELD_WEIGHT = 1.0
+# Short fields are repeated in every chunk of a record; longer text is split into windows
+SHORT_FIELD_TOKENS = 24
+CHUNK_TOKENS = 120
+CHUNK_OVERLAP = 20
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(str(text).lower())
+
+def flatten(doc: Dict[str, Any], prefix: str = "") -> List[Tuple[str, str]]:
+    """``(field, text)`` pairs for a document; nested maps become ``parent.child``"""
+    pairs = []
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if value is None or value == "" or value == [] or value == {}:
+            continue
+        if isinstance(value, dict):
+            pairs.extend(flatten(value, f"{name}."))
+        elif isinstance(value, (list, tuple)):
+            pairs.append((name, ", ".join(str(v) for v in value if v is not None)))
+        else:
+            pairs.append((name, str(value)))
+    return pairs
+
+def _weight(field: str) -> float:
+    return FIELD_WEIGHTS.get(field.split(".")[-1], DEFAULT_FIELD_WEIGHT)
+
+def chunk_document(doc: Dict[str, Any]) -> List[Tuple[Counter, float, str]]:
+    """
+    Field-aware chunks of one record as ``(weighted term counts, weighted
+    length, text)``. Short fields (names, categories, places) go in every
+    chunk so a match on them applies to the whole record; long text fields
+    are split into overlapping windows.
+    """
+    head_terms, head_length, head_text = Counter(), 0.0, []
+    windows = []
+    for field, text in flatten(doc):
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        weight = _weight(field)
+        if len(tokens) <= SHORT_FIELD_TOKENS:
+            for token in tokens:
+                head_terms[token] += weight
+            head_length += weight * len(tokens)
+            head_text.append(f"{field}: {text}")
+            continue
+        step = CHUNK_TOKENS - CHUNK_OVERLAP
+        for start in range(0, max(len(tokens) - CHUNK_OVERLAP, 1), step):
+            windows.append((field, weight, tokens[start:start + CHUNK_TOKENS]))
+    if not windows:
+        return [(head_terms, head_length, "; ".join(head_text))]
+    chunks = []
+    for field, weight, tokens in windows:
+        terms = Counter(head_terms)
+        for token in tokens:
+            terms[token] += weight
+        chunks.append((terms, head_length + weight * len(tokens),
+                       "; ".join(head_text + [f"{field}: {' '.join(tokens)}"])))
+    return chunks
+
+class LocalEmbedder:
+    """Optional dense retrieval with a local sentence-transformers model"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        import numpy as np
+        self._np = np
+        self.model = SentenceTransformer(model_name)
+        self.vectors = None
+
+    def fit(self, texts: List[str]):
+        self.vectors = self.model.encode(texts, batch_size=128, normalize_embeddings=True, show_progress_bar=False)
+
+    def search(self, query: str, k: int) -> List[int]:
+        query_vector = self.model.encode([query], normalize_embeddings=True)[0]
+        scores = self.vectors @ query_vector
+        k = min(k, len(scores))
+        top = self._np.argpartition(-scores, k - 1)[:k]
+        return [int(i) for i in top[self._np.argsort(-scores[top])]]
+
+class RecordIndex:
+    """
+    Retrieval index over loaded Firestore records.
+
+    BM25 over field-weighted chunks (what/where fields weigh more than free
+    text), optionally fused with local embeddings by reciprocal rank. A
+    record's score is its best chunk's score. Building is one pass over
+    the records; a query only touches the postings of its own terms.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], use_embeddings: bool = False,
+                 k1: float = 1.2, b: float = 0.75):
+        self.records = records
+        self.k1, self.b = k1, b
+        self._chunk_doc: List[int] = []
+        self._chunk_length: List[float] = []
+        self._chunk_text: List[str] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc_index, record in enumerate(records):
+            for terms, length, text in chunk_document(record):
+                chunk_id = len(self._chunk_doc)
+                self._chunk_doc.append(doc_index)
+                self._chunk_length.append(length)
+                if use_embeddings:
+                    self._chunk_text.append(text)
+                for term, tf in terms.items():
+                    self._postings[term].append((chunk_id, tf))
+        chunks = len(self._chunk_doc)
+        self._avg_length = (sum(self._chunk_length) / chunks) if chunks else 0.0
+        self._idf = {
+            term: math.log(1 + (chunks - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        self.embedder = None
+        if use_embeddings and chunks:
+            try:
+                self.embedder = LocalEmbedder()
+                self.embedder.fit(self._chunk_text)
+            except Exception as e:
+                logger.warning(f"Local embeddings unavailable, using BM25 only: {e}")
+                self.embedder = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _bm25(self, query: str, k: int) -> List[Tuple[float, int]]:
+        scores = defaultdict(float)
+        k1, b, avg = self.k1, self.b, self._avg_length or 1.0
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for chunk_id, tf in self._postings[term]:
+                norm = k1 * (1 - b + b * self._chunk_length[chunk_id] / avg)
+                scores[chunk_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, ((score, chunk_id) for chunk_id, score in scores.items()))
+
+    def search(self, query: str, k: int = 40) -> List[int]:
+        """Indices of the ``k`` most relevant records, best first"""
+        depth = k * 4
+        ranked_chunks = [chunk_id for _, chunk_id in self._bm25(query, depth)]
+        if self.embedder is not None:
+            # Reciprocal rank fusion of the lexical and dense rankings
+            fused = defaultdict(float)
+            for ranking in (ranked_chunks, self.embedder.search(query, depth)):
+                for rank, chunk_id in enumerate(ranking):
+                    fused[chunk_id] += 1.0 / (60 + rank)
+            ranked_chunks = sorted(fused, key=fused.get, reverse=True)
+        results, seen = [], set()
+        for chunk_id in ranked_chunks:
+            doc_index = self._chunk_doc[chunk_id]
+            if doc_index not in seen:
+                seen.add(doc_index)
+                results.append(doc_index)
+                if len(results) == k:
+                    break
+        return results
+
+    def overview(self, max_fields: int = 5, top_values: int = 8, max_distinct: int = 200) -> Dict[str, Any]:
+        """
+        Constant-size description of the whole collection: record count and
+        the most common values of its low-cardinality text fields.
+        """
+        values = defaultdict(Counter)
+        for record in self.records:
+            for field, text in flatten(record):
+                if len(text) <= 60:
+                    counter = values[field]
+                    if len(counter) <= max_distinct:
+                        counter[text] += 1
+        fields = [
+            (field, counter) for field, counter in values.items()
+            # Skip identifiers (every value distinct) and fields most records lack
+            if len(counter) <= max_distinct and len(counter) < sum(counter.values()) >= len(self.records) / 2
+        ]
+        fields.sort(key=lambda pair: (-_weight(pair[0]), len(pair[1])))
+        return {
+            "total_records": len(self.records),
+            "top_values": {field: counter.most_common(top_values) for field, counter in fields[:max_fields]},
+        }
+
+def _cell(value: Any, max_value_chars: int) -> str:
+    text = json.dumps(value, separators=(",", ":"), default=str) if isinstance(value, (dict, list)) else str(value)
+    text = text.replace("|", "/").replace("\n", " ")
+    return text if len(text) <= max_value_chars else text[:max_value_chars - 1] + "…"
+
+def encode_records(records: Iterable[Dict[str, Any]], max_chars: int = 24000,
+                   max_value_chars: int = 300) -> Tuple[str, int]:
+    """
+    Compact table encoding of records for a prompt: one header line of
+    field names, then one ``|``-separated line per record, empty values
+    left blank, long values truncated. Stops before ``max_chars``. Returns
+    the text and how many records it holds.
+    """
+    records = list(records)
+    counts = Counter(key for record in records for key, value in record.items() if value not in (None, "", [], {}))
+    fields = [field for field, _ in counts.most_common()]
+    lines = ["|".join(fields)]
+    used = len(lines[0])
+    included = 0
+    for record in records:
+        line = "|".join(_cell(record[f], max_value_chars) if record.get(f) not in (None, "", [], {}) else ""
+                        for f in fields)
+        if used + len(line) + 1 > max_chars:
+            break
+        lines.append(line)
+        used += len(line) + 1
+        included += 1
+    return "\n".join(lines), included
@@ -0,0 +1,152 @@
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from retrieval import encode_records
+
+# Longest answer kept verbatim in history; older answers rarely need more to stay coherent
+MAX_HISTORY_ANSWER_CHARS = 1500
+MAX_DIGEST_FIELDS = 40
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English and JSON)"""
+    return len(text) // 4 + 1
+
+def _example(value: Any, limit: int = 40) -> str:
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def dataset_digest(name: str, records: List[Dict[str, Any]], overview: Dict[str, Any]) -> str:
+    """
+    Compact, size-bounded description of a loaded dataset: record count,
+    each field's type, fill rate and an example, and the most common values
+    of its categorical fields.
+    """
+    filled, types, examples = Counter(), {}, {}
+    for record in records:
+        for field, value in record.items():
+            if value in (None, "", [], {}):
+                continue
+            filled[field] += 1
+            if field not in types:
+                types[field] = type(value).__name__
+                examples[field] = _example(value)
+    total = len(records) or 1
+    lines = [f"Dataset '{name}': {len(records)} records loaded.",
+             "Fields (type, share of records with a value, example):"]
+    for field, count in filled.most_common(MAX_DIGEST_FIELDS):
+        lines.append(f"- {field} ({types[field]}, {count * 100 // total}%): {examples[field]}")
+    top_values = overview.get("top_values") or {}
+    if top_values:
+        lines.append("Most common values:")
+        for field, values in top_values.items():
+            lines.append(f"- {field}: " + ", ".join(f"{_example(v, 30)} ({c})" for v, c in values))
+    return "\n".join(lines)
+
+def _fingerprints(records: List[Dict[str, Any]]) -> Dict[Any, int]:
+    return {record.get("id", i): hash(repr(sorted(record.items(), key=lambda item: item[0])))
+            for i, record in enumerate(records)}
+
+class SessionContext:
+    """
+    Conversation state for one chat session.
+
+    The dataset digest is built once per dataset version and meant to be
+    given to the model once (a cached context or system instruction), not
+    repeated in every turn. When the data changes a little, the digest is
+    kept and the next turn carries a short delta instead; when it changes
+    by more than ``rebuild_ratio`` of the records, or another collection is
+    loaded, the digest is rebuilt. Each turn sends the question, its
+    evidence and as much recent history as fits in ``history_tokens``.
+    """
+
+    def __init__(self, history_tokens: int = 3000, rebuild_ratio: float = 0.2, max_delta_chars: int = 4000):
+        self.history_tokens = history_tokens
+        self.rebuild_ratio = rebuild_ratio
+        self.max_delta_chars = max_delta_chars
+        self.history: List[Tuple[str, str]] = []
+        self.dataset_key = None
+        self.digest: Optional[str] = None
+        self._baseline: Dict[Any, int] = {}
+        self._pending_delta: Optional[str] = None
+        self._pending_fingerprints: Dict[Any, int] = {}
+        self._turn_note: Optional[str] = None
+        self.last_turn: Dict[str, Any] = {}
+
+    def prepare(self, name: str, version: Any, records: List[Dict[str, Any]], overview: Dict[str, Any]) -> bool:
+        """
+        Bind the session to a dataset version. Returns True when the digest
+        was rebuilt, i.e. the model's dataset context has to be replaced.
+        """
+        if (name, version) == self.dataset_key:
+            return False
+        current = _fingerprints(records)
+        same_dataset = self.dataset_key is not None and self.dataset_key[0] == name and self.digest
+        self.dataset_key = (name, version)
+        if same_dataset:
+            # Compared with what the model was last told, not with the previous version
+            added = [key for key in current if key not in self._baseline]
+            removed = [key for key in self._baseline if key not in current]
+            changed = [key for key in current if key in self._baseline and self._baseline[key] != current[key]]
+            if len(added) + len(removed) + len(changed) <= self.rebuild_ratio * max(len(self._baseline), 1):
+                self._pending_delta = self._describe_delta(records, current, added, removed, changed)
+                self._pending_fingerprints = current
+                return False
+        self.digest = dataset_digest(name, records, overview)
+        self._baseline = current
+        self._pending_delta = None
+        return True
+
+    def _describe_delta(self, records, current, added, removed, changed) -> Optional[str]:
+        if not (added or removed or changed):
+            return None
+        by_key = {record.get("id", i): record for i, record in enumerate(records)}
+        updated = [by_key[key] for key in added + changed]
+        text = (f"Data changes since the dataset summary: {len(added)} new, {len(changed)} updated, "
+                f"{len(removed)} removed records ({len(records)} loaded now).")
+        if removed:
+            text += f"\nRemoved ids: {', '.join(str(key) for key in removed[:50])}"
+        if updated:
+            table, included = encode_records(updated, max_chars=self.max_delta_chars)
+            text += f"\nNew and updated records ({included} of {len(updated)}):\n{table}"
+        return text
+
+    def turn(self, question: str, evidence: str) -> List[Tuple[str, str]]:
+        """``(role, text)`` contents for one turn: recent history, then the question with its evidence"""
+        parts = []
+        self._turn_note = None
+        if self._pending_delta:
+            parts.append(self._pending_delta)
+            # The delta is sent once; its summary line stays in history with this question
+            self._turn_note = self._pending_delta.splitlines()[0]
+            self._baseline = self._pending_fingerprints
+            self._pending_delta = None
+        parts.append(evidence)
+        parts.append(f"User Query: {question}")
+        message = "\n\n".join(parts)
+
+        history, budget = [], self.history_tokens
+        for past_question, answer in reversed(self.history):
+            cost = estimate_tokens(past_question) + estimate_tokens(answer)
+            if cost > budget:
+                break
+            history[:0] = [("user", past_question), ("model", answer)]
+            budget -= cost
+        contents = history + [("user", message)]
+        self.last_turn = {
+            "history_turns": len(history) // 2,
+            "delta": len(parts) > 2,
+            "tokens_estimate": sum(estimate_tokens(text) for _, text in contents),
+        }
+        return contents
+
+    def record(self, question: str, answer: str):
+        """Remember a finished turn (the question without its evidence, the answer capped in length)"""
+        if len(answer) > MAX_HISTORY_ANSWER_CHARS:
+            answer = answer[:MAX_HISTORY_ANSWER_CHARS - 1] + "…"
+        if self._turn_note:
+            question = f"{self._turn_note}\n{question}"
+            self._turn_note = None
+        self.history.append((question, answer))
+
+    def clear_history(self):
+        self.history = []
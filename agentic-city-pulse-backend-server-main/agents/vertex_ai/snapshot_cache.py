@@ -0,0 +1,310 @@
+import time
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+
+# Document fields that are rewritten on every write, tried in order to pick up new and changed documents.
+# Creation times (created_at, timestamp, ...) never move on an update, so they can't track changes.
+UPDATE_FIELDS = ("updated_at", "updatedAt", "updateTime", "lastUpdated")
+DOCUMENT_ID = "__name__"
+
+def _where(query, field: str, op: str, value: Any):
+    try:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+        return query.where(filter=FieldFilter(field, op, value))
+    except ImportError:
+        return query.where(field, op, value)
+
+class CollectionSnapshot:
+    """
+    Local copy of one collection: documents paged in so far plus changes
+    picked up since. ``version`` goes up on every change, so callers can
+    tell when data derived from it is stale.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.datetime_fields = set()
+        self.paged = 0
+        self.cursor = None
+        self.exhausted = False
+        self.update_field: Optional[str] = None
+        self.high_water = None
+        # Documents picked up by delta pulls outside the paged range (delta mode only)
+        self.outside = set()
+        self.version = 0
+        self.synced_at = 0.0
+        self.resynced_at = 0.0
+        self.listeners = []
+        self.following = False
+        self.lock = threading.RLock()
+        self._records = (None, None, None)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def apply(self, doc, move_to_end: bool = False):
+        """Store a document snapshot (datetimes become ISO strings, as the chatbot expects)"""
+        raw = doc.to_dict() or {}
+        data = dict(raw)
+        data['id'] = doc.id
+        for key, value in raw.items():
+            if isinstance(value, datetime):
+                data[key] = value.isoformat()
+                self.datetime_fields.add(key)
+        if self.update_field is None:
+            self.update_field = next(
+                (f for f in UPDATE_FIELDS if isinstance(raw.get(f), (datetime, int, float))
+                 and not isinstance(raw.get(f), bool)), None)
+        value = raw.get(self.update_field) if self.update_field else None
+        if value is not None and (self.high_water is None or
+                                  (isinstance(value, type(self.high_water)) and value > self.high_water)):
+            self.high_water = value
+        if move_to_end:
+            self.docs.pop(doc.id, None)
+        self.docs[doc.id] = data
+        self.version += 1
+
+    def remove(self, doc_id: str):
+        self.outside.discard(doc_id)
+        if self.docs.pop(doc_id, None) is not None:
+            self.version += 1
+
+    def records(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        The ``limit`` most recently added or changed documents. The same list
+        object is returned until the snapshot changes, so indexes built over
+        it can be reused.
+        """
+        with self.lock:
+            version, cached_limit, records = self._records
+            if version != self.version or cached_limit != limit:
+                records = list(self.docs.values())[-limit:]
+                self._records = (self.version, limit, records)
+            return records
+
+class SnapshotCache:
+    """
+    Per-collection snapshot cache for the chatbot, so repeated loads,
+    summaries and Streamlit reruns cost no Firestore reads.
+
+    Documents are paged in with cursors (``order_by(__name__)`` +
+    ``start_after``) up to the requested limit; raising the limit continues
+    from the last cursor instead of starting over. The paged range is kept
+    current in one of two ways:
+
+    - listener mode: each paged range gets a snapshot listener bounded by
+      document name (open-ended once the collection is exhausted), so
+      edits, deletes and new documents inside it arrive as ``MODIFIED``,
+      ``REMOVED`` and ``ADDED`` changes. The listener's first snapshot
+      re-reads the range it covers.
+    - delta mode: the whole range is re-read every ``resync_interval``
+      seconds, which drops deleted documents and picks up edits.
+
+    When the collection has a true update field (``UPDATE_FIELDS``, stored
+    as a timestamp or number), documents written after the newest one seen
+    are also followed, by a listener or by delta pulls at most every
+    ``sync_interval`` seconds, so new documents outside the paged range show
+    up too. Creation times don't move on an update and Firestore's own
+    ``update_time`` is not queryable, so without such a field new documents
+    outside the range are only seen once the range reaches them or on
+    ``refresh``. Collection names are cached for ``listing_ttl`` seconds.
+
+    Works with any client exposing the Firestore API: the real client
+    (also against the emulator via ``FIRESTORE_EMULATOR_HOST``) or the
+    in-memory fake in ``benchmarks/memory_firestore.py``.
+    """
+
+    def __init__(self, db, page_size: int = 500, listing_ttl: float = 300.0, sync_interval: float = 30.0,
+                 resync_interval: float = 600.0, use_listener: bool = True):
+        self.db = db
+        self.page_size = page_size
+        self.listing_ttl = listing_ttl
+        self.sync_interval = sync_interval
+        self.resync_interval = resync_interval
+        self.use_listener = use_listener
+        self._snapshots: Dict[str, CollectionSnapshot] = {}
+        self._listing = (0.0, None)
+        self._lock = threading.Lock()
+
+    def collection_names(self) -> List[str]:
+        listed_at, names = self._listing
+        if names is None or time.time() - listed_at >= self.listing_ttl:
+            names = [collection.id for collection in self.db.collections()]
+            self._listing = (time.time(), names)
+        return list(names)
+
+    def snapshot(self, name: str) -> CollectionSnapshot:
+        with self._lock:
+            if name not in self._snapshots:
+                self._snapshots[name] = CollectionSnapshot(name)
+            return self._snapshots[name]
+
+    def load(self, name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Up to ``limit`` documents of a collection, reading from Firestore only what the cache lacks"""
+        snapshot = self.snapshot(name)
+        with snapshot.lock:
+            if snapshot.paged < limit and not snapshot.exhausted:
+                after = snapshot.cursor
+                ids = self._page(snapshot, limit)
+                if self.use_listener:
+                    self._listen(snapshot, self._range_query(snapshot, after), expected=ids)
+            self._keep_current(snapshot)
+        return snapshot.records(limit)
+
+    def _page(self, snapshot: CollectionSnapshot, limit: int) -> List[str]:
+        """Read the next documents by name up to ``limit``; returns their ids"""
+        query = self.db.collection(snapshot.name).order_by(DOCUMENT_ID)
+        ids = []
+        while snapshot.paged < limit and not snapshot.exhausted:
+            size = min(self.page_size, limit - snapshot.paged)
+            page_query = query.limit(size)
+            if snapshot.cursor is not None:
+                page_query = page_query.start_after(snapshot.cursor)
+            page = list(page_query.stream())
+            for doc in page:
+                snapshot.apply(doc)
+                ids.append(doc.id)
+            snapshot.paged += len(page)
+            if page:
+                snapshot.cursor = page[-1]
+            if len(page) < size:
+                snapshot.exhausted = True
+        snapshot.outside.difference_update(ids)
+        snapshot.synced_at = snapshot.resynced_at = time.time()
+        return ids
+
+    def _range_query(self, snapshot: CollectionSnapshot, after=None):
+        """Documents by name after ``after`` up to the cursor, or to the end once the collection is exhausted"""
+        query = self.db.collection(snapshot.name).order_by(DOCUMENT_ID)
+        if after is not None:
+            query = query.start_after(after)
+        if not snapshot.exhausted and snapshot.cursor is not None:
+            query = query.end_at(snapshot.cursor)
+        return query
+
+    def _changes_query(self, snapshot: CollectionSnapshot):
+        query = self.db.collection(snapshot.name)
+        if snapshot.high_water is not None:
+            query = _where(query, snapshot.update_field, ">", snapshot.high_water)
+        return query.order_by(snapshot.update_field)
+
+    def _keep_current(self, snapshot: CollectionSnapshot):
+        if self.use_listener:
+            if snapshot.update_field is not None and not snapshot.following:
+                snapshot.following = True
+                self._listen(snapshot, self._changes_query(snapshot))
+            return
+        now = time.time()
+        if now - snapshot.resynced_at >= self.resync_interval:
+            self._resync(snapshot)
+        elif snapshot.update_field is not None and now - snapshot.synced_at >= self.sync_interval:
+            self._pull_changes(snapshot)
+
+    def _pull_changes(self, snapshot: CollectionSnapshot):
+        for doc in self._changes_query(snapshot).stream():
+            if doc.id not in snapshot.docs:
+                snapshot.outside.add(doc.id)
+            snapshot.apply(doc, move_to_end=True)
+        snapshot.synced_at = time.time()
+
+    def _resync(self, snapshot: CollectionSnapshot):
+        """Re-read the paged range and the documents picked up outside it, dropping any that were deleted"""
+        seen = set()
+        query = self._range_query(snapshot)
+        cursor = None
+        while True:
+            page_query = query.limit(self.page_size)
+            if cursor is not None:
+                page_query = page_query.start_after(cursor)
+            page = list(page_query.stream())
+            for doc in page:
+                snapshot.apply(doc)
+                seen.add(doc.id)
+            if len(page) < self.page_size:
+                break
+            cursor = page[-1]
+        collection = self.db.collection(snapshot.name)
+        for doc_id in list(snapshot.outside - seen):
+            doc = collection.document(doc_id).get()
+            if doc.exists:
+                snapshot.apply(doc)
+                seen.add(doc_id)
+        for doc_id in set(snapshot.docs) - seen:
+            snapshot.remove(doc_id)
+        snapshot.resynced_at = time.time()
+        if snapshot.update_field is not None:
+            self._pull_changes(snapshot)
+
+    @staticmethod
+    def _listen(snapshot: CollectionSnapshot, query, expected: Iterable[str] = ()):
+        """
+        Attach a listener that applies the query's changes to the snapshot.
+        Documents in ``expected`` were just read; any missing from the
+        listener's first snapshot were deleted in between.
+        """
+        expected = set(expected)
+        first = [True]
+
+        def on_snapshot(docs, changes, read_time):
+            with snapshot.lock:
+                if first[0]:
+                    first[0] = False
+                    present = {doc.id for doc in docs}
+                    for doc_id in expected - present:
+                        snapshot.remove(doc_id)
+                    for doc in docs:
+                        snapshot.apply(doc, move_to_end=doc.id not in expected)
+                else:
+                    for change in changes:
+                        # Names never change and update fields only move forward, so leaving the query means deleted
+                        if change.type.name == "REMOVED":
+                            snapshot.remove(change.document.id)
+                        else:
+                            snapshot.apply(change.document, move_to_end=True)
+                snapshot.synced_at = time.time()
+
+        snapshot.listeners.append(query.on_snapshot(on_snapshot))
+
+    def refresh(self, name: str):
+        """Drop a collection's snapshot so the next load re-reads it"""
+        with self._lock:
+            snapshot = self._snapshots.pop(name, None)
+        if snapshot is not None:
+            self._unsubscribe(snapshot)
+        self._listing = (0.0, None)
+
+    @staticmethod
+    def _unsubscribe(snapshot: CollectionSnapshot):
+        listeners, snapshot.listeners = snapshot.listeners, []
+        snapshot.following = False
+        for listener in listeners:
+            listener.unsubscribe()
+
+    def summary(self, name: str) -> Dict[str, Any]:
+        """Record count, fields and types of the cached documents"""
+        snapshot = self.snapshot(name)
+        with snapshot.lock:
+            data_types = {}
+            for record in snapshot.docs.values():
+                for key, value in record.items():
+                    if value is not None and key not in data_types:
+                        data_types[key] = type(value).__name__
+            return {
+                "total_records": len(snapshot),
+                "collections": name,
+                "sample_fields": list(data_types),
+                "data_types": data_types,
+                "complete": snapshot.exhausted,
+                "live": bool(snapshot.listeners),
+                "synced_at": datetime.fromtimestamp(snapshot.synced_at).isoformat() if snapshot.synced_at else None,
+                "version": snapshot.version,
+            }
+
+    def close(self):
+        """Stop all listeners"""
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+        for snapshot in snapshots:
+            self._unsubscribe(snapshot)
@@ -1,21 +1,48 @@
 import os
 import json
+import time
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, Future
 import streamlit as st
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator
+from datetime import datetime, timedelta
 import google.cloud.aiplatform as aiplatform
 from google.cloud import firestore
 from google.auth import default
 import vertexai
 from vertexai.language_models import TextGenerationModel
-from vertexai.generative_models import GenerativeModel
+from vertexai.generative_models import GenerativeModel, Content, Part
 import firebase_admin
 from firebase_admin import credentials, firestore as admin_firestore
 from dotenv import load_dotenv
+from retrieval import RecordIndex, encode_records
+from query_planner import QueryPlanner, QueryPlan, run_local, run_firestore
+from snapshot_cache import SnapshotCache
+from session_context import SessionContext, estimate_tokens
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv('hackathon/config.env')
 
+MODEL_NAME = "gemini-2.5-flash"
+
+SYSTEM_INSTRUCTION = """You are a helpful assistant that analyzes city pulse data loaded from Firestore.
+The dataset summary below describes all loaded records. Each question comes with its evidence: either
+the exact result of a query (the numbers are exact; do not recompute or estimate them, say so if the
+result is empty, and mention the filters and time range applied) or the records most relevant to the
+question (only a subset; use the dataset summary for collection-wide counts).
+
+Please analyze the data and provide a comprehensive answer. If the query is about:
+- Civic issues: Look for patterns, categories, locations, and trends
+- Data statistics: Provide counts, summaries, and insights
+- Specific locations: Filter and analyze data for particular areas
+- Time-based analysis: Look at timestamps and temporal patterns
+
+Provide your response in a clear, structured format with relevant insights and data points."""
+
 class VertexAIFirestoreChatbot:
     def __init__(self):
         """Initialize the Vertex AI Firestore Chatbot"""
@@ -26,11 +53,50 @@ class VertexAIFirestoreChatbot:
         # Initialize Firebase
         self._initialize_firebase()
         
+        # Local snapshots of loaded collections, kept current from Firestore
+        self.cache = SnapshotCache(
+            self.db,
+            page_size=int(os.getenv('CHATBOT_PAGE_SIZE', '500')),
+            listing_ttl=float(os.getenv('CHATBOT_LISTING_TTL', '300')),
+            sync_interval=float(os.getenv('CHATBOT_SYNC_INTERVAL', '30')),
+            resync_interval=float(os.getenv('CHATBOT_RESYNC_INTERVAL', '600')),
+            use_listener=os.getenv('CHATBOT_LIVE_SYNC', 'true').lower() == 'true',
+        ) if self.db else None
+        
         # Initialize Vertex AI
         self._initialize_vertex_ai()
         
         # Initialize the generative model
-        self.model = GenerativeModel("gemini-2.5-flash")
+        self.model = GenerativeModel(MODEL_NAME)
+        
+        # Retrieval settings: each question sends at most top_k records within context_chars
+        self.top_k = int(os.getenv('CHATBOT_TOP_K', '40'))
+        self.context_chars = int(os.getenv('CHATBOT_CONTEXT_CHARS', '24000'))
+        self.use_embeddings = os.getenv('CHATBOT_EMBEDDINGS', 'false').lower() == 'true'
+        self._index = None
+        self._index_overview = None
+        self._planner = None
+        
+        # Conversation state: the dataset digest goes to the model once per dataset version
+        self.session = SessionContext(history_tokens=int(os.getenv('CHATBOT_HISTORY_TOKENS', '3000')))
+        self.use_context_cache = os.getenv('CHATBOT_CONTEXT_CACHE', 'true').lower() == 'true'
+        self.cache_min_tokens = int(os.getenv('CHATBOT_CACHE_MIN_TOKENS', '2048'))
+        self.cache_ttl = int(os.getenv('CHATBOT_CACHE_TTL', '3600'))
+        self._cached_content = None
+        self._session_model = None
+        # Answer and stats of the current turn; writes from older (cancelled) turns are dropped
+        self.last_turn: Dict[str, Any] = {}
+        self.last_answer = ""
+        self.turn_id = 0
+        
+        # Question preparation and index builds run off the UI thread; a new answer cancels the previous one
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chatbot")
+        self._lock = threading.RLock()
+        self._turn_lock = threading.Lock()
+        self._cancel: Optional[threading.Event] = None
+        
+        # Streamlit drops a session's state when the session ends; stop its listeners and workers then
+        self._finalizer = weakref.finalize(self, _release, self.cache, self._executor)
         
     def _initialize_firebase(self):
         """Initialize Firebase Admin SDK"""
@@ -70,25 +136,12 @@ class VertexAIFirestoreChatbot:
                 st.error(f"❌ Vertex AI fallback initialization failed: {e2}")
     
     def fetch_data_from_firestore(self, collection_name: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Fetch data from Firestore collection"""
+        """Fetch data from Firestore collection (served from the snapshot cache once loaded)"""
         if not self.db:
             return []
         
         try:
-            collection_ref = self.db.collection(collection_name)
-            docs = collection_ref.limit(limit).stream()
-            
-            results = []
-            for doc in docs:
-                doc_data = doc.to_dict()
-                doc_data['id'] = doc.id
-                # Convert datetime objects to strings for JSON serialization
-                for key, value in doc_data.items():
-                    if isinstance(value, datetime):
-                        doc_data[key] = value.isoformat()
-                results.append(doc_data)
-            
-            return results
+            return self.cache.load(collection_name, limit)
         except Exception as e:
             st.error(f"Error fetching data from Firestore: {e}")
             return []
@@ -99,61 +152,228 @@ class VertexAIFirestoreChatbot:
             return []
         
         try:
-            collections = self.db.collections()
-            return [collection.id for collection in collections]
+            return self.cache.collection_names()
         except Exception as e:
             st.error(f"Error fetching collection names: {e}")
             return []
     
-    def query_data_with_ai(self, user_query: str, collection_data: List[Dict[str, Any]]) -> str:
-        """Use Vertex AI to query and analyze the data"""
-        if not collection_data:
-            return "No data available to query."
-        
-        # Prepare context for the AI model
-        context = f"""
-        You are a helpful assistant that analyzes city pulse data. You have access to the following data from Firestore:
-        
-        {json.dumps(collection_data, indent=2)}
-        
-        User Query: {user_query}
-        
-        Please analyze the data and provide a comprehensive answer. If the query is about:
-        - Civic issues: Look for patterns, categories, locations, and trends
-        - Data statistics: Provide counts, summaries, and insights
-        - Specific locations: Filter and analyze data for particular areas
-        - Time-based analysis: Look at timestamps and temporal patterns
-        
-        Provide your response in a clear, structured format with relevant insights and data points.
+    def get_index(self, collection_data: List[Dict[str, Any]]) -> RecordIndex:
+        """Retrieval index for the loaded data, built once per load"""
+        with self._lock:
+            if self._index is None or self._index.records is not collection_data:
+                self._index = RecordIndex(collection_data, use_embeddings=self.use_embeddings)
+                self._index_overview = self._index.overview()
+                self._planner = QueryPlanner(collection_data)
+            return self._index
+    
+    def run_plan(self, plan: QueryPlan, collection_data: List[Dict[str, Any]],
+                 collection_name: Optional[str] = None) -> Dict[str, Any]:
+        """Execute a query plan in Firestore where possible, else over the loaded data"""
+        rows = None
+        if collection_name and self.db:
+            try:
+                rows = run_firestore(plan, self.db.collection(collection_name),
+                                     datetime_fields=self.cache.snapshot(collection_name).datetime_fields,
+                                     numeric_fields=self._planner.numeric)
+            except Exception as e:
+                # e.g. a composite index the query needs does not exist
+                logger.warning(f"Firestore pushdown failed, computing locally: {e}")
+                rows = None
+        if rows is not None:
+            scope = f"the whole '{collection_name}' collection (computed in Firestore)"
+        else:
+            rows = run_local(plan, collection_data)
+            scope = f"the {len(collection_data)} loaded records"
+        return {"plan": plan.describe(), "computed_over": scope, "rows": rows}
+    
+    def _model_for_dataset(self, digest: str) -> GenerativeModel:
+        """Model carrying the instructions and dataset digest, as cached context where possible"""
+        instruction = f"{SYSTEM_INSTRUCTION}\n\n{digest}"
+        if self._cached_content is not None:
+            try:
+                self._cached_content.delete()
+            except Exception as e:
+                logger.warning(f"Could not delete previous context cache: {e}")
+            self._cached_content = None
+        if self.use_context_cache and estimate_tokens(instruction) >= self.cache_min_tokens:
+            try:
+                from vertexai.preview import caching
+                from vertexai.preview.generative_models import GenerativeModel as CachedModel
+                self._cached_content = caching.CachedContent.create(
+                    model_name=MODEL_NAME,
+                    system_instruction=instruction,
+                    ttl=timedelta(seconds=self.cache_ttl),
+                )
+                return CachedModel.from_cached_content(cached_content=self._cached_content)
+            except Exception as e:
+                logger.info(f"Context caching unavailable, sending the digest as a system instruction: {e}")
+                self._cached_content = None
+        return GenerativeModel(MODEL_NAME, system_instruction=instruction)
+    
+    def _bind_dataset(self, collection_data: List[Dict[str, Any]], collection_name: Optional[str]):
+        """Give the model the dataset digest once per dataset version"""
+        self.get_index(collection_data)
+        name = collection_name or "loaded data"
+        version = self.cache.snapshot(collection_name).version if self.cache and collection_name else id(collection_data)
+        if self.session.prepare(name, version, collection_data, self._index_overview) or self._session_model is None:
+            self._session_model = self._model_for_dataset(self.session.digest)
+    
+    def prepare_turn(self, user_query: str, collection_data: List[Dict[str, Any]],
+                     collection_name: Optional[str] = None) -> List[Content]:
+        """Bind the dataset and gather the evidence for one question; safe to run off the UI thread"""
+        with self._lock:
+            self._bind_dataset(collection_data, collection_name)
+            
+            # Analytical questions are computed exactly; the model only phrases the result table
+            plan = self._planner.plan(user_query)
+            if plan is not None:
+                result = self.run_plan(plan, collection_data, collection_name)
+                evidence = (
+                    f"Exact result of a query over {result['computed_over']}:\n"
+                    f"Query plan: {json.dumps(result['plan'], separators=(',', ':'))}\n"
+                    f"Result: {json.dumps(result['rows'], separators=(',', ':'), default=str)}"
+                )
+            else:
+                # Only the records most relevant to the question go into the prompt
+                hits = self._index.search(user_query, k=self.top_k)
+                records, included = encode_records((collection_data[i] for i in hits), max_chars=self.context_chars)
+                evidence = (
+                    f"The {included} records most relevant to the question, out of {len(collection_data)} loaded "
+                    f"(first line is the field names, one record per line, fields separated by |):\n{records}"
+                )
+            return [Content(role=role, parts=[Part.from_text(text)])
+                    for role, text in self.session.turn(user_query, evidence)]
+    
+    def prepare_async(self, user_query: str, collection_data: List[Dict[str, Any]],
+                      collection_name: Optional[str] = None) -> Future:
+        """Start preparing a question in the background (see prepare_turn)"""
+        return self._executor.submit(self.prepare_turn, user_query, collection_data, collection_name)
+    
+    def warm_async(self, collection_data: List[Dict[str, Any]]) -> Future:
+        """Build the retrieval index in the background right after a load"""
+        return self._executor.submit(self.get_index, collection_data)
+    
+    def cancel(self):
+        """Stop the answer currently being streamed, if any"""
+        with self._turn_lock:
+            if self._cancel is not None:
+                self._cancel.set()
+    
+    def new_turn(self) -> int:
+        """Start a turn: cancel the answer being streamed and return the new turn's id"""
+        with self._turn_lock:
+            if self._cancel is not None:
+                self._cancel.set()
+            self._cancel = threading.Event()
+            self.turn_id += 1
+            self.last_turn, self.last_answer = {}, ""
+            return self.turn_id
+    
+    def answer_of(self, turn_id: int) -> str:
+        """Text streamed so far for ``turn_id`` (empty once a newer turn started)"""
+        with self._turn_lock:
+            return self.last_answer if turn_id == self.turn_id else ""
+    
+    def _append_answer(self, turn_id: int, text: str):
+        with self._turn_lock:
+            if turn_id == self.turn_id:
+                self.last_answer += text
+    
+    def _set_turn_stats(self, turn_id: int, stats: Dict[str, Any]):
+        with self._turn_lock:
+            if turn_id == self.turn_id:
+                self.last_turn = stats
+    
+    def close(self):
+        """Cancel the current answer, stop snapshot listeners and worker threads"""
+        self.cancel()
+        self._finalizer()
+    
+    def stream_data_with_ai(self, user_query: str, collection_data: List[Dict[str, Any]],
+                            collection_name: Optional[str] = None, prepared: Future = None,
+                            turn_id: int = None) -> Iterator[str]:
+        """
+        Yield the answer as the model generates it. Starting another answer
+        cancels this one; an interrupted answer is kept in the session
+        history marked as such. ``turn_id`` comes from ``new_turn`` (a new
+        turn is started if omitted); ``last_answer`` and ``last_turn`` only
+        take writes from the newest turn.
         """
+        if not collection_data:
+            yield "No data available to query."
+            return
         
+        if turn_id is None:
+            turn_id = self.new_turn()
+        with self._turn_lock:
+            if turn_id != self.turn_id:
+                # Superseded before it started
+                return
+            cancel = self._cancel
+        started = time.perf_counter()
+        parts, stream, usage, first_token, finished = [], None, None, None, False
         try:
-            response = self.model.generate_content(context)
-            return response.text
+            contents = prepared.result() if prepared is not None else \
+                self.prepare_turn(user_query, collection_data, collection_name)
+            if cancel.is_set():
+                return
+            stream = self._session_model.generate_content(contents, stream=True)
+            for chunk in stream:
+                if cancel.is_set():
+                    return
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text (e.g. only finish metadata)
+                    continue
+                if not text:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(text)
+                self._append_answer(turn_id, text)
+                yield text
+            finished = True
         except Exception as e:
-            return f"Error generating response: {e}"
+            yield f"Error generating response: {e}"
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            answer = "".join(parts)
+            if answer:
+                self.session.record(user_query, answer if finished else f"{answer.rstrip()} …(interrupted)")
+            stats = {**self.session.last_turn, "seconds": round(time.perf_counter() - started, 2)}
+            if first_token is not None:
+                stats["first_token_seconds"] = round(first_token, 2)
+            if usage is not None:
+                stats["prompt_tokens"] = usage.prompt_token_count
+                stats["cached_tokens"] = getattr(usage, "cached_content_token_count", 0)
+            if not finished:
+                stats["interrupted"] = True
+            self._set_turn_stats(turn_id, stats)
+    
+    def query_data_with_ai(self, user_query: str, collection_data: List[Dict[str, Any]],
+                           collection_name: Optional[str] = None) -> str:
+        """Use Vertex AI to query and analyze the data"""
+        return "".join(self.stream_data_with_ai(user_query, collection_data, collection_name))
     
     def get_data_summary(self, collection_name: str) -> Dict[str, Any]:
-        """Get a summary of the data in a collection"""
-        data = self.fetch_data_from_firestore(collection_name)
-        
-        if not data:
+        """Get a summary of the data in a collection (from the snapshot cache, no Firestore reads)"""
+        if not self.cache:
             return {"error": "No data found"}
         
-        summary = {
-            "total_records": len(data),
-            "collections": collection_name,
-            "sample_fields": list(data[0].keys()) if data else [],
-            "data_types": {}
-        }
-        
-        # Analyze data types
-        if data:
-            for key, value in data[0].items():
-                summary["data_types"][key] = type(value).__name__
-        
+        summary = self.cache.summary(collection_name)
+        if not summary["total_records"]:
+            return {"error": "No data found"}
         return summary
 
+def _release(cache: Optional[SnapshotCache], executor: ThreadPoolExecutor):
+    """Stop a chatbot's snapshot listeners and worker threads (must not reference the chatbot itself)"""
+    if cache is not None:
+        cache.close()
+    executor.shutdown(wait=False, cancel_futures=True)
+
 def main():
     st.set_page_config(
         page_title="City Pulse AI Chatbot",
@@ -187,7 +407,7 @@ def main():
             selected_collection = None
         
         # Data limit
-        data_limit = st.slider("Data Limit", min_value=10, max_value=500, value=100, step=10)
+        data_limit = st.slider("Data Limit", min_value=10, max_value=50000, value=100, step=10)
         
         # Load data button
         if st.button("🔄 Load Data"):
@@ -195,7 +415,21 @@ def main():
                 with st.spinner("Loading data from Firestore..."):
                     st.session_state.collection_data = chatbot.fetch_data_from_firestore(selected_collection, data_limit)
                     st.session_state.selected_collection = selected_collection
+                    st.session_state.data_limit = data_limit
+                # Indexing continues in the background; the first question waits for it if needed
+                chatbot.warm_async(st.session_state.collection_data)
                 st.success(f"Loaded {len(st.session_state.collection_data)} records from {selected_collection}")
+        
+        # Re-read a collection from scratch (e.g. after deletes the cache cannot see)
+        if st.button("♻️ Refresh from Firestore") and chatbot.cache and selected_collection:
+            chatbot.cache.refresh(selected_collection)
+            st.session_state.pop('collection_data', None)
+            st.rerun()
+    
+    # Pick up changes synced into the cache since the last run (no Firestore reads)
+    if st.session_state.get('collection_data'):
+        st.session_state.collection_data = chatbot.fetch_data_from_firestore(
+            st.session_state.selected_collection, st.session_state.get('data_limit', 100))
     
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -210,8 +444,10 @@ def main():
             # Display data summary
             summary = chatbot.get_data_summary(collection_name)
             
-            st.metric("Total Records", summary["total_records"])
+            st.metric("Total Records", summary.get("total_records", 0))
             st.metric("Collection", collection_name)
+            if summary.get("synced_at"):
+                st.caption(f"{'Live' if summary['live'] else 'Cached'} snapshot, synced {summary['synced_at']}")
             
             # Show sample data
             st.subheader("Sample Data")
@@ -220,7 +456,7 @@ def main():
             
             # Show data structure
             st.subheader("Data Structure")
-            st.json(summary["data_types"])
+            st.json(summary.get("data_types", {}))
         else:
             st.info("Select a collection and load data to see the overview")
     
@@ -241,26 +477,43 @@ def main():
             # Add user message to chat history
             st.session_state.messages.append({"role": "user", "content": prompt})
             
+            # Start retrieval / query planning now so it runs while the page renders
+            has_data = 'collection_data' in st.session_state and st.session_state.collection_data
+            prepared = chatbot.prepare_async(prompt, st.session_state.collection_data,
+                                             st.session_state.get('selected_collection')) if has_data else None
+            
             # Display user message
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Generate AI response
-            with st.chat_message("assistant"):
-                with st.spinner("Analyzing data..."):
-                    if 'collection_data' in st.session_state and st.session_state.collection_data:
-                        response = chatbot.query_data_with_ai(prompt, st.session_state.collection_data)
+            # Stream the AI response; a new question while this runs cancels it
+            response = None
+            turn_id = chatbot.new_turn()
+            try:
+                with st.chat_message("assistant"):
+                    if prepared is not None:
+                        response = st.write_stream(chatbot.stream_data_with_ai(
+                            prompt, st.session_state.collection_data,
+                            st.session_state.get('selected_collection'), prepared=prepared, turn_id=turn_id))
                     else:
                         response = "Please load data from a Firestore collection first to enable AI analysis."
-                    
-                    st.markdown(response)
-            
-            # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": response})
+                        st.markdown(response)
+                    stats = chatbot.last_turn if chatbot.turn_id == turn_id else {}
+                    if stats:
+                        st.caption(" · ".join(f"{k.replace('_', ' ')}: {v}" for k, v in stats.items()))
+            finally:
+                # Add assistant response to chat history (what was shown, if interrupted by a rerun)
+                partial = chatbot.answer_of(turn_id)
+                if response is None and partial:
+                    response = f"{partial.rstrip()} …(interrupted)"
+                if response:
+                    st.session_state.messages.append({"role": "assistant", "content": response})
     
     # Clear chat button
     if st.button("🗑️ Clear Chat History"):
         st.session_state.messages = []
+        chatbot.cancel()
+        chatbot.session.clear_history()
         st.rerun()
 
 if __name__ == "__main__":
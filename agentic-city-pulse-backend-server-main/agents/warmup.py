@@ -0,0 +1,73 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+class WarmUp:
+    """
+    Preload the heavy dependencies of the configured request paths in the background.
+
+    Servers import their heavy dependencies lazily so that the process starts
+    accepting connections quickly. ``WarmUp`` then imports the paths listed in
+    ``WARMUP_PATHS`` (comma separated, or ``all``) on a daemon thread and
+    reports readiness once they are loaded.
+    """
+
+    def __init__(self, env_var: str = "WARMUP_PATHS", default: str = "all"):
+        self.env_var = env_var
+        self.default = default
+        self.preloaders: Dict[str, Callable[[], None]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._ready = threading.Event()
+        self._thread = None
+
+    def register(self, name: str, func: Callable[[], None]):
+        """Register a preloader for a request path"""
+        self.preloaders[name] = func
+
+    def configured_paths(self) -> List[str]:
+        """Paths selected by the environment, in registration order"""
+        value = os.getenv(self.env_var, self.default)
+        requested = {p.strip().lower() for p in value.split(",") if p.strip()}
+        if "all" in requested:
+            return list(self.preloaders)
+        unknown = requested - set(self.preloaders)
+        if unknown:
+            logger.warning(f"Ignoring unknown warm-up paths: {sorted(unknown)}")
+        return [name for name in self.preloaders if name in requested]
+
+    def start(self):
+        """Start warming up in the background; returns immediately"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name in self.configured_paths():
+            started = time.perf_counter()
+            try:
+                self.preloaders[name]()
+                self.results[name] = {"loaded": True}
+            except Exception as e:
+                # The path fails on first use as well; don't hold readiness hostage
+                logger.error(f"Warm-up of '{name}' failed: {str(e)}")
+                self.results[name] = {"loaded": False, "error": str(e)}
+            self.results[name]["seconds"] = round(time.perf_counter() - started, 3)
+        self._ready.set()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "paths": self.configured_paths(),
+            "results": dict(self.results),
+        }
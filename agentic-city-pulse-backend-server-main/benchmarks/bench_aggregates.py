@@ -0,0 +1,88 @@
+"""
+Measure rolling aggregate updates and lookups, and check them against a scan.
+
+Streams synthetic reports (categories x areas over the last day, in time
+order) through ``AggregateIndex``, then compares every window's count for a
+sample of category/area pairs with a brute-force count over the raw events
+using the same bucket boundaries.
+
+Usage:
+    python benchmarks/bench_aggregates.py [--events 500000] [--areas 200]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from aggregates import AggregateIndex, ALL
+from agent_garden import CIVIC_CATEGORIES
+
+def brute_count(events, category, area, width, buckets, now):
+    # Same semantics as RollingWindow: the current bucket plus the buckets - 1 before it
+    first = int(now // width) - buckets + 1
+    return sum(
+        1 for item in events
+        if (category == ALL or item["category"] == category)
+        and (area == ALL or item["areaName"].lower() == area)
+        and first <= int(item["created_utc"] // width) <= int(now // width)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=500000)
+    parser.add_argument("--areas", type=int, default=200)
+    parser.add_argument("--checks", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    areas = [f"Area {i}" for i in range(args.areas)]
+    events = sorted(
+        ({"id": f"bench:{i}", "category": rng.choice(CIVIC_CATEGORIES), "areaName": rng.choice(areas),
+          "created_utc": now - rng.uniform(0, 26 * 3600)} for i in range(args.events)),
+        key=lambda item: item["created_utc"],
+    )
+
+    index = AggregateIndex()
+    started = time.perf_counter()
+    index.ingest(events)
+    ingest_s = time.perf_counter() - started
+
+    pairs = [(rng.choice(CIVIC_CATEGORIES + [ALL]), rng.choice(areas + [ALL]).lower()) for _ in range(2000)]
+    started = time.perf_counter()
+    for category, area in pairs:
+        index.query(category=None if category == ALL else category, area=None if area == ALL else area, now=now)
+    query_us = (time.perf_counter() - started) / len(pairs) * 1e6
+
+    mismatches = 0
+    for category, area in pairs[:args.checks]:
+        result = index.query(category=None if category == ALL else category,
+                             area=None if area == ALL else area, now=now)
+        for name, (width, buckets) in index.windows.items():
+            if result["windows"][name]["count"] != brute_count(events, category, area, width, buckets, now):
+                mismatches += 1
+
+    started = time.perf_counter()
+    top = index.breakdown(window="1h", by="area", category="FLOOD", limit=5, now=now)
+    breakdown_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        "events": args.events,
+        "cells": index.stats()["cells"],
+        "ingest_us_per_event": round(ingest_s / args.events * 1e6, 2),
+        "query_us": round(query_us, 2),
+        "breakdown_ms": round(breakdown_ms, 2),
+        "checked_windows": args.checks * len(index.windows),
+        "mismatches": mismatches,
+        "top_flood_areas_1h": top,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
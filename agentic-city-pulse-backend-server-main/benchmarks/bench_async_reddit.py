@@ -0,0 +1,75 @@
+"""
+Benchmark the async Reddit fetcher against the old thread-pool approach.
+
+Both variants poll the same local FakeRedditServer: the thread-pool variant
+issues one blocking request per subreddit on a ThreadPoolExecutor(4) like the
+previous scheduler; the async variant uses AsyncRedditFetcher.
+
+Usage:
+    python benchmarks/bench_async_reddit.py --subreddits 500 --latency 0.05
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hackathon"))
+
+from fake_reddit_server import FakeRedditServer
+from async_reddit import AsyncRedditFetcher
+
+def run_threaded(server: FakeRedditServer, subreddits, limit: int, workers: int = 4) -> float:
+    import requests
+
+    session = requests.Session()
+    token = session.post(server.auth_url, auth=("id", "secret"),
+                         data={"grant_type": "client_credentials"}).json()["access_token"]
+
+    def fetch(sub):
+        resp = session.get(f"{server.url}/r/{sub}/hot", params={"limit": limit},
+                           headers={"Authorization": f"bearer {token}"})
+        return resp.json()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, subreddits))
+    return time.perf_counter() - started
+
+async def run_async(server: FakeRedditServer, subreddits, limit: int, per_host_limit: int) -> float:
+    async with AsyncRedditFetcher("id", "secret", "bench", base_url=server.url,
+                                  auth_url=server.auth_url, per_host_limit=per_host_limit) as fetcher:
+        started = time.perf_counter()
+        results = await fetcher.fetch_many(subreddits, limit=limit)
+        elapsed = time.perf_counter() - started
+    errors = sum(1 for r in results.values() if "error" in r)
+    if errors:
+        print(f"async variant: {errors} subreddits failed", file=sys.stderr)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subreddits", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-host-limit", type=int, default=32)
+    parser.add_argument("--skip-threaded", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeRedditServer(subreddits=args.subreddits, latency=args.latency).start_in_thread()
+    subreddits = list(server.posts)
+    try:
+        report = {"subreddits": len(subreddits), "latency_s": args.latency, "limit": args.limit}
+        if not args.skip_threaded:
+            elapsed = run_threaded(server, subreddits, args.limit)
+            report["threaded"] = {"seconds": round(elapsed, 3), "subreddits_per_s": round(len(subreddits) / elapsed, 1)}
+        elapsed = asyncio.run(run_async(server, subreddits, args.limit, args.per_host_limit))
+        report["async"] = {"seconds": round(elapsed, 3), "subreddits_per_s": round(len(subreddits) / elapsed, 1)}
+        print(json.dumps(report, indent=2))
+    finally:
+        server.stop_thread()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Prompt size and retrieval quality of the chatbot's record index.
+
+Generates synthetic civic reports shaped like the agents' JSON output
+(eventName, areaName, roadName, description, coordinates) at several
+collection sizes, builds ``RecordIndex`` over each, and for questions
+naming a category and an area reports: index build time, query latency,
+the context size sent to the model versus the old
+``json.dumps(..., indent=2)`` of the whole collection, and precision@k
+(share of retrieved records matching both the category and the area, out
+of as many as exist).
+
+Usage:
+    python benchmarks/bench_chatbot_retrieval.py [--sizes 1000,10000,50000] [--k 40]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "agents", "vertex_ai"))
+
+from retrieval import RecordIndex, encode_records
+from agent_garden import CIVIC_CATEGORIES
+
+AREAS = ["Koramangala", "Indiranagar", "Whitefield", "Jayanagar", "Hebbal", "Malleshwaram", "Yelahanka",
+         "Banashankari", "Marathahalli", "Electronic City", "BTM Layout", "Rajajinagar"]
+FILLER = ("residents say the problem has been getting worse since the weekend and nobody from the "
+          "municipal office has visited the site yet despite several complaints").split()
+
+def generate(count: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(count):
+        category = rng.choice(CIVIC_CATEGORIES)
+        area = rng.choice(AREAS)
+        words = rng.sample(FILLER, 12) * rng.randint(1, 4)
+        yield {
+            "id": f"doc{i}",
+            "eventName": category,
+            "areaName": area,
+            "roadName": f"{rng.randint(1, 40)}th Main Road",
+            "cityName": "Bengaluru",
+            "location_coordinates": {"latitude": round(12.97 + rng.gauss(0, 0.05), 6),
+                                     "longitude": round(77.59 + rng.gauss(0, 0.05), 6)},
+            "description": f"{category.replace('_', ' ').lower()} reported near {area}: {' '.join(words)}",
+            "timeStamp": f"2026-10-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--k", type=int, default=40)
+    parser.add_argument("--context-chars", type=int, default=24000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questions = [(rng.choice(CIVIC_CATEGORIES), rng.choice(AREAS)) for _ in range(args.questions)]
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        docs = list(generate(size, args.seed))
+        started = time.perf_counter()
+        index = RecordIndex(docs)
+        overview = json.dumps(index.overview(), separators=(",", ":"))
+        build_s = time.perf_counter() - started
+
+        latencies, precisions, context_chars = [], [], []
+        for category, area in questions:
+            question = f"Are there any {category.replace('_', ' ').lower()} problems in {area}?"
+            started = time.perf_counter()
+            hits = index.search(question, k=args.k)
+            text, included = encode_records((docs[i] for i in hits), max_chars=args.context_chars)
+            latencies.append((time.perf_counter() - started) * 1000)
+            matching = sum(1 for i in hits[:included] if docs[i]["eventName"] == category and docs[i]["areaName"] == area)
+            relevant = sum(1 for d in docs if d["eventName"] == category and d["areaName"] == area)
+            precisions.append(matching / max(min(included, relevant), 1))
+            context_chars.append(len(text) + len(overview))
+        latencies.sort()
+        results.append({
+            "docs": size,
+            "build_s": round(build_s, 2),
+            "query_ms_p50": round(latencies[len(latencies) // 2], 2),
+            "query_ms_max": round(latencies[-1], 2),
+            "context_chars": max(context_chars),
+            "full_dump_chars": len(json.dumps(docs, indent=2)),
+            "precision_at_k": round(sum(precisions) / len(precisions), 3),
+        })
+    print(json.dumps({"k": args.k, "context_chars_budget": args.context_chars, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Offline end-to-end load test of /api/agent/civic and /api/city-pulse/analyze.
+
+Starts the fake Gemini server (``fake_gemini_server.py``) and the fake
+Reddit server in this process, runs the real API server (uvicorn) in a
+subprocess pointed at both, and drives it with a weighted mix of requests:
+
+- ``image``: photo uploads from the media corpus (``media_fixtures.py``),
+  JPEG/PNG/HEIC with and without GPS, in turn
+- ``audio``: voice-note uploads of several lengths, in turn
+- ``pulse``: city-pulse analyses (live Reddit + tweets + ADK summary)
+- ``text``: typed complaints
+
+The fake Reddit reports a generous rate limit by default, so PRAW's
+pacing (about 0.6 s per call under the real quota) does not hide the
+backend's own cost; pass
+``--reddit-rate-limit 1000`` to include it.
+
+Each concurrency level sends ``--requests`` requests through that many
+concurrent clients and reports throughput, p50/p95/p99 latency overall and
+per kind, the error count and the server's peak RSS (sampled from
+``/proc``, Linux only). Results go to ``--output`` as JSON; with
+``--baseline`` they are compared with an earlier run and the script exits
+with status 1 when a metric got worse by more than ``--tolerance``.
+
+Needs the backend's own dependencies (FastAPI, google-generativeai, ADK,
+Pillow, pydub, SpeechRecognition, praw); no network access or API quota.
+
+Usage:
+    python benchmarks/bench_e2e.py [--concurrency 1 4 16] [--requests 60]
+        [--mix image=5,audio=2,pulse=3,text=2] [--latency lognormal:0.8,0.4]
+        [--output e2e.json] [--baseline previous.json]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from fake_gemini_server import FakeGeminiServer
+from fake_reddit_server import FakeRedditServer
+from media_fixtures import build_corpus
+
+PULSE_QUERIES = ["flooding in bangalore", "traffic jams downtown today", "power outage reports",
+                 "waterlogging after the rain"]
+TEXT_COMPLAINTS = ["Drain overflowing on 5th cross Koramangala since morning",
+                   "Tree fell on the road near Hebbal flyover, traffic blocked"]
+# Lower is better for every compared metric except throughput
+COMPARED = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def latency_summary(samples: List[float]) -> Dict[str, Any]:
+    values = sorted(samples)
+    return {
+        "p50_ms": round(percentile(values, 0.50) * 1000, 1) if values else None,
+        "p95_ms": round(percentile(values, 0.95) * 1000, 1) if values else None,
+        "p99_ms": round(percentile(values, 0.99) * 1000, 1) if values else None,
+        "max_ms": round(values[-1] * 1000, 1) if values else None,
+        "mean_ms": round(sum(values) / len(values) * 1000, 1) if values else None,
+    }
+
+def parse_mix(spec: str) -> List[str]:
+    """``"image=5,pulse=3"`` -> an interleaved schedule of request kinds with those weights"""
+    weights = {}
+    for item in spec.split(","):
+        kind, _, weight = item.partition("=")
+        weights[kind.strip()] = int(weight or 1)
+    unknown = set(weights) - {"image", "audio", "pulse", "text"}
+    if unknown:
+        raise ValueError(f"Unknown request kinds: {', '.join(sorted(unknown))}")
+    schedule, credit = [], {kind: 0.0 for kind in weights}
+    total = sum(weights.values())
+    for _ in range(total):
+        for kind in credit:
+            credit[kind] += weights[kind] / total
+        kind = max(credit, key=credit.get)
+        credit[kind] -= 1
+        schedule.append(kind)
+    return schedule
+
+class RssSampler:
+    """Peak resident set size of a process, sampled from /proc every ``interval`` seconds"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.path = f"/proc/{pid}/status"
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def read_kb(self, field: str = "VmRSS") -> Optional[int]:
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self.read_kb() or 0)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.peak_kb = self.read_kb() or 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[float]:
+        self._stop.set()
+        self._thread.join()
+        return round(self.peak_kb / 1024, 1) if self.peak_kb else None
+
+class Driver:
+    def __init__(self, base_url: str, media_dir: str, corpus: List[Dict[str, Any]], schedule: List[str],
+                 timeout: float):
+        self.base_url = base_url
+        self.media_dir = media_dir
+        self.images = [e for e in corpus if e["kind"] == "image"]
+        self.audio = [e for e in corpus if e["kind"] == "audio"]
+        self.schedule = schedule
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._payloads = {}
+        self._turns = defaultdict(int)
+
+    def _file(self, entry: Dict[str, Any]) -> bytes:
+        if entry["file"] not in self._payloads:
+            with open(os.path.join(self.media_dir, entry["file"]), "rb") as f:
+                self._payloads[entry["file"]] = f.read()
+        return self._payloads[entry["file"]]
+
+    def _next(self, items: List[Any], kind: str):
+        item = items[self._turns[kind] % len(items)]
+        self._turns[kind] += 1
+        return item
+
+    def build(self, kind: str):
+        """(path, form data, label) of the next request of a kind"""
+        form = aiohttp.FormData()
+        if kind in ("image", "audio"):
+            entry = self._next(self.images if kind == "image" else self.audio, kind)
+            form.add_field("file", self._file(entry), filename=entry["file"], content_type=entry["mime_type"])
+            return "/api/agent/civic", form, entry["file"]
+        if kind == "text":
+            form.add_field("text", self._next(TEXT_COMPLAINTS, kind))
+            return "/api/agent/civic", form, "text"
+        form.add_field("query", self._next(PULSE_QUERIES, kind))
+        form.add_field("include_reddit", "true")
+        form.add_field("include_twitter", "true")
+        return "/api/city-pulse/analyze", form, "pulse"
+
+    async def _send(self, session: aiohttp.ClientSession, kind: str) -> Dict[str, Any]:
+        path, form, label = self.build(kind)
+        started = time.perf_counter()
+        try:
+            async with session.post(self.base_url + path, data=form) as response:
+                body = await response.read()
+                status = response.status
+                partial = False
+                if status == 200 and kind == "pulse":
+                    partial = bool(json.loads(body).get("result", {}).get("partial"))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, partial = type(e).__name__, False
+        return {"kind": kind, "label": label, "status": status, "partial": partial,
+                "seconds": time.perf_counter() - started}
+
+    async def run_level(self, concurrency: int, requests: int) -> Dict[str, Any]:
+        kinds = [self.schedule[i % len(self.schedule)] for i in range(requests)]
+        queue = asyncio.Queue()
+        for kind in kinds:
+            queue.put_nowait(kind)
+        results = []
+
+        async def client(session):
+            while not queue.empty():
+                results.append(await self._send(session, queue.get_nowait()))
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(client(session) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        return summarize(results, elapsed)
+
+    async def warm(self, kinds: List[str]):
+        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+            for kind in kinds:
+                result = await self._send(session, kind)
+                if result["status"] != 200:
+                    print(f"Warm-up {kind} request failed with {result['status']}", file=sys.stderr)
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == 200]
+    errors = defaultdict(int)
+    for r in results:
+        if r["status"] != 200:
+            errors[f"{r['kind']}:{r['status']}"] += 1
+    summary = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "error_breakdown": dict(errors),
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else None,
+        **latency_summary([r["seconds"] for r in ok]),
+        "by_kind": {},
+    }
+    for kind in sorted({r["kind"] for r in results}):
+        of_kind = [r for r in results if r["kind"] == kind]
+        passed = [r["seconds"] for r in of_kind if r["status"] == 200]
+        summary["by_kind"][kind] = {"requests": len(of_kind), "errors": len(of_kind) - len(passed),
+                                    **latency_summary(passed)}
+        if kind == "pulse":
+            summary["by_kind"][kind]["partial"] = sum(1 for r in of_kind if r["partial"])
+    return summary
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than ``tolerance`` (a fraction)"""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    regressions = []
+    for level in current["levels"]:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        for metric in COMPARED:
+            old, new = before.get(metric), level.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric == "throughput_rps" else change
+            level.setdefault("change", {})[metric] = round(change, 3)
+            if worse > tolerance:
+                regressions.append(f"c={level['concurrency']} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_backend(port: int, env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_endpoint:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=os.path.join(ROOT, "agents"), env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float):
+    import urllib.request
+    import urllib.error
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(url + "/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"API server not ready after {timeout}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=60, help="requests per concurrency level")
+    parser.add_argument("--mix", default="image=5,audio=2,pulse=3,text=2")
+    parser.add_argument("--latency", default="lognormal:0.8,0.4",
+                        help="fake model latency spec, or a JSON object per kind (image/text/agent/speech)")
+    parser.add_argument("--reddit-latency", type=float, default=0.05)
+    parser.add_argument("--reddit-rate-limit", type=int, default=1000000,
+                        help="requests per window the fake Reddit reports; 1000 makes PRAW pace calls like the real quota")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of model calls that fail")
+    parser.add_argument("--media", default=os.path.join(tempfile.gettempdir(), "civic-media"),
+                        help="media corpus directory (generated when it has no manifest)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default="e2e_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--server-log", default=os.path.join(tempfile.gettempdir(), "bench_e2e_server.log"))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    schedule = parse_mix(args.mix)
+    manifest = os.path.join(args.media, "manifest.json")
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            corpus = json.load(f)
+    else:
+        corpus = build_corpus(args.media)
+
+    latency = json.loads(args.latency) if args.latency.startswith("{") else args.latency
+    gemini = FakeGeminiServer(latency=latency, error_rate=args.error_rate, seed=args.seed).start_in_thread()
+    subreddits = ["citydata", "weather", "emergency", "traffic", "flood", "city0"]
+    reddit = FakeRedditServer(subreddits=subreddits, latency=args.reddit_latency,
+                              rate_limit=args.reddit_rate_limit, seed=args.seed).start_in_thread()
+
+    store_dir = tempfile.mkdtemp(prefix="bench_e2e")
+    env = dict(os.environ)
+    env.update(gemini.env())
+    env.update({
+        "PYTHONPATH": os.pathsep.join([os.path.join(ROOT, "hackathon"), env.get("PYTHONPATH", "")]).rstrip(os.pathsep),
+        "GEMINI_API_KEY": "fake-key",
+        "GOOGLE_API_KEY": "fake-key",
+        "REDDIT_CLIENT_ID": "fake-id",
+        "REDDIT_CLIENT_SECRET": "fake-secret",
+        "REDDIT_USER_AGENT": "city-pulse-bench",
+        "REDDIT_API_BASE_URL": reddit.url,
+        "REDDIT_AUTH_URL": reddit.auth_url,
+        "EVENT_STORE_PATH": os.path.join(store_dir, "events"),
+        "ENABLE_SCHEDULER": "false",
+        "WARMUP_PATHS": "all",
+    })
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_backend(port, env, args.server_log)
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "mix": args.mix,
+            "requests_per_level": args.requests,
+            "model_latency": latency,
+            "model_error_rate": args.error_rate,
+            "reddit_latency_s": args.reddit_latency,
+            "reddit_rate_limit": args.reddit_rate_limit,
+            "corpus": [{k: e[k] for k in ("file", "bytes") if k in e} for e in corpus],
+        },
+        "levels": [],
+    }
+    try:
+        wait_ready(base_url, process, timeout=120)
+        sampler = RssSampler(process.pid)
+        report["meta"]["idle_rss_mb"] = round((sampler.read_kb() or 0) / 1024, 1)
+        driver = Driver(base_url, args.media, corpus, schedule, args.timeout)
+        # One request of each kind first, so lazy imports and connection setup are not measured
+        asyncio.run(driver.warm(sorted(set(schedule))))
+        for concurrency in args.concurrency:
+            sampler.start()
+            level = asyncio.run(driver.run_level(concurrency, args.requests))
+            level["peak_rss_mb"] = sampler.stop()
+            level = {"concurrency": concurrency, **level}
+            report["levels"].append(level)
+            print(f"c={concurrency}: {level['throughput_rps']} req/s, p50 {level['p50_ms']} ms, "
+                  f"p95 {level['p95_ms']} ms, p99 {level['p99_ms']} ms, {level['errors']} errors, "
+                  f"peak RSS {level['peak_rss_mb']} MB", file=sys.stderr)
+        high_water = sampler.read_kb("VmHWM")
+        report["meta"]["server_peak_rss_mb"] = round(high_water / 1024, 1) if high_water else None
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        gemini.stop_thread()
+        reddit.stop_thread()
+    report["fake_gemini"] = gemini.stats()
+    report["fake_reddit"] = {"requests": reddit.request_count, "token_requests": reddit.token_requests}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({"output": args.output, "levels": [
+        {k: level[k] for k in ("concurrency", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors", "peak_rss_mb")}
+        for level in report["levels"]], "regressions": regressions}, indent=2))
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
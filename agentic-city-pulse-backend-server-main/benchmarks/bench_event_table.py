@@ -0,0 +1,193 @@
+"""
+Memory and throughput of the columnar EventTable against plain Python dicts.
+
+Builds the same synthetic events three ways:
+
+- ``dicts``: a list of per-event dicts, the shape ``scraped_data`` and
+  Firestore ``to_dict()`` results have today
+- ``lists``: a dict of per-field Python lists (column-oriented, no NumPy)
+- ``table``: ``EventTable`` (NumPy columns, dictionary-encoded strings)
+
+and measures retained memory (tracemalloc, which also tracks NumPy
+buffers) and the time of typical dashboard queries: a filter count, a
+group-by count, a top-k, and a radius filter. Answers are checked to be
+identical across the three (the radius filter can differ by points lying
+right on the circle, because the table stores float32 coordinates). Build
+times include generating the synthetic data.
+
+Usage:
+    python benchmarks/bench_event_table.py [--events 1000000] [--repeat 5]
+"""
+import os
+import sys
+import gc
+import json
+import math
+import time
+import random
+import argparse
+import tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from event_table import EventTable, _M_PER_DEG
+from agent_garden import CIVIC_CATEGORIES
+
+CITY_CENTER = (12.9716, 77.5946)
+SOURCES = ["image", "speech", "text", "reddit", "twitter"]
+
+def generate(events: int, areas: int, seed: int, now: float):
+    rng = random.Random(seed)
+    area_names = [f"Area {i}" for i in range(areas)]
+    road_names = [f"{i}th Main Road" for i in range(areas * 2)]
+    for i in range(events):
+        located = rng.random() < 0.6
+        yield {
+            "id": f"civic:{i}",
+            "source": rng.choice(SOURCES),
+            "category": rng.choice(CIVIC_CATEGORIES),
+            "areaName": rng.choice(area_names),
+            "roadName": rng.choice(road_names) if rng.random() < 0.5 else None,
+            "latitude": CITY_CENTER[0] + rng.gauss(0, 0.07) if located else None,
+            "longitude": CITY_CENTER[1] + rng.gauss(0, 0.07) if located else None,
+            "created_utc": now - rng.uniform(0, 6 * 24 * 3600),
+        }
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current, elapsed
+
+def timed(func, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--areas", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    now = time.time()
+    # Each representation is built from its own copy of the data, so it is charged for the values it keeps
+    dicts, dict_bytes, dict_build = measure(lambda: list(generate(args.events, args.areas, args.seed, now)))
+
+    def build_lists():
+        lists = {name: [] for name in dicts[0]}
+        for item in generate(args.events, args.areas, args.seed, now):
+            for name, value in item.items():
+                lists[name].append(value)
+        return lists
+    lists, list_bytes, _ = measure(build_lists)
+
+    def build_table():
+        table = EventTable(capacity=args.events)
+        table.extend(generate(args.events, args.areas, args.seed, now))
+        return table
+    table, table_bytes, table_build = measure(build_table)
+
+    since = now - 24 * 3600
+    lat, lon, radius = CITY_CENTER[0], CITY_CENTER[1], 2000.0
+    m_lon = _M_PER_DEG * math.cos(math.radians(lat))
+
+    def dict_filter():
+        return sum(1 for e in dicts if e["created_utc"] >= since and e["category"] == "FLOOD"
+                   and e["areaName"] == "Area 7")
+
+    def list_filter():
+        created, category, area = lists["created_utc"], lists["category"], lists["areaName"]
+        return sum(1 for i in range(len(created)) if created[i] >= since and category[i] == "FLOOD"
+                   and area[i] == "Area 7")
+
+    def dict_group():
+        return Counter(e["category"] for e in dicts if e["created_utc"] >= since)
+
+    def list_group():
+        created = lists["created_utc"]
+        return Counter(c for c, t in zip(lists["category"], created) if t >= since)
+
+    def dict_topk():
+        return Counter(e["areaName"] for e in dicts if e["category"] == "FLOOD").most_common(10)
+
+    def list_topk():
+        return Counter(a for a, c in zip(lists["areaName"], lists["category"]) if c == "FLOOD").most_common(10)
+
+    def within(e_lat, e_lon):
+        if e_lat is None:
+            return False
+        dy = (e_lat - lat) * _M_PER_DEG
+        dx = (e_lon - lon) * m_lon
+        return dx * dx + dy * dy <= radius * radius
+
+    def dict_near():
+        return sum(1 for e in dicts if within(e["latitude"], e["longitude"]))
+
+    def list_near():
+        return sum(1 for a, b in zip(lists["latitude"], lists["longitude"]) if within(a, b))
+
+    queries = {
+        "filter_count": (dict_filter, list_filter,
+                         lambda: int(table.mask(since=since, category="FLOOD", area="Area 7").sum())),
+        "group_by_category": (dict_group, list_group,
+                              lambda: table.count_by("category", table.mask(since=since))),
+        "top10_areas": (dict_topk, list_topk,
+                        lambda: table.top_k("area", 10, table.mask(category="FLOOD"))),
+        "radius_2km": (dict_near, list_near, lambda: int(table.mask(near=(lat, lon, radius)).sum())),
+    }
+    report = {
+        "events": args.events,
+        "memory_mb": {
+            "dicts": round(dict_bytes / 2 ** 20, 1),
+            "lists": round(list_bytes / 2 ** 20, 1),
+            "table": round(table_bytes / 2 ** 20, 1),
+        },
+        "bytes_per_event": {
+            "dicts": round(dict_bytes / args.events),
+            "lists": round(list_bytes / args.events),
+            "table": round(table_bytes / args.events),
+        },
+        "build_s": {"dicts": round(dict_build, 2), "table": round(table_build, 2)},
+        "queries_ms": {},
+    }
+    for name, (dict_query, list_query, table_query) in queries.items():
+        dict_result, dict_ms = timed(dict_query, max(1, args.repeat // 2))
+        list_result, list_ms = timed(list_query, max(1, args.repeat // 2))
+        table_result, table_ms = timed(table_query, args.repeat)
+        if name == "group_by_category":
+            dict_result, list_result = dict(dict_result), dict(list_result)
+        elif name == "radius_2km":
+            # float32 coordinates (~1 m resolution) can flip points lying right on the circle
+            report["queries_ms"][name] = {"boundary_difference": abs(table_result - dict_result)}
+            dict_result = list_result = table_result = None if dict_result != list_result else dict_result
+        elif name == "top10_areas":
+            # Same counts; table area names are normalized to lower case
+            dict_result = sorted((area.lower(), count) for area, count in dict_result)
+            list_result = sorted((area.lower(), count) for area, count in list_result)
+            table_result = sorted(table_result)
+        report["queries_ms"][name] = {
+            **report["queries_ms"].get(name, {}),
+            "dicts": round(dict_ms, 2),
+            "lists": round(list_ms, 2),
+            "table": round(table_ms, 2),
+            "speedup_vs_dicts": round(dict_ms / max(table_ms, 1e-6), 1),
+            "same_result": dict_result == list_result == table_result,
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure incident clustering cost and quality on synthetic city events.
+
+Generates ground-truth incidents scattered over a city, each reported by
+many events jittered in space and time (some with GPS, some with only an
+area name, like model output without coordinates), then clusters them with
+``IncidentIndex``. Reports per-event cost at increasing volumes (it should
+stay flat) and how well incidents match the ground truth: ``split`` counts
+extra incidents a true incident was broken into, ``merged`` counts
+incidents that mixed several true ones.
+
+Usage:
+    python benchmarks/bench_incidents.py [--sizes 10000,100000,300000]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from incidents import IncidentIndex
+from agent_garden import CIVIC_CATEGORIES
+
+CITY_CENTER = (12.9716, 77.5946)
+CITY_SPAN = 0.15          # degrees (~16 km) around the centre
+JITTER_M = 150            # spread of GPS fixes around the true location
+
+def generate(events: int, per_incident: int, seed: int, gps_share: float = 0.7):
+    """Events as incident items plus the true incident of each"""
+    rng = random.Random(seed)
+    truths = []
+    items, labels = [], []
+    start = time.time() - 24 * 3600
+    n_incidents = max(1, events // per_incident)
+    for t in range(n_incidents):
+        truths.append({
+            "category": rng.choice(CIVIC_CATEGORIES),
+            "lat": CITY_CENTER[0] + rng.uniform(-CITY_SPAN, CITY_SPAN),
+            "lon": CITY_CENTER[1] + rng.uniform(-CITY_SPAN, CITY_SPAN),
+            "area": f"Area {t}",
+            "start": start + rng.uniform(0, 20 * 3600),
+        })
+    for i in range(events):
+        t = rng.randrange(n_incidents)
+        truth = truths[t]
+        item = {
+            "id": f"bench:{i}",
+            "source": "image",
+            "category": truth["category"],
+            "areaName": truth["area"],
+            "created_utc": truth["start"] + rng.uniform(0, 2 * 3600),
+        }
+        if rng.random() < gps_share:
+            item["latitude"] = truth["lat"] + rng.gauss(0, JITTER_M / 111000)
+            item["longitude"] = truth["lon"] + rng.gauss(0, JITTER_M / 111000)
+        items.append(item)
+        labels.append(t)
+    # Arrival order is by report time, as in production
+    order = sorted(range(events), key=lambda i: items[i]["created_utc"])
+    return [items[i] for i in order], [labels[i] for i in order]
+
+def run(events: int, per_incident: int, seed: int):
+    items, labels = generate(events, per_incident, seed)
+    index = IncidentIndex(retention=7 * 24 * 3600)
+    assigned = []
+    started = time.perf_counter()
+    for item in items:
+        assigned.append(index.add(item)["id"])
+    elapsed = time.perf_counter() - started
+
+    truth_to_incidents = defaultdict(set)
+    incident_to_truths = defaultdict(Counter)
+    for truth, incident in zip(labels, assigned):
+        truth_to_incidents[truth].add(incident)
+        incident_to_truths[incident][truth] += 1
+    majority = sum(counts.most_common(1)[0][1] for counts in incident_to_truths.values())
+    return {
+        "events": events,
+        "true_incidents": len(truth_to_incidents),
+        "incidents": len(incident_to_truths),
+        "us_per_event": round(elapsed / events * 1e6, 1),
+        "events_per_s": round(events / elapsed),
+        "purity": round(majority / events, 4),
+        "split": sum(len(found) - 1 for found in truth_to_incidents.values()),
+        "merged": sum(1 for counts in incident_to_truths.values() if len(counts) > 1),
+        "indexed_cells": index.stats()["indexed_cells"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,300000")
+    parser.add_argument("--per-incident", type=int, default=100, help="average events per true incident")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    results = [run(int(size), args.per_incident, args.seed) for size in args.sizes.split(",")]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark "near me" queries on the spatial index against a brute-force scan.
+
+Loads synthetic located events (a week of reports spread over a city,
+denser towards the centre), then times random queries both ways and checks
+that the index returns exactly what the scan does. Query kinds:
+
+- ``knn``: the 20 nearest events within 2 km
+- ``radius_recent``: events within 2 km from the last 24 hours (up to 100)
+- ``radius_wide``: the 50 nearest events within 10 km of a given category
+
+Usage:
+    python benchmarks/bench_near.py [--events 300000] [--queries 300]
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from geo_index import GeoEventIndex, _M_PER_DEG
+from agent_garden import CIVIC_CATEGORIES
+
+CITY_CENTER = (12.9716, 77.5946)
+
+def generate(events: int, seed: int):
+    rng = random.Random(seed)
+    now = time.time()
+    items = []
+    for i in range(events):
+        # Gaussian around the centre: ~90% within 15 km
+        items.append({
+            "id": f"bench:{i}",
+            "category": rng.choice(CIVIC_CATEGORIES),
+            "latitude": CITY_CENTER[0] + rng.gauss(0, 0.07),
+            "longitude": CITY_CENTER[1] + rng.gauss(0, 0.07),
+            "created_utc": now - rng.uniform(0, 7 * 24 * 3600),
+        })
+    items.sort(key=lambda item: item["created_utc"])
+    return items
+
+def brute_force(items, latitude, longitude, radius_m, since=None, limit=50, category=None):
+    m_lat, m_lon = _M_PER_DEG, _M_PER_DEG * math.cos(math.radians(latitude))
+    found = []
+    for item in items:
+        if since is not None and item["created_utc"] < since:
+            continue
+        if category and item["category"] != category:
+            continue
+        dy = (item["latitude"] - latitude) * m_lat
+        dx = (item["longitude"] - longitude) * m_lon
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance <= radius_m:
+            found.append((distance, item["id"]))
+    found.sort()
+    return found[:limit]
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--brute-queries", type=int, default=20, help="queries also timed with the scan")
+    parser.add_argument("--cell-deg", type=float, default=GeoEventIndex().cell_deg)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    items = generate(args.events, args.seed)
+    index = GeoEventIndex(cell_deg=args.cell_deg)
+    started = time.perf_counter()
+    index.ingest(items)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    now = time.time()
+    kinds = {
+        "knn": dict(radius_m=2000, limit=20),
+        "radius_recent": dict(radius_m=2000, since=now - 24 * 3600, limit=100),
+        "radius_wide": dict(radius_m=10000, limit=50, category="FLOOD"),
+    }
+    report = {"events": args.events, "build_s": round(build_s, 2), "index": index.stats(), "queries": {}}
+    for name, params in kinds.items():
+        points = [(CITY_CENTER[0] + rng.gauss(0, 0.05), CITY_CENTER[1] + rng.gauss(0, 0.05))
+                  for _ in range(args.queries)]
+        timings, results = [], 0
+        for lat, lon in points:
+            started = time.perf_counter()
+            found = index.near(lat, lon, **params)
+            timings.append((time.perf_counter() - started) * 1000)
+            results += len(found)
+        brute, mismatches = [], 0
+        for lat, lon in points[:args.brute_queries]:
+            started = time.perf_counter()
+            expected = brute_force(items, lat, lon, **params)
+            brute.append((time.perf_counter() - started) * 1000)
+            got = [(e["distance_m"], e["id"]) for e in index.near(lat, lon, **params)]
+            # Compare ids by distance rank; ties at the cut-off can legitimately differ
+            if [round(d, 1) for d, _ in expected] != [d for d, _ in got]:
+                mismatches += 1
+        report["queries"][name] = {
+            "avg_results": round(results / len(points), 1),
+            "index_p50_ms": round(percentile(timings, 0.5), 3),
+            "index_p99_ms": round(percentile(timings, 0.99), 3),
+            "brute_p50_ms": round(percentile(brute, 0.5), 1),
+            "speedup_p50": round(percentile(brute, 0.5) / max(percentile(timings, 0.5), 1e-6)),
+            "mismatches": mismatches,
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
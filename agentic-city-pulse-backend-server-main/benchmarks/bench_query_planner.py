@@ -0,0 +1,117 @@
+"""
+Check and time the chatbot's query planner on analytical questions.
+
+Plans a fixed set of questions ("count issues by category last week",
+"which area has most drainage complaints", ...) over synthetic civic
+reports, then checks each result against a hand-written brute-force
+answer. Each plan is run two ways: locally over the records, and pushed
+down to the in-memory Firestore fake (``memory_firestore.py``) as
+filters plus ``count()`` queries. The report covers planning and
+execution time and the size of the result table the model gets, next to
+the size of the full JSON dump it used to read.
+
+Usage:
+    python benchmarks/bench_query_planner.py [--docs 20000]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "agents", "vertex_ai"))
+
+from query_planner import QueryPlanner, run_local, run_firestore
+from memory_firestore import MemoryFirestore
+from agent_garden import CIVIC_CATEGORIES
+
+AREAS = ["Koramangala", "Indiranagar", "Whitefield", "Jayanagar", "Hebbal", "Malleshwaram", "Yelahanka",
+         "Banashankari", "Marathahalli", "Electronic City", "BTM Layout", "Rajajinagar"]
+
+def generate(count: int, seed: int, now: datetime):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "id": f"doc{i}",
+            "eventName": rng.choice(CIVIC_CATEGORIES),
+            "areaName": rng.choice(AREAS),
+            "cityName": "Bengaluru",
+            "severity": rng.randint(1, 5),
+            "created_at": now - timedelta(seconds=rng.uniform(0, 30 * 86400)),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    raw = list(generate(args.docs, args.seed, now))
+    # The chatbot sees timestamps as ISO strings (fetch converts them); Firestore keeps datetimes
+    loaded = [{**d, "created_at": d["created_at"].isoformat()} for d in raw]
+    week = now - timedelta(days=7)
+    day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def by(field, docs):
+        # Ties in most_common() rank by value, as in the planner's results
+        return Counter(dict(sorted(Counter(d[field] for d in docs).items())))
+
+    questions = {
+        "count issues by category last week":
+            dict(by("eventName", [d for d in raw if d["created_at"] >= week])),
+        "which area has most drainage complaints":
+            dict(by("areaName", [d for d in raw if d["eventName"] == "DRAINAGE_ISSUE"]).most_common(1)),
+        "how many flooding reports in Hebbal today":
+            {None: sum(1 for d in raw if d["eventName"] == "FLOOD" and d["areaName"] == "Hebbal"
+                       and d["created_at"] >= day)},
+        "top 3 areas for traffic in the last 3 days":
+            dict(by("areaName", [d for d in raw if d["eventName"] == "TRAFFIC_CONGESTION"
+                                 and d["created_at"] >= now - timedelta(days=3)]).most_common(3)),
+        "average severity by category":
+            {c: round(sum(d["severity"] for d in raw if d["eventName"] == c) /
+                      sum(1 for d in raw if d["eventName"] == c), 3) for c in set(d["eventName"] for d in raw)},
+    }
+
+    started = time.perf_counter()
+    planner = QueryPlanner(loaded)
+    profile_ms = (time.perf_counter() - started) * 1000
+    db = MemoryFirestore()
+    collection = db.collection("events")
+    for doc in raw:
+        collection.document(doc["id"]).set(doc)
+    report = {"docs": args.docs, "profile_ms": round(profile_ms, 1),
+              "full_dump_chars": len(json.dumps(loaded, indent=2)), "questions": []}
+    for question, expected in questions.items():
+        started = time.perf_counter()
+        plan = planner.plan(question, now=now)
+        plan_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        local = run_local(plan, loaded)
+        local_ms = (time.perf_counter() - started) * 1000
+        pushed = run_firestore(plan, collection, datetime_fields={"created_at"}, numeric_fields=planner.numeric)
+
+        def as_dict(rows):
+            if rows is None:
+                return None
+            value = [k for k in rows[0] if k != plan.group_by][0] if rows else None
+            return {row.get(plan.group_by): row[value] for row in rows}
+        report["questions"].append({
+            "question": question,
+            "plan": plan.describe(),
+            "plan_ms": round(plan_ms, 3),
+            "local_ms": round(local_ms, 2),
+            "result_chars": len(json.dumps(local, separators=(",", ":"), default=str)),
+            "local_correct": as_dict(local) == expected,
+            "pushdown": "not applicable" if pushed is None else as_dict(pushed) == expected,
+        })
+    print(json.dumps(report, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
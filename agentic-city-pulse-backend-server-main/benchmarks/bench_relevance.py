@@ -0,0 +1,91 @@
+"""
+Measure the relevance prefilter on a labelled fixture set.
+
+Reports precision/recall for relevant-vs-irrelevant, per-category
+precision/recall, and classification throughput. The fixture is a .jsonl
+file of ``{"text", "label"}`` lines with labels from the civic categories
+or ``IRRELEVANT``; it is kept separate from the training examples in
+``hackathon/data/relevance_train.jsonl``.
+
+Usage:
+    python benchmarks/bench_relevance.py [--fixture benchmarks/fixtures/relevance_eval.jsonl]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from relevance import get_relevance_filter, load_examples, IRRELEVANT, CIVIC_CATEGORIES
+
+def precision_recall(tp: int, fp: int, fn: int):
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return round(precision, 3), round(recall, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixture", default=os.path.join(ROOT, "benchmarks", "fixtures", "relevance_eval.jsonl"))
+    parser.add_argument("--repeat", type=int, default=200, help="passes over the fixture for the timing run")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    relevance_filter = get_relevance_filter()
+    train_ms = (time.perf_counter() - started) * 1000
+    examples = load_examples(args.fixture)
+
+    predictions = [(relevance_filter.classify(text), label) for text, label in examples]
+    relevant = {"tp": 0, "fp": 0, "fn": 0}
+    per_category = {c: {"tp": 0, "fp": 0, "fn": 0} for c in CIVIC_CATEGORIES}
+    by_reason = {}
+    mistakes = []
+    for ((category, reason), label), (text, _) in zip(predictions, examples):
+        predicted = category or IRRELEVANT
+        by_reason[reason] = by_reason.get(reason, 0) + 1
+        if predicted != IRRELEVANT and label != IRRELEVANT:
+            relevant["tp"] += 1
+        elif predicted != IRRELEVANT:
+            relevant["fp"] += 1
+        elif label != IRRELEVANT:
+            relevant["fn"] += 1
+        if predicted == label:
+            if label != IRRELEVANT:
+                per_category[label]["tp"] += 1
+        else:
+            if predicted != IRRELEVANT:
+                per_category[predicted]["fp"] += 1
+            if label != IRRELEVANT:
+                per_category[label]["fn"] += 1
+            mistakes.append({"text": text, "label": label, "predicted": predicted, "reason": reason})
+
+    texts = [text for text, _ in examples]
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            relevance_filter.classify(text)
+    elapsed = time.perf_counter() - started
+    scored = args.repeat * len(texts)
+
+    precision, recall = precision_recall(**relevant)
+    report = {
+        "fixture": os.path.relpath(args.fixture, ROOT),
+        "items": len(examples),
+        "train_ms": round(train_ms, 1),
+        "relevance": {"precision": precision, "recall": recall},
+        "category_accuracy": round(sum(1 for (c, _), l in predictions if (c or IRRELEVANT) == l) / len(examples), 3),
+        "per_category": {
+            c: dict(zip(("precision", "recall"), precision_recall(**counts))) for c, counts in per_category.items()
+        },
+        "decided_by": by_reason,
+        "items_per_s": round(scored / elapsed),
+        "us_per_item": round(elapsed / scored * 1e6, 1),
+        "mistakes": mistakes,
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-turn prompt size of the chatbot with and without session context reuse.
+
+Runs a ten-question conversation over synthetic civic reports at several
+dataset sizes, with a few new reports arriving between turns, and
+estimates the tokens sent per turn (four characters per token) for:
+
+- ``resend``: every turn carries the instructions, collection overview and
+  retrieved records, with no history (the chatbot before sessions)
+- ``chat``: the same prompts kept in a plain chat history, the obvious way
+  to add memory, so every turn resends all earlier prompts
+- ``session``: the instructions and digest are given once per dataset
+  version (cached context); each turn sends its evidence, data deltas and
+  recent history within the history budget
+
+Model answers are stubbed with fixed-length text; no model is called.
+
+Usage:
+    python benchmarks/bench_session_context.py [--sizes 1000,10000,50000] [--turns 10]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "agents", "vertex_ai"))
+
+from retrieval import RecordIndex, encode_records
+from session_context import SessionContext, estimate_tokens
+from bench_chatbot_retrieval import generate, AREAS
+from agent_garden import CIVIC_CATEGORIES
+
+# Roughly the length of the chatbot's instructions
+INSTRUCTIONS = "x" * 1100
+ANSWER = "y" * 900
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--new-per-turn", type=int, default=3)
+    parser.add_argument("--k", type=int, default=40)
+    parser.add_argument("--context-chars", type=int, default=24000)
+    parser.add_argument("--seed", type=int, default=19)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    questions = [f"What is happening with {rng.choice(CIVIC_CATEGORIES).replace('_', ' ').lower()} "
+                 f"in {rng.choice(AREAS)}?" for _ in range(args.turns)]
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        docs = list(generate(size, args.seed))
+        extra = generate(size + args.turns * args.new_per_turn, args.seed + 1)
+        session = SessionContext()
+        resend, chat, reuse, digests = [], [], [], 0
+        for turn, question in enumerate(questions):
+            if turn:
+                # New reports since the previous question: a new dataset version
+                docs = docs + [{**next(extra), "id": f"new{turn}-{i}"} for i in range(args.new_per_turn)]
+            index = RecordIndex(docs)
+            overview = index.overview()
+            records, _ = encode_records((docs[i] for i in index.search(question, k=args.k)),
+                                        max_chars=args.context_chars)
+            resend.append(estimate_tokens(INSTRUCTIONS + json.dumps(overview) + records + question))
+            chat.append(sum(resend) + turn * estimate_tokens(ANSWER))
+
+            digest_tokens = 0
+            if session.prepare("reports", turn, docs, overview):
+                digests += 1
+                digest_tokens = estimate_tokens(INSTRUCTIONS + session.digest)
+            session.turn(question, records)
+            reuse.append(session.last_turn["tokens_estimate"] + digest_tokens)
+            session.record(question, ANSWER)
+        results.append({
+            "docs": size,
+            "last_turn_tokens": {"resend": resend[-1], "chat": chat[-1], "session": reuse[-1]},
+            "total_tokens": {"resend": sum(resend), "chat": sum(chat), "session": sum(reuse)},
+            "session_first_turn_tokens": reuse[0],
+            "digests_sent": digests,
+            "history_turns_last": session.last_turn["history_turns"],
+        })
+    print(json.dumps({"turns": args.turns, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
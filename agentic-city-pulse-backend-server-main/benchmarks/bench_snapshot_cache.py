@@ -0,0 +1,189 @@
+"""
+Firestore reads of the chatbot with and without the snapshot cache, and
+whether the cache stays consistent with the collection.
+
+Replays a Streamlit session against the in-memory Firestore fake: every
+rerun lists collections and shows the data summary, "Load Data" is pressed
+a few times (once with a larger limit), and new reports are written while
+the session runs. Midway, one paged document is edited without touching
+its update field, and one paged document plus one new document are
+deleted. The same session runs three ways:
+
+- ``uncached``: the original calls (``limit().stream()`` per load, a
+  100-document re-fetch per summary, a listing per rerun)
+- ``listener``: ``SnapshotCache`` kept current by snapshot listeners
+- ``delta``: ``SnapshotCache`` kept current by delta pulls on every load,
+  with one full resync at the end (as if ``resync_interval`` elapsed)
+
+and reports billed reads and listing calls for each. For the cached modes
+it checks that the final view has every new document and current contents
+and none of the deleted documents. It also replays a small case on a
+collection with no update field (load 5 documents, delete one, edit one,
+reload), once with only a creation time and once with no timestamp at all.
+Exits non-zero if any check fails.
+
+Usage:
+    python benchmarks/bench_snapshot_cache.py [--docs 20000] [--limit 2000] [--reruns 50]
+"""
+import os
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+sys.path.insert(0, os.path.join(ROOT, "agents", "vertex_ai"))
+
+from snapshot_cache import SnapshotCache
+from memory_firestore import MemoryFirestore
+from agent_garden import CIVIC_CATEGORIES
+
+COLLECTION = "civic_events"
+
+def report(rng: random.Random, when: datetime):
+    return {"eventName": rng.choice(CIVIC_CATEGORIES), "areaName": f"Area {rng.randint(0, 50)}",
+            "description": "reported by a resident", "status": "open", "created_at": when, "updated_at": when}
+
+def populate(db: MemoryFirestore, docs: int, seed: int, now: datetime):
+    rng = random.Random(seed)
+    collection = db.collection(COLLECTION)
+    for i in range(docs):
+        collection.document(f"doc{i:07d}").set(report(rng, now - timedelta(seconds=rng.uniform(0, 30 * 86400))))
+    db.collection("other").document("x").set({"a": 1})
+    db.reads = db.writes = db.list_calls = 0
+
+def uncached_session(db, args, write):
+    """The chatbot's original Firestore access pattern"""
+    def fetch(limit):
+        results = []
+        for doc in db.collection(COLLECTION).limit(limit).stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            results.append(data)
+        return results
+    data = None
+    for rerun in range(args.reruns):
+        [c.id for c in db.collections()]
+        if rerun in args.load_at:
+            data = fetch(args.limit * (2 if rerun == args.load_at[-1] else 1))
+        if data is not None:
+            fetch(100)
+        write(rerun)
+    return None
+
+def cached_session(db, args, write, use_listener):
+    cache = SnapshotCache(db, page_size=500, listing_ttl=300, sync_interval=0, resync_interval=float("inf"),
+                          use_listener=use_listener)
+    limit = None
+    for rerun in range(args.reruns):
+        cache.collection_names()
+        if rerun in args.load_at:
+            limit = args.limit * (2 if rerun == args.load_at[-1] else 1)
+        if limit is not None:
+            cache.load(COLLECTION, limit)
+            cache.summary(COLLECTION)
+        write(rerun)
+    # One last rerun to pick up the final writes, after the resync interval in delta mode
+    reads = db.reads
+    cache.resync_interval = 0
+    cache.load(COLLECTION, limit)
+    cache.close()
+    return cache, db.reads - reads
+
+def plain(record: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in record.items() if k != "id"}
+
+def check(snapshot, source: dict, present, gone, edited) -> dict:
+    """Consistency of a cached snapshot with the documents in ``source`` (doc id -> data)"""
+    return {
+        "present": all(doc_id in snapshot.docs for doc_id in present),
+        "deleted_gone": not any(doc_id in snapshot.docs for doc_id in gone),
+        "edited_current": all(doc_id in snapshot.docs and plain(snapshot.docs[doc_id]) == plain(source[doc_id])
+                              for doc_id in edited),
+        "contents_match": all(doc_id in source and plain(record) == plain(source[doc_id])
+                              for doc_id, record in snapshot.docs.items()),
+    }
+
+def small_case(use_listener: bool, fields) -> dict:
+    """Load 5 documents without an update field, delete d0, edit d1, reload"""
+    db = MemoryFirestore()
+    collection = db.collection("small")
+    now = datetime.now(timezone.utc)
+    for i in range(5):
+        collection.document(f"d{i}").set({"status": "open", **fields(now - timedelta(minutes=i))})
+    cache = SnapshotCache(db, resync_interval=0, use_listener=use_listener)
+    cache.load("small", 100)
+    collection.document("d0").delete()
+    collection.document("d1").update({"status": "resolved"})
+    cache.load("small", 100)
+    result = check(cache.snapshot("small"), {doc_id: data for doc_id, (data, _) in collection._docs.items()},
+                   present=["d1", "d2", "d3", "d4"], gone=["d0"], edited=["d1"])
+    result["summary_records"] = cache.summary("small")["total_records"]
+    result["summary_current"] = result["summary_records"] == 4
+    cache.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--writes-per-rerun", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+    args.load_at = [1, args.reruns // 3, args.reruns // 2]
+
+    now = datetime.now(timezone.utc)
+    results = {}
+    failed = []
+    for mode in ("uncached", "listener", "delta"):
+        db = MemoryFirestore()
+        populate(db, args.docs, args.seed, now)
+        rng = random.Random(args.seed + 1)
+        written = []
+        edited, deleted = f"doc{0:07d}", f"doc{1:07d}"
+
+        def write(rerun):
+            collection = db.collection(COLLECTION)
+            for _ in range(args.writes_per_rerun):
+                reference = collection.document(f"new{len(written):05d}")
+                stamp = now + timedelta(seconds=len(written) + 1)
+                reference.set(report(rng, stamp))
+                written.append(reference.id)
+            if rerun == args.reruns // 2 + 1:
+                collection.document(written[0]).delete()
+                collection.document(deleted).delete()
+                collection.document(edited).update({"status": "resolved"})
+
+        session = uncached_session(db, args, write) if mode == "uncached" else \
+            cached_session(db, args, write, use_listener=(mode == "listener"))
+        result = {"reads": db.reads, "list_calls": db.list_calls}
+        if session is not None:
+            cache, final_reads = session
+            snapshot = cache.snapshot(COLLECTION)
+            source = {doc_id: data for doc_id, (data, _) in db.collection(COLLECTION)._docs.items()}
+            result["final_load_reads"] = final_reads
+            result["cached_docs"] = len(snapshot)
+            result["new_docs_seen"] = sum(1 for doc_id in written[1:] if doc_id in snapshot.docs)
+            result["new_docs_written"] = len(written) - 1
+            result["checks"] = check(snapshot, source, present=written[1:], gone=[written[0], deleted],
+                                     edited=[edited])
+            failed += [f"{mode}: {name}" for name, ok in result["checks"].items() if not ok]
+        results[mode] = result
+
+    small = {}
+    for mode in ("listener", "delta"):
+        for label, fields in (("created_at_only", lambda when: {"created_at": when}), ("no_timestamp", lambda when: {})):
+            small[f"{mode}/{label}"] = result = small_case(mode == "listener", fields)
+            failed += [f"small {mode}/{label}: {name}" for name, ok in result.items()
+                       if isinstance(ok, bool) and not ok]
+
+    print(json.dumps({"docs": args.docs, "limit": args.limit, "reruns": args.reruns, "results": results,
+                      "small_collection": small, "failed": failed}, indent=2))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Local fake of the Gemini REST API (and Google's speech endpoint) for
+offline end-to-end benchmarks.
+
+Serves ``POST /{version}/models/{model}:generateContent`` and
+``:streamGenerateContent`` (plain JSON, or SSE with ``alt=sse``), which is
+what both ``google.generativeai`` (REST transport) and ``google-genai``
+(used by ADK) call, plus ``POST /speech-api/v2/recognize`` for
+SpeechRecognition's ``recognize_google``. Each request is classified as
+``image`` (has inline image data), ``agent`` (declares tools), ``speech``
+or ``text``, answered after a delay drawn from that kind's latency
+distribution, and given a canned answer:
+
+- ``image``/``text``: a JSON list of civic events, as the civic prompts ask
+- ``agent``: first a ``functionCall`` for each declared tool named in
+  ``agent_tools``, then (once the tool responses come back) a summary
+- ``speech``: a fixed transcript
+
+Point the backend at it with::
+
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8766      # agent_garden (google.generativeai)
+    GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:8766   # ADK / google-genai
+    SPEECH_API_ENDPOINT=http://127.0.0.1:8766/speech-api/v2/recognize
+
+Latency specs are ``"0.5"`` (fixed seconds), ``"uniform:LOW,HIGH"``,
+``"normal:MEAN,STDDEV"``, ``"lognormal:MEDIAN,SIGMA"`` or
+``"exponential:MEAN"``; pass one spec for every kind or a dict per kind.
+Canned answers can be replaced per kind (a list of strings, used in turn).
+"""
+import json
+import math
+import random
+import asyncio
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Callable, Union
+
+from aiohttp import web
+
+KINDS = ("image", "text", "agent", "speech")
+
+CATEGORIES = ['TRAFFIC_CONGESTION', 'DRAINAGE_ISSUE', 'FLOOD', 'WATER_LOGGING', 'ROAD_BLOCK',
+              'TREE_IN_BETWEEN', 'ELECTRICITY_ISSUE']
+AREAS = ["Koramangala", "Indiranagar", "Whitefield", "Jayanagar", "Hebbal", "Malleshwaram"]
+
+DEFAULT_AGENT_TOOLS = {
+    "get_reddit_citydev_news": {"subreddit": "city0", "limit": 5},
+    "scrape_city_tweets": {"max_results_per_hashtag": 20},
+}
+
+DEFAULT_TRANSCRIPT = "There is heavy waterlogging near the main road in Koramangala and traffic is stuck"
+
+def parse_latency(spec: Union[str, float, None], rng: random.Random) -> Callable[[], float]:
+    """Sampler (seconds, never negative) for a latency spec such as ``"lognormal:0.8,0.5"``"""
+    if spec is None or spec == "":
+        return lambda: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda: float(spec)
+    name, _, args = str(spec).partition(":")
+    if not args:
+        value = float(name)
+        return lambda: value
+    params = [float(a) for a in args.split(",")]
+    if name == "uniform":
+        return lambda: rng.uniform(params[0], params[1])
+    if name == "normal":
+        return lambda: max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal":
+        # Parameterized by the median so specs read like observed latencies
+        mu = math.log(params[0])
+        return lambda: rng.lognormvariate(mu, params[1])
+    if name == "exponential":
+        return lambda: rng.expovariate(1.0 / params[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def civic_answer(rng: random.Random, count: int = 1) -> str:
+    events = [{
+        "eventName": rng.choice(CATEGORIES),
+        "location_coordinates": None,
+        "areaName": rng.choice(AREAS),
+        "roadName": "Main Road",
+        "cityName": "Bengaluru",
+        "description": "Water has collected across the road and vehicles are moving slowly.",
+    } for _ in range(count)]
+    return "```json\n" + json.dumps(events, indent=2) + "\n```"
+
+class FakeGeminiServer:
+    def __init__(self, latency: Union[str, Dict[str, str]] = "0", error_rate: float = 0.0,
+                 responses: Dict[str, List[str]] = None, agent_tools: Dict[str, Dict[str, Any]] = None,
+                 transcript: str = DEFAULT_TRANSCRIPT, host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.random = random.Random(seed)
+        specs = latency if isinstance(latency, dict) else {kind: latency for kind in KINDS}
+        self.latency = {kind: parse_latency(specs.get(kind), self.random) for kind in KINDS}
+        self.error_rate = error_rate
+        self.responses = responses or {}
+        self.agent_tools = DEFAULT_AGENT_TOOLS if agent_tools is None else agent_tools
+        self.transcript = transcript
+        self.host = host
+        self.port = port
+        self.requests = Counter()
+        self.errors = Counter()
+        self._served = Counter()
+        self._runner = None
+        self._thread = None
+        self._loop = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def speech_url(self) -> str:
+        return f"{self.url}/speech-api/v2/recognize"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the backend at this server"""
+        return {
+            "GEMINI_API_ENDPOINT": self.url,
+            "GOOGLE_GEMINI_BASE_URL": self.url,
+            "GOOGLE_GENAI_USE_VERTEXAI": "false",
+            "SPEECH_API_ENDPOINT": self.speech_url,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": dict(self.requests), "injected_errors": dict(self.errors)}
+
+    def _canned(self, kind: str) -> str:
+        canned = self.responses.get(kind)
+        if canned:
+            answer = canned[self._served[kind] % len(canned)]
+        elif kind == "agent":
+            answer = ("**Reddit**\n- r/city0: waterlogging near main road\n\n"
+                      "**Twitter**\n- #flood: Heavy rain causing flooding on Main St")
+        else:
+            answer = civic_answer(self.random)
+        self._served[kind] += 1
+        return answer
+
+    @staticmethod
+    def _classify(body: Dict[str, Any]) -> str:
+        parts = [part for content in body.get("contents", []) for part in content.get("parts", [])]
+        if body.get("tools"):
+            return "agent"
+        if any("inlineData" in part or "inline_data" in part for part in parts):
+            return "image"
+        return "text"
+
+    def _agent_parts(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        contents = body.get("contents", [])
+        answered = any("functionResponse" in part or "function_response" in part
+                       for content in contents for part in content.get("parts", []))
+        declared = [declaration.get("name") for tool in body.get("tools", [])
+                    for declaration in tool.get("functionDeclarations", tool.get("function_declarations", []))]
+        calls = [name for name in declared if name in self.agent_tools]
+        if answered or not calls:
+            return [{"text": self._canned("agent")}]
+        return [{"functionCall": {"name": name, "args": self.agent_tools[name]}} for name in calls]
+
+    async def _delay(self, kind: str) -> bool:
+        """Sleep for the kind's latency; False when this request should fail"""
+        self.requests[kind] += 1
+        delay = self.latency[kind]()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors[kind] += 1
+            return False
+        return True
+
+    async def _generate(self, request):
+        body = await request.json()
+        model, _, method = request.match_info["target"].partition(":")
+        kind = self._classify(body)
+        if not await self._delay(kind):
+            return web.json_response({"error": {"code": 503, "message": "The model is overloaded.",
+                                                "status": "UNAVAILABLE"}}, status=503)
+        parts = self._agent_parts(body) if kind == "agent" else [{"text": self._canned(kind)}]
+        text_length = sum(len(part.get("text", "")) for part in parts)
+        response = {
+            "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": request.content_length // 4 if request.content_length else 0,
+                "candidatesTokenCount": text_length // 4 + 1,
+                "totalTokenCount": (request.content_length or 0) // 4 + text_length // 4 + 1,
+            },
+            "modelVersion": model,
+        }
+        if method == "streamGenerateContent":
+            if request.query.get("alt") == "sse":
+                return web.Response(text=f"data: {json.dumps(response)}\r\n\r\n", content_type="text/event-stream")
+            return web.json_response([response])
+        return web.json_response(response)
+
+    async def _recognize(self, request):
+        await request.read()
+        if not await self._delay("speech"):
+            return web.Response(status=503, text="Service Unavailable")
+        # The legacy speech API answers with one JSON object per line, the first one empty
+        result = {"result": [{"alternative": [{"transcript": self.transcript, "confidence": 0.93}], "final": True}],
+                  "result_index": 0}
+        return web.Response(text=json.dumps({"result": []}) + "\n" + json.dumps(result) + "\n",
+                            content_type="application/json")
+
+    def _app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/{version}/models/{target}", self._generate)
+        app.router.add_post("/speech-api/v2/recognize", self._recognize)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def start_in_thread(self):
+        """Run the server on a private event loop thread; returns once listening"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result(timeout=10)
+        return self
+
+    def stop_thread(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Gemini API server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4",
+                        help="latency spec for every kind, or a JSON object per kind")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--responses", help="JSON file mapping kind -> list of canned answers")
+    args = parser.parse_args()
+    latency = json.loads(args.latency) if args.latency.startswith("{") else args.latency
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    server = FakeGeminiServer(latency=latency, error_rate=args.error_rate, responses=responses, port=args.port)
+    web.run_app(server._app(), host=server.host, port=args.port)
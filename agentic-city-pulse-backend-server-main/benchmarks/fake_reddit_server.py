@@ -0,0 +1,177 @@
+"""
+Local fake of the parts of Reddit's OAuth API the backend uses.
+
+Serves ``POST /api/v1/access_token`` and ``GET /r/{subreddit}/{hot,new}``
+with ``limit``/``after``/``before`` pagination, from deterministic in-memory
+data. Latency, error rate and missing subreddits are configurable so the
+fetchers and the scheduler can be tested and benchmarked offline.
+
+    async with FakeRedditServer(subreddits=500) as server:
+        fetcher = AsyncRedditFetcher("id", "secret", "ua",
+                                     base_url=server.url, auth_url=server.auth_url)
+
+For synchronous callers (the scheduler), ``server.start_in_thread()`` runs
+the server on its own event loop and returns once it is listening.
+"""
+import time
+import random
+import asyncio
+import threading
+from typing import Dict, List, Any, Iterable
+
+from aiohttp import web
+
+class FakeRedditServer:
+    def __init__(self, subreddits=100, posts_per_subreddit: int = 50,
+                 latency: float = 0.0, latency_jitter: float = 0.0, error_rate: float = 0.0,
+                 missing: Iterable[str] = (), rate_limit: int = 1000, host: str = "127.0.0.1",
+                 port: int = 0, seed: int = 0):
+        if isinstance(subreddits, int):
+            subreddits = [f"city{i}" for i in range(subreddits)]
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.missing = {s.lower() for s in missing}
+        self.rate_limit = rate_limit
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self.token_requests = 0
+        self._next_id = 0
+        self._runner = None
+        self._thread = None
+        self._loop = None
+        # subreddit (lower-case) -> posts, newest first
+        self.posts: Dict[str, List[Dict[str, Any]]] = {}
+        now = time.time()
+        for sub in subreddits:
+            self.posts[sub.lower()] = []
+            self.add_posts(sub, posts_per_subreddit, now=now - posts_per_subreddit * 60)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def auth_url(self) -> str:
+        return f"{self.url}/api/v1/access_token"
+
+    def add_posts(self, subreddit: str, count: int, now: float = None) -> List[Dict[str, Any]]:
+        """Publish ``count`` new posts to a subreddit (newest first)"""
+        now = time.time() if now is None else now
+        new = []
+        for i in range(count):
+            self._next_id += 1
+            post_id = format(self._next_id, "x")
+            new.append({
+                "id": post_id,
+                "name": f"t3_{post_id}",
+                "subreddit": subreddit,
+                "title": f"Post {post_id} in r/{subreddit}: waterlogging near main road",
+                "created_utc": now + i,
+                "permalink": f"/r/{subreddit}/comments/{post_id}/",
+                "url": f"https://reddit.test/r/{subreddit}/comments/{post_id}/",
+                "score": self.random.randint(0, 500),
+                "num_comments": self.random.randint(0, 50),
+            })
+        self.posts.setdefault(subreddit.lower(), [])[:0] = reversed(new)
+        return new
+
+    async def _token(self, request):
+        self.token_requests += 1
+        return web.json_response({"access_token": "fake-token", "token_type": "bearer", "expires_in": 3600,
+                                  "scope": "*"})
+
+    async def _listing(self, request):
+        self.request_count += 1
+        delay = self.latency + self.random.uniform(0, self.latency_jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        headers = {
+            "x-ratelimit-remaining": str(max(self.rate_limit - self.request_count, 0)),
+            "x-ratelimit-used": str(self.request_count),
+            "x-ratelimit-reset": "600",
+        }
+        if not request.headers.get("Authorization", "").startswith("bearer "):
+            return web.json_response({"message": "Unauthorized"}, status=401, headers=headers)
+        sub = request.match_info["subreddit"].lower()
+        if sub in self.missing or sub not in self.posts:
+            return web.json_response({"message": "Not Found"}, status=404, headers=headers)
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.json_response({"message": "Internal Server Error"}, status=500, headers=headers)
+
+        posts = self.posts[sub]
+        if request.match_info["listing"] == "hot":
+            posts = sorted(posts, key=lambda p: p["score"], reverse=True)
+        limit = min(int(request.query.get("limit", 25)), 100)
+        names = [p["name"] for p in posts]
+        after, before = request.query.get("after"), request.query.get("before")
+        if before:
+            # Items newer than ``before`` (i.e. listed ahead of it)
+            end = names.index(before) if before in names else 0
+            page = posts[max(end - limit, 0):end]
+        else:
+            start = names.index(after) + 1 if after in names else 0
+            page = posts[start:start + limit]
+        next_after = page[-1]["name"] if page and posts.index(page[-1]) < len(posts) - 1 and not before else None
+        return web.json_response({
+            "kind": "Listing",
+            "data": {
+                "after": next_after,
+                "before": page[0]["name"] if page else None,
+                "children": [{"kind": "t3", "data": p} for p in page],
+            },
+        }, headers=headers)
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/v1/access_token", self._token)
+        app.router.add_get("/r/{subreddit}/{listing:(hot|new)}", self._listing)
+        app.router.add_get("/r/{subreddit}/{listing:(hot|new)}.json", self._listing)
+        return app
+
+    async def start(self):
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def start_in_thread(self):
+        """Run the server on a private event loop thread; returns once listening"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-reddit", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result(timeout=10)
+        return self
+
+    def stop_thread(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Reddit API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--subreddits", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    server = FakeRedditServer(subreddits=args.subreddits, latency=args.latency, port=args.port)
+    web.run_app(server._app(), host=server.host, port=args.port)
@@ -0,0 +1,328 @@
+"""
+Load-test DataScraperScheduler with thousands of simulated sources.
+
+For each scale in ``--sources``, a fake Reddit server is started with that
+many subreddits, named like city subreddits (``city007_traffic``). It has
+injected latency, jitter and error rate, and some subreddits are missing.
+A publisher thread keeps posting to it, with a few busy cities getting
+most of the posts. Twitter is simulated in-process with its own latency
+and failure rate (tweets come from a local sample, not a server).
+
+The real scheduler (APScheduler jobs, shared worker pool, async fetcher,
+adaptive polling) then runs against it for ``--seconds``. Intervals are
+scaled down (``--tick``, ``--min-interval``, ...) so many polls fit in a
+short run. Each scale reports:
+
+- cycle duration p50/p95/max per job, sources per cycle, cycles that
+  overran the tick, and failed cycles
+- overlapped runs (still running when the next was due) and missed runs
+  (started later than the grace time), as counted by APScheduler
+- items ingested and items/s, and freshness lag (post published to item
+  in the feed), p50/p95
+- backlog: the largest number and the final number of sources overdue by
+  more than one tick, and sources never polled
+- thread count (peak) and RSS (start, peak, end)
+
+plus whether the scheduler kept up: median cycle within the tick, no
+failed cycles, and under 5% of sources overdue at the end. The largest
+scale that kept up is reported as the scaling limit. Results are printed
+and written to ``--output`` as JSON.
+
+The fake Reddit reports a generous rate limit by default, so the
+adaptive budget does not mask the scheduler's own limits. Pass
+``--rate-limit 1000`` to see how Reddit's real quota stretches the
+intervals.
+
+Usage:
+    python benchmarks/load_scheduler.py [--sources 200 1000 3000] [--seconds 30]
+        [--latency 0.05 --jitter 0.1 --error-rate 0.02] [--output scheduler_load.json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import contextlib
+from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from fake_reddit_server import FakeRedditServer
+from bench_e2e import RssSampler, latency_summary
+
+TOPICS = ["traffic", "flood", "weather", "power", "water", "roads", "garbage", "transit", "news", "alerts"]
+TWEET_TEXTS = ["Heavy rain causing flooding near the market #flood", "Signal failure, long queues at the metro #metro",
+               "Power cut across the sector since 6am #poweroutage", "Tree fell across the main road #traffic"]
+
+def source_names(count: int) -> List[str]:
+    return [f"city{i // len(TOPICS):03d}_{TOPICS[i % len(TOPICS)]}" for i in range(count)]
+
+class RecordingHub:
+    """Event hub stand-in that records when each new item reached the feed"""
+
+    def __init__(self):
+        self.lags: List[float] = []
+        self.items = defaultdict(int)
+        # Posts seeded before the run are backdated; only later ones count towards the lag
+        self.since = time.time()
+        self._lock = threading.Lock()
+
+    def publish(self, kind: str, items) -> int:
+        now = time.time()
+        with self._lock:
+            for item in items:
+                self.items[kind] += 1
+                if kind == "reddit_post" and (item.get("created_utc") or 0) >= self.since:
+                    self.lags.append(now - item["created_utc"])
+        return 0
+
+class CycleRecorder:
+    """Wraps a scheduler job function to time each run and catch overlapping runs"""
+
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.durations = defaultdict(list)
+        self.sizes = defaultdict(list)
+        self.concurrent_peak = defaultdict(int)
+        self._running = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def wrap(self, job: str, func, size=None):
+        def run():
+            with self._lock:
+                self._running[job] += 1
+                self.concurrent_peak[job] = max(self.concurrent_peak[job], self._running[job])
+            started = time.perf_counter()
+            try:
+                func()
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running[job] -= 1
+                    self.durations[job].append(elapsed)
+                    if size is not None:
+                        self.sizes[job].append(size())
+        return run
+
+    def summary(self, job: str) -> Dict[str, Any]:
+        durations = self.durations[job]
+        summary = {
+            "cycles": len(durations),
+            **{key.replace("_ms", "_s"): round(value / 1000, 3) if value is not None else None
+               for key, value in latency_summary(durations).items()},
+            "overran_tick": sum(1 for d in durations if d > self.tick),
+            "concurrent_runs_peak": self.concurrent_peak[job],
+        }
+        sizes = [s for s in self.sizes[job] if s]
+        if job in self.sizes:
+            summary.update({
+                "polling_cycles": len(sizes),
+                "sources_per_cycle_mean": round(sum(sizes) / len(sizes), 1) if sizes else 0,
+                "sources_per_cycle_max": max(sizes) if sizes else 0,
+            })
+        return summary
+
+def run_scale(sources: int, args) -> Dict[str, Any]:
+    names = source_names(sources)
+    rng = random.Random(args.seed)
+    missing = set(rng.sample(names, int(len(names) * args.missing)))
+    server = FakeRedditServer(subreddits=names, posts_per_subreddit=5, latency=args.latency,
+                              latency_jitter=args.jitter, error_rate=args.error_rate, missing=missing,
+                              rate_limit=args.rate_limit, seed=args.seed).start_in_thread()
+    os.environ.update({
+        "REDDIT_CLIENT_ID": "id", "REDDIT_CLIENT_SECRET": "secret", "REDDIT_USER_AGENT": "load-test",
+        "REDDIT_API_BASE_URL": server.url, "REDDIT_AUTH_URL": server.auth_url,
+    })
+
+    from event_store import EventStore
+    from scheduler import DataScraperScheduler
+    from polling import AdaptivePollPolicy
+    from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_ERROR
+
+    store_dir = tempfile.mkdtemp(prefix="load_scheduler")
+    hub = RecordingHub()
+    scheduler = DataScraperScheduler(store=EventStore(os.path.join(store_dir, "events.db")), hub=hub)
+    scheduler.subreddits = list(names)
+    scheduler.poll_tick = args.tick
+    scheduler.polling = AdaptivePollPolicy(min_interval=args.min_interval, max_interval=args.max_interval,
+                                           base_interval=args.base_interval, seed=args.seed)
+    scheduler.scheduler.configure(job_defaults={'coalesce': True, 'max_instances': 1,
+                                                'misfire_grace_time': args.tick})
+    scheduler.reddit_fetcher.per_host_limit = args.per_host_limit
+
+    # Simulated Twitter source with its own latency and failures
+    twitter_rng = random.Random(args.seed + 1)
+    tweet_ids = iter(range(10 ** 9))
+
+    def scrape_twitter():
+        time.sleep(max(0.0, args.latency + twitter_rng.uniform(0, args.jitter)))
+        if twitter_rng.random() < args.error_rate:
+            return []
+        now = datetime.now().isoformat()
+        return [{"id": next(tweet_ids), "date": now, "content": twitter_rng.choice(TWEET_TEXTS),
+                 "username": "resident", "hashtag": "#city"} for _ in range(twitter_rng.randint(0, 5))]
+    scheduler._scrape_twitter_data = scrape_twitter
+
+    # Count what each Reddit cycle fetched and which sources failed
+    recorder = CycleRecorder(args.tick)
+    fetched = {"sources": 0, "errors": 0, "applied": 0, "failed_cycles": 0, "last_size": 0}
+    apply_results = scheduler._apply_reddit_results
+
+    def counted_apply(results):
+        fetched["sources"] += len(results)
+        fetched["errors"] += sum(1 for result in results.values() if "error" in result)
+        fetched["applied"] += 1
+        return apply_results(results)
+    scheduler._apply_reddit_results = counted_apply
+    due_reddit = scheduler.polling.due
+
+    def poll_reddit():
+        due = due_reddit([f"reddit:{sub}" for sub in scheduler.subreddits])
+        fetched["last_size"] = len(due)
+        if due:
+            applied = fetched["applied"]
+            scheduler._run_reddit_scraper([source.split(':', 1)[1] for source in due])
+            # The scraper swallows cycle-level failures (e.g. the fetch timing out); nothing gets applied then
+            if fetched["applied"] == applied:
+                fetched["failed_cycles"] += 1
+    scheduler._poll_reddit = recorder.wrap("reddit", poll_reddit, size=lambda: fetched["last_size"])
+    scheduler._poll_twitter = recorder.wrap("twitter", scheduler._poll_twitter)
+
+    skipped = defaultdict(lambda: defaultdict(int))
+
+    def on_event(event):
+        kind = {EVENT_JOB_MAX_INSTANCES: "overlapped", EVENT_JOB_MISSED: "missed",
+                EVENT_JOB_ERROR: "errors"}[event.code]
+        skipped[event.job_id][kind] += 1
+    scheduler.scheduler.add_listener(on_event, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED | EVENT_JOB_ERROR)
+
+    stop = threading.Event()
+    hot_cities = rng.sample(names, max(1, len(names) // 20))
+
+    def publisher():
+        # Posts arrive at --post-rate per second; busy sources get most of them
+        interval = 1.0 / args.post_rate if args.post_rate else None
+        while interval and not stop.wait(interval):
+            target = rng.choice(hot_cities) if rng.random() < 0.7 else rng.choice(names)
+            server.add_posts(target, 1)
+
+    backlog = {"peak": 0, "final": 0, "never_polled": 0}
+
+    def monitor():
+        while not stop.wait(0.25):
+            threads["peak"] = max(threads["peak"], threading.active_count())
+            now = time.monotonic()
+            with scheduler.polling._lock:
+                states = list(scheduler.polling._sources.values())
+            overdue = sum(1 for state in states if now - state['next_due'] > args.tick)
+            backlog["peak"] = max(backlog["peak"], overdue)
+            backlog["final"] = overdue
+            backlog["never_polled"] = len(names) + 1 - sum(1 for state in states if state['last_polled'] is not None)
+
+    rss = RssSampler(os.getpid())
+    rss_start = round((rss.read_kb() or 0) / 1024, 1)
+    threads = {"start": threading.active_count(), "peak": threading.active_count()}
+    rss.start()
+    quiet = io.StringIO()
+    background = [threading.Thread(target=publisher, daemon=True), threading.Thread(target=monitor, daemon=True)]
+    for thread in background:
+        thread.start()
+    try:
+        # The scheduler narrates every cycle on stdout; keep the report readable
+        with contextlib.redirect_stdout(quiet):
+            started = time.perf_counter()
+            scheduler.start()
+            initial_s = time.perf_counter() - started
+            time.sleep(args.seconds)
+            stop.set()
+            scheduler.stop()
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        for thread in background:
+            thread.join(timeout=5)
+        peak_rss = rss.stop()
+        server.stop_thread()
+    status = scheduler.get_status()
+    scheduler.store.close()
+
+    reddit = recorder.summary("reddit")
+    reddit["failed_cycles"] = fetched["failed_cycles"]
+    ingested = hub.items["reddit_post"] + hub.items["tweet"]
+    lags = sorted(hub.lags)
+    overdue_share = backlog["final"] / (len(names) + 1)
+    result = {
+        "sources": sources,
+        "seconds": round(elapsed, 1),
+        "initial_cycle_s": round(initial_s, 2),
+        "jobs": {"reddit": reddit, "twitter": recorder.summary("twitter")},
+        "skipped_runs": {job: dict(counts) for job, counts in skipped.items()},
+        "fetch": {"sources_polled": fetched["sources"], "source_errors": fetched["errors"],
+                  "fake_requests": server.request_count},
+        "items": {"reddit_posts": hub.items["reddit_post"], "tweets": hub.items["tweet"],
+                  "items_per_s": round(ingested / elapsed, 1) if elapsed else None},
+        "freshness_lag_s": {
+            "p50": round(lags[len(lags) // 2], 2) if lags else None,
+            "p95": round(lags[int(len(lags) * 0.95)], 2) if lags else None,
+        },
+        "backlog": {"overdue_peak": backlog["peak"], "overdue_final": backlog["final"],
+                    "never_polled": backlog["never_polled"], "overdue_final_share": round(overdue_share, 3)},
+        "threads": {"start": threads["start"], "peak": threads["peak"]},
+        "rss_mb": {"start": rss_start, "peak": peak_rss, "end": round((rss.read_kb() or 0) / 1024, 1)},
+        "workers": status["workers"],
+    }
+    result["kept_up"] = bool(reddit["p50_s"] is not None and reddit["p50_s"] <= args.tick and overdue_share < 0.05
+                             and not reddit["failed_cycles"])
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sources", type=int, nargs="+", default=[200, 1000, 3000])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--tick", type=float, default=1.0, help="job tick (production: 15s)")
+    parser.add_argument("--min-interval", type=float, default=2.0, help="production: 30s")
+    parser.add_argument("--max-interval", type=float, default=60.0, help="production: 900s")
+    parser.add_argument("--base-interval", type=float, default=8.0, help="production: 120s")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per Reddit/Twitter request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="extra uniform latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--missing", type=float, default=0.01, help="share of subreddits that 404")
+    parser.add_argument("--post-rate", type=float, default=50.0, help="new posts per second across all sources")
+    parser.add_argument("--rate-limit", type=int, default=10 ** 9)
+    parser.add_argument("--per-host-limit", type=int, default=8)
+    parser.add_argument("--output", default="scheduler_load.json")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    for name in ("scheduler", "apscheduler", "event_store"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+    results = []
+    for sources in args.sources:
+        result = run_scale(sources, args)
+        results.append(result)
+        reddit = result["jobs"]["reddit"]
+        print(f"{sources} sources: reddit cycle p50 {reddit['p50_s']}s p95 {reddit['p95_s']}s (tick {args.tick}s), "
+              f"{result['items']['items_per_s']} items/s, overdue {result['backlog']['overdue_final']}, "
+              f"overlapped {result['skipped_runs'].get('reddit_scraper', {}).get('overlapped', 0)}, "
+              f"kept up: {result['kept_up']}", file=sys.stderr)
+    kept_up = [r["sources"] for r in results if r["kept_up"]]
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "scaling_limit": max(kept_up) if kept_up else None,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Generate the media fixture corpus for the end-to-end benchmarks.
+
+Writes, into one directory, deterministic phone-sized photos as JPEG, PNG
+and HEIC, each with and without GPS EXIF, and WAV voice-note stand-ins of
+several lengths (tone bursts separated by silence, so the speech path
+splits them into chunks like real speech). A ``manifest.json`` lists every
+file with its kind, MIME type, size and expected GPS position.
+
+Images need Pillow; HEIC also needs ``pillow-heif`` and is skipped (and
+left out of the manifest) without it. Audio uses only the standard library.
+
+Usage:
+    python benchmarks/media_fixtures.py [--out /tmp/civic-media] [--width 1600] [--height 1200]
+"""
+import os
+import json
+import math
+import wave
+import random
+import struct
+import argparse
+from typing import Dict, List, Any, Sequence
+
+# Somewhere in Bengaluru, so located reports land in the same area as the synthetic events
+GPS_POSITION = (12.9352, 77.6245)
+AUDIO_SECONDS = (5, 20, 60)
+AUDIO_RATE = 16000
+
+def _dms(value: float):
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round((value - degrees - minutes / 60) * 3600, 4)
+    return (float(degrees), float(minutes), seconds)
+
+def gps_exif(latitude: float, longitude: float) -> bytes:
+    """EXIF block (as Pillow writes it) carrying a GPS position"""
+    from PIL import Image, ExifTags
+
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = "CityPulseBench"
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps[ExifTags.GPS.GPSLatitudeRef] = "N" if latitude >= 0 else "S"
+    gps[ExifTags.GPS.GPSLatitude] = _dms(latitude)
+    gps[ExifTags.GPS.GPSLongitudeRef] = "E" if longitude >= 0 else "W"
+    gps[ExifTags.GPS.GPSLongitude] = _dms(longitude)
+    return exif.tobytes()
+
+def _photo(width: int, height: int, seed: int):
+    """A street-like picture: sky and road gradients plus sensor noise, so it compresses like a photo"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(image)
+    horizon = height * 2 // 5
+    for y in range(height):
+        if y < horizon:
+            shade = (110 + y * 80 // horizon, 150 + y * 60 // horizon, 220)
+        else:
+            t = (y - horizon) / (height - horizon)
+            shade = (int(90 - 40 * t), int(90 - 40 * t), int(95 - 35 * t))
+        draw.line([(0, y), (width, y)], fill=shade)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(horizon, height)
+        w, h = rng.randint(20, width // 6), rng.randint(10, height // 10)
+        draw.rectangle([x, y, x + w, y + h], fill=(rng.randint(30, 200), rng.randint(30, 200), rng.randint(30, 200)))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    return Image.blend(image, noise, 0.12)
+
+def write_images(directory: str, width: int, height: int, seed: int = 0) -> List[Dict[str, Any]]:
+    from PIL import Image
+
+    formats = [("jpg", "JPEG", "image/jpeg", {"quality": 88}), ("png", "PNG", "image/png", {"optimize": False})]
+    try:
+        import pillow_heif
+        pillow_heif.register_heif_opener()
+        formats.append(("heic", "HEIF", "image/heic", {"quality": 80}))
+    except ImportError:
+        print("pillow-heif is not installed; skipping HEIC fixtures")
+
+    photo = _photo(width, height, seed)
+    exif = gps_exif(*GPS_POSITION)
+    entries = []
+    for extension, format_name, mime_type, options in formats:
+        for located in (True, False):
+            name = f"photo_{'gps' if located else 'nogps'}.{extension}"
+            path = os.path.join(directory, name)
+            extra = {"exif": exif} if located else {}
+            photo.save(path, format=format_name, **options, **extra)
+            with Image.open(path) as check:
+                size = check.size
+            entries.append({"file": name, "kind": "image", "format": extension, "mime_type": mime_type,
+                            "has_gps": located, "gps": list(GPS_POSITION) if located else None,
+                            "bytes": os.path.getsize(path), "size": list(size)})
+    return entries
+
+def write_audio(directory: str, durations: Sequence[int] = AUDIO_SECONDS, seed: int = 0) -> List[Dict[str, Any]]:
+    """Mono 16-bit WAV clips: 1.5-3 s voiced bursts separated by 0.8 s of silence"""
+    rng = random.Random(seed)
+    entries = []
+    for seconds in durations:
+        total = seconds * AUDIO_RATE
+        samples, bursts = [], 0
+        while len(samples) < total:
+            length = int(rng.uniform(1.5, 3.0) * AUDIO_RATE)
+            pitch = rng.uniform(110, 220)
+            for i in range(length):
+                t = i / AUDIO_RATE
+                envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * t)
+                value = envelope * (0.6 * math.sin(2 * math.pi * pitch * t) + 0.3 * math.sin(2 * math.pi * 2.1 * pitch * t))
+                samples.append(int(9000 * value))
+            samples.extend([0] * int(0.8 * AUDIO_RATE))
+            bursts += 1
+        samples = samples[:total]
+        name = f"voice_{seconds}s.wav"
+        path = os.path.join(directory, name)
+        with wave.open(path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(AUDIO_RATE)
+            out.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+        entries.append({"file": name, "kind": "audio", "format": "wav", "mime_type": "audio/x-wav",
+                        "seconds": seconds, "bursts": bursts, "bytes": os.path.getsize(path)})
+    return entries
+
+def build_corpus(directory: str, width: int = 1600, height: int = 1200, durations: Sequence[int] = AUDIO_SECONDS,
+                 seed: int = 0) -> List[Dict[str, Any]]:
+    """Write the corpus and its manifest; returns the manifest entries (paths relative to ``directory``)"""
+    os.makedirs(directory, exist_ok=True)
+    entries = write_images(directory, width, height, seed) + write_audio(directory, durations, seed)
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(entries, f, indent=2)
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default=os.path.join(os.getenv("TMPDIR", "/tmp"), "civic-media"))
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--seconds", type=int, nargs="+", default=list(AUDIO_SECONDS))
+    args = parser.parse_args()
+    entries = build_corpus(args.out, args.width, args.height, args.seconds)
+    print(json.dumps({"directory": args.out, "files": entries}, indent=2))
+
+if __name__ == "__main__":
+    main()
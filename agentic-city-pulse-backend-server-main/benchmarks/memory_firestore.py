@@ -0,0 +1,238 @@
+"""
+In-memory fake of the parts of the Firestore client the chatbot uses.
+
+Supports ``collections()``, ``collection(name)``, ``document(id).set()/
+.delete()``, ``where`` (positional or ``filter=FieldFilter``), ``order_by``,
+``limit``, ``start_after``, ``end_at``, ``stream()``, ``count().get()`` and
+``on_snapshot`` listeners, and counts billed operations the way Firestore
+does (one read per document returned or delivered to a listener, one per
+aggregation query), so caching and sync can be tested and benchmarked
+offline.
+
+    db = MemoryFirestore()
+    db.collection("events").document("a").set({"eventName": "FLOOD"})
+    cache = SnapshotCache(db)
+    cache.load("events", 100)
+    print(db.reads)
+
+Listeners are called synchronously from the write that triggers them
+and honour filters and cursors (not ``limit``).
+"""
+import itertools
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable, Optional
+
+DOCUMENT_ID = "__name__"
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a is not None and a != b,
+    "in": lambda a, b: a in b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+}
+
+class _ChangeType:
+    def __init__(self, name):
+        self.name = name
+
+ADDED, MODIFIED, REMOVED = _ChangeType("ADDED"), _ChangeType("MODIFIED"), _ChangeType("REMOVED")
+
+class DocumentChange:
+    def __init__(self, type, document):
+        self.type = type
+        self.document = document
+
+class DocumentSnapshot:
+    def __init__(self, reference, data: Optional[Dict[str, Any]], update_time: datetime):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field: str):
+        return self.id if field == DOCUMENT_ID else (self._data or {}).get(field)
+
+class DocumentReference:
+    def __init__(self, collection, doc_id: str):
+        self.collection = collection
+        self.id = doc_id
+
+    def set(self, data: Dict[str, Any]):
+        self.collection._write(self.id, dict(data))
+
+    def update(self, data: Dict[str, Any]):
+        current = self.collection._docs.get(self.id)
+        if current is None:
+            raise KeyError(f"No document to update: {self.id}")
+        self.collection._write(self.id, {**current[0], **data})
+
+    def delete(self):
+        self.collection._write(self.id, None)
+
+    def get(self) -> DocumentSnapshot:
+        self.collection.client.reads += 1
+        data, update_time = self.collection._docs.get(self.id, (None, None))
+        return DocumentSnapshot(self, data, update_time)
+
+class _Aggregation:
+    def __init__(self, query, alias):
+        self.query, self.alias = query, alias
+
+    def get(self):
+        matched = sum(1 for _ in self.query._matching())
+        # Billed as one read per batch of up to 1000 index entries
+        self.query.collection.client.reads += max(1, -(-matched // 1000))
+        result = type("AggregationResult", (), {"alias": self.alias, "value": matched})()
+        return [[result]]
+
+class Watch:
+    def __init__(self, query, callback):
+        self.query, self.callback = query, callback
+        self.matching = set()
+
+    def unsubscribe(self):
+        self.query.collection._listeners.discard(self)
+
+class Query:
+    def __init__(self, collection, filters=(), order=None, limit=None, after=None, until=None):
+        self.collection = collection
+        self.filters = tuple(filters)
+        self.order = order
+        self._limit = limit
+        self.after = after
+        self.until = until
+
+    def _copy(self, **changes) -> "Query":
+        values = {"filters": self.filters, "order": self.order, "limit": self._limit, "after": self.after,
+                  "until": self.until}
+        values.update(changes)
+        return Query(self.collection, **values)
+
+    def where(self, field_path: str = None, op_string: str = None, value: Any = None, filter=None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self.filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "Query":
+        return self._copy(order=(field_path, str(direction).upper().startswith("DESC")))
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit=count)
+
+    def start_after(self, document) -> "Query":
+        return self._copy(after=document)
+
+    def end_at(self, document) -> "Query":
+        return self._copy(until=document)
+
+    def count(self, alias: str = None) -> _Aggregation:
+        return _Aggregation(self, alias)
+
+    def _test(self, snapshot: DocumentSnapshot) -> bool:
+        return snapshot.exists and all(_OPS[op](snapshot.get(field), value) for field, op, value in self.filters)
+
+    def _within(self, snapshot: DocumentSnapshot) -> bool:
+        """Whether the document falls between the ``start_after`` and ``end_at`` cursors"""
+        field, descending = self.order or (DOCUMENT_ID, False)
+        value = snapshot.get(field)
+        for cursor, inclusive, before in ((self.after, False, descending), (self.until, True, not descending)):
+            if cursor is None:
+                continue
+            bound = cursor.get(field)
+            if value is None or bound is None:
+                return False
+            if value == bound:
+                if not inclusive:
+                    return False
+            elif (value < bound) != before:
+                return False
+        return True
+
+    def _matching(self):
+        snapshots = [DocumentSnapshot(DocumentReference(self.collection, doc_id), data, update_time)
+                     for doc_id, (data, update_time) in self.collection._docs.items()]
+        snapshots = [s for s in snapshots if self._test(s) and self._within(s)]
+        field, descending = self.order or (DOCUMENT_ID, False)
+        snapshots.sort(key=lambda s: (s.get(field) is None, s.get(field)), reverse=descending)
+        return iter(snapshots[:self._limit] if self._limit is not None else snapshots)
+
+    def stream(self):
+        for snapshot in self._matching():
+            self.collection.client.reads += 1
+            yield snapshot
+
+    def get(self) -> List[DocumentSnapshot]:
+        return list(self.stream())
+
+    def on_snapshot(self, callback: Callable) -> Watch:
+        watch = Watch(self, callback)
+        initial = list(self._matching())
+        watch.matching = {s.id for s in initial}
+        self.collection.client.reads += len(initial)
+        self.collection._listeners.add(watch)
+        callback(initial, [DocumentChange(ADDED, s) for s in initial], datetime.now(timezone.utc))
+        return watch
+
+class CollectionReference(Query):
+    def __init__(self, client, name: str):
+        self.client = client
+        self.id = name
+        # doc id -> (data, update time); data is None once deleted
+        self._docs: Dict[str, tuple] = {}
+        self._listeners = set()
+        self._ids = itertools.count()
+        super().__init__(self)
+
+    def document(self, doc_id: str = None) -> DocumentReference:
+        return DocumentReference(self, doc_id or f"auto{next(self._ids):08d}")
+
+    def add(self, data: Dict[str, Any]):
+        reference = self.document()
+        reference.set(data)
+        return reference
+
+    def _write(self, doc_id: str, data: Optional[Dict[str, Any]]):
+        self.client.writes += 1
+        if data is None:
+            self._docs.pop(doc_id, None)
+        else:
+            self._docs[doc_id] = (data, datetime.now(timezone.utc))
+        snapshot = DocumentSnapshot(DocumentReference(self, doc_id), data, datetime.now(timezone.utc))
+        for watch in list(self._listeners):
+            was, now = doc_id in watch.matching, watch.query._test(snapshot) and watch.query._within(snapshot)
+            if not was and not now:
+                continue
+            if now:
+                change = DocumentChange(MODIFIED if was else ADDED, snapshot)
+                watch.matching.add(doc_id)
+            else:
+                change = DocumentChange(REMOVED, snapshot)
+                watch.matching.discard(doc_id)
+            self.client.reads += 1
+            watch.callback([], [change], datetime.now(timezone.utc))
+
+class MemoryFirestore:
+    def __init__(self):
+        self._collections: Dict[str, CollectionReference] = {}
+        self.reads = 0
+        self.writes = 0
+        self.list_calls = 0
+
+    def collection(self, name: str) -> CollectionReference:
+        if name not in self._collections:
+            self._collections[name] = CollectionReference(self, name)
+        return self._collections[name]
+
+    def collections(self):
+        self.list_calls += 1
+        return iter([c for c in self._collections.values() if c._docs])
@@ -0,0 +1,85 @@
+"""
+Startup-time budget check for the API servers.
+
+Imports each server module in a fresh interpreter under ``python -X importtime``
+and fails (exit code 1) if the cumulative import time exceeds the budget or if
+any of the lazily-loaded heavy dependencies were pulled in at import time.
+
+Usage:
+    python benchmarks/startup_budget.py [--budget-ms 1000] [--runs 3]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENTS_DIR = os.path.join(ROOT, "agents")
+HACKATHON_DIR = os.path.join(ROOT, "hackathon")
+
+# Modules that must only be imported on first use of their request path
+LAZY_MODULES = [
+    "google.generativeai",
+    "google.adk",
+    "speech_recognition",
+    "pydub",
+    "PIL",
+    "magic",
+    "praw",
+]
+
+SERVERS = {
+    "agents/app.py": "app",
+    "hackathon/api_endpoint.py": "api_endpoint",
+}
+
+def measure_import(module: str) -> Dict[str, Any]:
+    """Import a server module in a subprocess and parse the -X importtime report"""
+    check_lazy = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([AGENTS_DIR, HACKATHON_DIR, env.get("PYTHONPATH", "")])
+    # Both servers mount ./static, which lives next to agents/app.py
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check_lazy],
+        cwd=AGENTS_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    return {
+        "import_ms": round((cumulative_us or 0) / 1000, 1),
+        "eager_heavy_modules": json.loads(proc.stdout.strip().splitlines()[-1]),
+    }
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 1000)))
+    parser.add_argument("--runs", type=int, default=3, help="best-of-N to smooth out disk cache noise")
+    args = parser.parse_args(argv)
+
+    failed = False
+    report = {}
+    for path, module in SERVERS.items():
+        runs = [measure_import(module) for _ in range(args.runs)]
+        best = min(runs, key=lambda r: r["import_ms"])
+        over_budget = best["import_ms"] > args.budget_ms
+        failed = failed or over_budget or bool(best["eager_heavy_modules"])
+        report[path] = {**best, "budget_ms": args.budget_ms, "over_budget": over_budget}
+
+    print(json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Stress the scheduler's snapshot reads while refreshes run concurrently.
+
+Reader threads call ``get_scraped_data()`` in a tight loop and check every
+snapshot they get: it must be read-only, its version must never go
+backwards for a reader, and no Reddit entry may be newer than the snapshot
+that contains it. Meanwhile writer threads run Reddit/Twitter scrapes and
+on-demand refreshes against a local FakeRedditServer that keeps publishing
+posts. Exits non-zero if any check fails.
+
+Usage:
+    python benchmarks/stress_scheduler_snapshot.py --readers 4 --seconds 10
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "hackathon"))
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+from fake_reddit_server import FakeRedditServer
+
+def check_snapshot(snapshot, last_version):
+    """Return a list of problems with one snapshot"""
+    problems = []
+    try:
+        snapshot['reddit'] = ()
+        problems.append("snapshot is mutable")
+    except TypeError:
+        pass
+    version = snapshot['version']
+    if version < last_version:
+        problems.append(f"version went backwards: {last_version} -> {version}")
+    for entry in snapshot['reddit']:
+        if entry['version'] > version:
+            problems.append(f"r/{entry['subreddit']} entry v{entry['version']} in snapshot v{version}")
+    if len(snapshot['twitter']) > 200:
+        problems.append(f"{len(snapshot['twitter'])} tweets in snapshot")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--subreddits", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    server = FakeRedditServer(subreddits=args.subreddits, posts_per_subreddit=20,
+                              latency=args.latency).start_in_thread()
+    os.environ.update({
+        "REDDIT_CLIENT_ID": "id", "REDDIT_CLIENT_SECRET": "secret", "REDDIT_USER_AGENT": "stress",
+        "REDDIT_API_BASE_URL": server.url, "REDDIT_AUTH_URL": server.auth_url,
+    })
+
+    from event_store import EventStore
+    from scheduler import DataScraperScheduler
+    from worker_pool import PoolSaturated
+
+    store_dir = tempfile.mkdtemp()
+    scheduler = DataScraperScheduler(store=EventStore(os.path.join(store_dir, "events.db")))
+    scheduler.subreddits = list(server.posts)
+    stop = threading.Event()
+    reads = [0] * args.readers
+    writes = {"scrapes": 0, "refreshes": 0, "rejected": 0}
+    problems = []
+
+    def reader(index):
+        last_version = 0
+        while not stop.is_set():
+            snapshot = scheduler.get_scraped_data()
+            found = check_snapshot(snapshot, last_version)
+            if found:
+                problems.extend(found)
+            last_version = snapshot['version']
+            reads[index] += 1
+
+    def writer(index):
+        rng = random.Random(index)
+        subreddits = list(server.posts)
+        while not stop.is_set():
+            server.add_posts(rng.choice(subreddits), rng.randint(1, 5))
+            action = rng.random()
+            if action < 0.4:
+                scheduler._run_reddit_scraper(rng.sample(subreddits, 10))
+                writes["scrapes"] += 1
+            elif action < 0.5:
+                scheduler._run_twitter_scraper()
+                writes["scrapes"] += 1
+            else:
+                try:
+                    scheduler.refresh_subreddit(rng.choice(subreddits)).result(timeout=30)
+                    writes["refreshes"] += 1
+                except PoolSaturated:
+                    writes["rejected"] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    status = scheduler.get_status()
+    scheduler.executor.shutdown(wait=True)
+    scheduler._stop_loop()
+    scheduler.store.close()
+    server.stop_thread()
+
+    print(json.dumps({
+        "seconds": round(elapsed, 2),
+        "reads": sum(reads),
+        "reads_per_s": round(sum(reads) / elapsed),
+        "writes": writes,
+        "final_version": status["version"],
+        "workers": status["workers"],
+        "problems": len(problems),
+        "first_problems": problems[:5],
+    }, indent=2))
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,32 @@
 import os
+import hmac
+import json
+import time
+import asyncio
 import tempfile
 import mimetypes
 import logging
 from datetime import datetime
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn
-from agent_garden import CivicIssueReporting
+from agent_garden import CivicIssueReporting, preload_image_path, preload_audio_path
+from get_metadata import extract_gps_location, preload_image_metadata
 from city_pulse_agent import city_pulse_agent
+from warmup import WarmUp
+from event_store import get_event_store
+from event_hub import get_event_hub
+from incidents import get_incident_index, stored_event_items
+from geo_index import get_geo_index
+from aggregates import get_aggregate_index
+from event_table import get_event_table
+from civic_events import record_civic_analysis, CivicStoreTail
+from scheduler import data_scheduler, start_scheduler, stop_scheduler
+from worker_pool import PoolSaturated
+from sampling_profiler import get_sampling_profiler, ProfilerBusy
+from relevance import prefilter_titles
+from async_reddit import MAX_PAGE_SIZE
 
 # Configure logging
 logging.basicConfig(
@@ -45,13 +62,76 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+def _preload_image():
+    preload_image_metadata()
+    preload_image_path()
+
+def _preload_reddit():
+    import praw  # noqa: F401
+
+# Heavy dependencies are imported on first use; warm up the configured paths
+warmup = WarmUp()
+warmup.register("image", _preload_image)
+warmup.register("audio", preload_audio_path)
+warmup.register("reddit", _preload_reddit)
+warmup.register("agent", city_pulse_agent.get_summary_runner)
+
+async def _scheduler_reddit_source(**context):
+    """Fan-out Reddit source backed by the scheduler cache; live fetch until it has data"""
+    entries = data_scheduler.get_scraped_data()['reddit']
+    if not entries:
+        return await city_pulse_agent.fetch_reddit_live(**context)
+    merged = {}
+    for entry in entries:
+        merged.update(entry['data'])
+    return merged
+
+# Civic analyses written to the shared store by other processes (agents/app.py)
+civic_tail = CivicStoreTail(interval=float(os.getenv("CIVIC_TAIL_INTERVAL", "2")))
+
+def _rebuild_indexes(until_seq: int):
+    """Rebuild the in-memory indexes and the event table from the event store, up to ``until_seq``"""
+    try:
+        store = get_event_store()
+        get_incident_index().rebuild(store, until_seq=until_seq)
+        geo = get_geo_index()
+        geo.ingest(stored_event_items(store, since=time.time() - geo.retention, kinds=["civic_analysis"],
+                                      until_seq=until_seq))
+        get_aggregate_index().ingest(stored_event_items(store, since=time.time() - 24 * 3600, until_seq=until_seq))
+        table = get_event_table()
+        table.extend(stored_event_items(store, since=time.time() - table.retention, until_seq=until_seq))
+    except Exception as e:
+        log_error(f"Index rebuild failed: {str(e)}")
+
+def _start_background():
+    # The tail picks up exactly where the rebuild stopped
+    last_seq = get_event_store().last_seq()
+    _rebuild_indexes(last_seq)
+    civic_tail.start(after_seq=last_seq)
+    if os.getenv("ENABLE_SCHEDULER", "true").lower() == "true":
+        start_scheduler()
+
 @app.on_event("startup")
 async def startup_event():
     log_warning("API server starting up")
+    warmup.start()
+    # Rebuilds the indexes and warm-starts the scheduler from the event store; don't hold up startup for it
+    asyncio.get_running_loop().run_in_executor(None, _start_background)
+    if os.getenv("ENABLE_SCHEDULER", "true").lower() == "true":
+        city_pulse_agent.fanout.register("reddit", _scheduler_reddit_source, timeout=6.0)
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once the configured paths are warmed up"""
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     log_warning("API server shutting down")
+    stop_scheduler()
+    civic_tail.stop()
+    get_event_store().flush()
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
@@ -90,7 +170,11 @@ async def process_file_upload(file: UploadFile, session_id: str):
         
         file_type, _ = mimetypes.guess_type(file.filename)
         
-        civic_agent = CivicIssueReporting(temp_file_path, file_type)
+        metadata = {"filename": file.filename, "mime_type": file_type}
+        if file_type and file_type.startswith('image/'):
+            # Photo GPS places the report for incident clustering
+            metadata["location"] = extract_gps_location(temp_file_path)
+        civic_agent = CivicIssueReporting(temp_file_path, file_type, metadata)
         
         if file_type and file_type.startswith('image/'):
             analysis_type = 'IMAGE'
@@ -99,7 +183,8 @@ async def process_file_upload(file: UploadFile, session_id: str):
         else:
             analysis_type = 'TEXT'
         
-        result = civic_agent.analyze_input(analysis_type)
+        result = await civic_agent.analyze_input(analysis_type, metadata)
+        record_civic_analysis(session_id, analysis_type, result, metadata)
         
         try:
             os.remove(temp_file_path)
@@ -122,8 +207,10 @@ async def process_file_upload(file: UploadFile, session_id: str):
 async def process_text_input(text: str, session_id: str):
     """Process text input directly"""
     try:
-        civic_agent = CivicIssueReporting(None, "text/plain")
-        result = civic_agent.analyze_input('TEXT', text)
+        metadata = {"text_length": len(text)}
+        civic_agent = CivicIssueReporting(None, "text/plain", metadata, text=text)
+        result = await civic_agent.analyze_input('TEXT', metadata)
+        record_civic_analysis(session_id, "TEXT", result, metadata)
         
         return {"result": result, "analysis_type": "TEXT", "input_type": "text", "text_length": len(text)}
         
@@ -136,36 +223,336 @@ async def analyze_city_pulse(query: str = Form(...), include_reddit: bool = Form
     Analyze city issues using Reddit and Twitter data
     """
     try:
-        result = city_pulse_agent.analyze_city_issues(query, include_reddit, include_twitter)
+        result = await city_pulse_agent.analyze_city_issues(query, include_reddit, include_twitter)
         return {"result": result}
     except Exception as e:
         log_error(f"City pulse analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _etag(*parts) -> str:
+    """Weak ETag from the scheduler version(s) and query parameters a response depends on"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names ``etag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+def _reddit_titles(subreddit: str, posts, error: str = None):
+    """Titles of the newest posts through the relevance prefilter, worded like the city-pulse tool"""
+    titles = [post['title'] for post in posts]
+    if not titles:
+        return [f"Error: {error}"] if error else [f"No recent posts found in r/{subreddit}."]
+    relevant = prefilter_titles(titles)
+    if not relevant:
+        return [f"None of the {len(titles)} recent posts in r/{subreddit} are about civic issues."]
+    return relevant
+
 @app.get("/api/city-pulse/reddit/{subreddit}")
-async def get_reddit_news(subreddit: str, limit: int = 5):
+async def get_reddit_news(subreddit: str, request: Request, response: Response, limit: int = 5):
     """
-    Get Reddit news from a specific subreddit
+    Get the newest posts from a specific subreddit.
+
+    Titles come from the subreddit's ``new`` listing (the one the scheduler
+    polls), not ``hot``. They go through the same relevance prefilter as
+    the city-pulse tools: non-civic posts are dropped and the rest are
+    prefixed with their category. Reads of up to ``reddit_window`` posts
+    are served from the scheduler's cache. Stale entries are returned
+    as-is and refreshed in the background, and unknown subreddits are
+    fetched once and then added to the poll set. Larger limits (up to 100)
+    are fetched live. Subreddits that don't exist return 404.
     """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    not_found = HTTPException(status_code=404, detail=f"r/{subreddit} is private, banned, or non-existent")
     try:
-        result = city_pulse_agent.get_reddit_news(subreddit, limit)
-        return {"result": result}
+        if data_scheduler.is_known_invalid(subreddit):
+            raise not_found
+        entry = data_scheduler.get_subreddit(subreddit)
+        if entry is None:
+            entry = await asyncio.wrap_future(data_scheduler.refresh_subreddit(subreddit, add_to_poll=True))
+            if data_scheduler.is_known_invalid(subreddit):
+                raise not_found
+        if limit > data_scheduler.reddit_window:
+            # Beyond the cached window: fetch the same listing live
+            result = (await asyncio.wrap_future(data_scheduler.fetch_recent(subreddit, limit)))[subreddit]
+            return {
+                "result": {subreddit: _reddit_titles(subreddit, result['posts'], result.get('error'))},
+                "version": entry['version'],
+                "fetched_at": time.time(),
+                "stale": False
+            }
+        stale = data_scheduler.is_stale(entry['fetched_at'])
+        if stale:
+            try:
+                data_scheduler.refresh_subreddit(subreddit)
+            except PoolSaturated:
+                # Workers are busy; serve the stale entry and revalidate on a later read
+                pass
+        etag = _etag("reddit", subreddit.lower(), entry['version'], limit)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return {
+            "result": {subreddit: _reddit_titles(subreddit, entry['posts'][:limit], entry['error'])},
+            "version": entry['version'],
+            "fetched_at": entry['fetched_at'],
+            "stale": stale
+        }
+    except HTTPException:
+        raise
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         log_error(f"Reddit news fetch failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/city-pulse/twitter")
-async def get_twitter_data(max_results: int = 20):
+async def get_twitter_data(request: Request, response: Response, max_results: int = 20):
     """
-    Get Twitter data (currently sample data)
+    Get Twitter data (currently sample data), served from the scheduler's cache
     """
     try:
-        result = city_pulse_agent.get_twitter_data(max_results)
-        return {"result": result}
+        cached = data_scheduler.get_twitter()
+        if not cached['fetched_at']:
+            # Nothing scraped yet in this process: fetch once and wait for it
+            await asyncio.wrap_future(data_scheduler.refresh_twitter())
+            cached = data_scheduler.get_twitter()
+        stale = data_scheduler.is_stale(cached['fetched_at'])
+        if stale:
+            try:
+                data_scheduler.refresh_twitter()
+            except PoolSaturated:
+                pass
+        etag = _etag("twitter", cached['version'], max_results)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return {
+            "result": cached['tweets'][:max_results],
+            "version": cached['version'],
+            "fetched_at": cached['fetched_at'],
+            "stale": stale
+        }
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         log_error(f"Twitter data fetch failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/city-pulse/feed")
+async def get_feed_changes(request: Request, response: Response, since: int = 0, limit: int = 100,
+                           source: str = None):
+    """
+    Delta sync of the merged Reddit/Twitter feed.
+
+    Returns items added after the ``since`` cursor (start with 0) and the
+    ``next`` cursor to send on the following call. Answers 304 when the
+    feed hasn't changed since the ETag the client holds. When ``reset`` is
+    true the cursor is no longer valid and ``items`` is the current feed.
+    """
+    limit = min(max(limit, 1), 1000)
+    etag = _etag("feed", data_scheduler.scraped_data['version'], since, limit, source or "all")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    changes = data_scheduler.get_changes(since=since, limit=limit, source=source)
+    response.headers["ETag"] = etag
+    return changes
+
+@app.get("/api/city-pulse/subreddits")
+async def get_subreddit_changes(request: Request, response: Response, since: int = 0):
+    """Cached subreddit entries whose content changed after the ``since`` version"""
+    version = data_scheduler.scraped_data['version']
+    etag = _etag("subreddits", version, since)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {
+        "version": version,
+        "since": since,
+        "entries": [
+            {k: entry[k] for k in ("subreddit", "data", "error", "version", "fetched_at")}
+            for entry in data_scheduler.get_subreddit_changes(since)
+        ]
+    }
+
+def _split(value: str):
+    return [v for v in (value or "").split(",") if v.strip()]
+
+@app.get("/api/events/stream")
+async def stream_events(request: Request, categories: str = None, areas: str = None, sources: str = None,
+                        buffer: int = 256):
+    """
+    Server-sent events stream of new posts, tweets and civic analyses.
+
+    Filter with comma-separated ``categories`` (e.g. FLOOD,ROAD_BLOCK),
+    ``areas`` (substring match) and ``sources`` (reddit, twitter, image, ...).
+    Events a slow client can't keep up with are dropped oldest-first and
+    reported in a ``dropped`` event.
+    """
+    hub = get_event_hub()
+    subscription = hub.subscribe(_split(categories), _split(areas), _split(sources), min(max(buffer, 1), 1024))
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.get(timeout=15)
+                if batch["dropped"]:
+                    yield f"event: dropped\ndata: {json.dumps({'count': batch['dropped']})}\n\n"
+                for event in batch["events"]:
+                    yield f"id: {event['seq']}\nevent: {event['kind']}\ndata: {json.dumps(event, default=str)}\n\n"
+                if not batch["events"] and not batch["dropped"]:
+                    # Heartbeat keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/api/events/ws")
+async def events_websocket(websocket: WebSocket, categories: str = None, areas: str = None,
+                           sources: str = None, buffer: int = 256):
+    """
+    WebSocket stream of new events; same filters as ``/api/events/stream``.
+    Each message is ``{"events": [...], "dropped": n}``.
+    """
+    await websocket.accept()
+    hub = get_event_hub()
+    subscription = hub.subscribe(_split(categories), _split(areas), _split(sources), min(max(buffer, 1), 1024))
+    try:
+        while True:
+            batch = await subscription.get(timeout=15)
+            await websocket.send_text(json.dumps(batch, default=str))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+
+@app.get("/api/events/near")
+async def events_near(lat: float, lon: float, radius: float = 2000, since: float = None, limit: int = 50,
+                      category: str = None):
+    """
+    Located civic events within ``radius`` metres of ``lat``/``lon``, nearest
+    first, each with its ``distance_m``. ``since`` is a Unix timestamp;
+    ``limit`` caps the result to the k nearest.
+    """
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="lat/lon out of range")
+    radius = min(max(radius, 1.0), 50000.0)
+    events = get_geo_index().near(lat, lon, radius_m=radius, since=since, limit=min(max(limit, 1), 500),
+                                  category=category)
+    return {"count": len(events), "radius_m": radius, "events": events}
+
+@app.get("/api/events/stats")
+async def event_stats(since: float = None, until: float = None, category: str = None, source: str = None,
+                      area: str = None, road: str = None, lat: float = None, lon: float = None, radius: float = 2000,
+                      group_by: str = "category,area", k: int = 10, bucket: int = None, limit: int = 0):
+    """
+    Ad-hoc filtering and grouping over the last week of events.
+
+    Filters: ``since``/``until`` (Unix seconds), comma-separated
+    ``category``, ``source``, ``area`` and ``road`` values, and
+    ``lat``/``lon``/``radius``. Returns the match count, the top ``k``
+    values for each ``group_by`` column, a time histogram when ``bucket``
+    (seconds) is given and the newest ``limit`` matching rows.
+    """
+    group_by = [column for column in _split(group_by) if column in ("category", "source", "area", "road")]
+    near = (lat, lon, radius) if lat is not None and lon is not None else None
+    table = get_event_table()
+    summary = await asyncio.to_thread(
+        table.summarize, group_by=group_by, k=min(max(k, 1), 100), limit=min(max(limit, 0), 500),
+        bucket_seconds=max(bucket, 60) if bucket else None, since=since, until=until, category=_split(category),
+        source=_split(source), area=_split(area), road=_split(road), near=near,
+    )
+    return {**summary, "rows_total": len(table)}
+
+@app.get("/api/aggregates")
+async def get_aggregates(category: str = None, area: str = None):
+    """
+    Report counts and hourly rates over the last 5 minutes, hour and 24 hours
+    for a category and/or area (omit either for all), e.g.
+    ``?category=FLOOD&area=koramangala``.
+    """
+    return get_aggregate_index().query(category=category, area=area)
+
+@app.get("/api/aggregates/breakdown")
+async def get_aggregate_breakdown(window: str = "1h", by: str = "area", category: str = None, area: str = None,
+                                  limit: int = 20):
+    """Busiest areas (optionally for one ``category``) or categories (optionally in one ``area``) in a window"""
+    if by not in ("area", "category"):
+        raise HTTPException(status_code=400, detail="by must be 'area' or 'category'")
+    try:
+        rows = get_aggregate_index().breakdown(window=window, by=by, category=category, area=area,
+                                               limit=min(max(limit, 1), 200))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"window": window, "by": by, "rows": rows}
+
+@app.get("/api/incidents")
+async def list_incidents(category: str = None, area: str = None, active_only: bool = True,
+                         limit: int = 50, samples: bool = False):
+    """
+    Incidents clustered from civic reports, posts and tweets, most recently
+    reported first. Filter by ``category`` (e.g. FLOOD) and ``area`` (substring
+    of the area/road names); ``samples`` includes recent reports per incident.
+    """
+    index = get_incident_index()
+    incidents = index.query(category=category, area=area, active_only=active_only,
+                            limit=min(max(limit, 1), 500), samples=samples)
+    return {"count": len(incidents), "incidents": incidents, "stats": index.stats()}
+
+@app.get("/api/incidents/{incident_id}")
+async def get_incident(incident_id: str):
+    """One incident with its recent reports and the ids of all its events"""
+    incident = get_incident_index().get(incident_id)
+    if incident is None:
+        raise HTTPException(status_code=404, detail=f"Unknown incident: {incident_id}")
+    return incident
+
+@app.get("/api/scheduler/status")
+async def scheduler_status():
+    """Get the data scraper scheduler status"""
+    return data_scheduler.get_status()
+
+def _require_admin(request: Request):
+    """Admin endpoints exist only when ADMIN_TOKEN is set and need it in the X-Admin-Token header"""
+    token = os.getenv("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/api/admin/profile")
+async def admin_profile(request: Request, seconds: float = 10.0, interval: float = 0.01, format: str = "speedscope",
+                       include_idle: bool = False):
+    """
+    Sample every thread (event loop, request executors, scheduler workers)
+    for ``seconds`` and return a flame graph: a speedscope JSON file, or
+    folded stacks with ``format=collapsed``. Idle cost is zero; while it
+    runs the sampler wakes every ``interval`` seconds.
+    """
+    _require_admin(request)
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'speedscope' or 'collapsed'")
+    try:
+        # Sampling runs on its own thread; this handler just waits off the event loop
+        result = await asyncio.to_thread(get_sampling_profiler().run, seconds, interval, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    stats = result.stats()
+    headers = {f"X-Profile-{key.replace('_', '-').title()}": str(value) for key, value in stats.items()}
+    stamp = datetime.fromtimestamp(result.started_at).strftime("%Y%m%d_%H%M%S")
+    if format == "collapsed":
+        headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.collapsed.txt"'
+        return PlainTextResponse(result.collapsed(), headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.speedscope.json"'
+    return JSONResponse(result.speedscope(), headers=headers)
+
 if __name__ == "__main__":
+    import uvicorn
     log_warning("Starting uvicorn server")
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,205 @@
+import os
+import time
+import asyncio
+from typing import Dict, List, Any, Iterable
+from urllib.parse import urlparse
+
+from reddit_client import RedditClient
+
+REDDIT_API_BASE_URL = "https://oauth.reddit.com"
+REDDIT_AUTH_URL = "https://www.reddit.com/api/v1/access_token"
+
+# Reddit caps a single listing page at 100 items
+MAX_PAGE_SIZE = 100
+
+class RedditFetchError(Exception):
+    """Raised when a listing cannot be fetched"""
+
+    def __init__(self, subreddit: str, status: int, message: str):
+        super().__init__(f"r/{subreddit}: HTTP {status} {message}")
+        self.subreddit = subreddit
+        self.status = status
+
+def normalize_post(child: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a listing child (``{"kind": "t3", "data": {...}}``) to the fields we use"""
+    data = child.get("data", child)
+    return {
+        "id": data.get("id"),
+        "name": data.get("name"),
+        "subreddit": data.get("subreddit"),
+        "title": data.get("title"),
+        "created_utc": data.get("created_utc"),
+        "permalink": data.get("permalink"),
+        "url": data.get("url"),
+        "score": data.get("score"),
+        "num_comments": data.get("num_comments"),
+    }
+
+class AsyncRedditFetcher:
+    """
+    asyncio-native fetcher for subreddit listings over Reddit's OAuth API.
+
+    A single ``aiohttp.ClientSession`` is reused for every request, with a
+    bounded connection pool and a per-host semaphore, so hundreds of
+    subreddits can be polled per cycle without a thread per request.
+    Listings are paginated with Reddit's ``after`` cursor.
+
+    ``base_url``/``auth_url`` default to ``REDDIT_API_BASE_URL`` and
+    ``REDDIT_AUTH_URL`` from the environment, so the fetcher can be pointed
+    at a local fake server.
+    """
+
+    def __init__(self, client_id: str = None, client_secret: str = None, user_agent: str = None,
+                 base_url: str = None, auth_url: str = None,
+                 max_connections: int = 100, per_host_limit: int = 8, timeout: float = 10.0):
+        creds = RedditClient.credentials() or {}
+        self.client_id = client_id or creds.get("client_id")
+        self.client_secret = client_secret or creds.get("client_secret")
+        self.user_agent = user_agent or creds.get("user_agent") or "city-pulse/1.0"
+        self.base_url = (base_url or os.getenv("REDDIT_API_BASE_URL", REDDIT_API_BASE_URL)).rstrip("/")
+        self.auth_url = auth_url or os.getenv("REDDIT_AUTH_URL", REDDIT_AUTH_URL)
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.rate_limit = {"remaining": None, "used": None, "reset": None}
+        self._session = None
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.per_host_limit,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": self.user_agent},
+            )
+            self._token_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def _get_token(self, force: bool = False) -> str:
+        """Application-only OAuth token (client credentials grant), cached until expiry"""
+        import aiohttp
+
+        if not self.client_id or not self.client_secret:
+            raise RuntimeError("Reddit API credentials not configured.")
+        async with self._token_lock:
+            if force or self._token is None or time.monotonic() >= self._token_expires:
+                session = await self._ensure_session()
+                async with session.post(
+                    self.auth_url,
+                    data={"grant_type": "client_credentials"},
+                    auth=aiohttp.BasicAuth(self.client_id, self.client_secret),
+                ) as resp:
+                    if resp.status != 200:
+                        raise RuntimeError(f"Reddit token request failed: HTTP {resp.status}")
+                    payload = await resp.json()
+                self._token = payload["access_token"]
+                # Refresh a minute early so in-flight requests don't race expiry
+                self._token_expires = time.monotonic() + max(int(payload.get("expires_in", 3600)) - 60, 60)
+        return self._token
+
+    def _record_rate_limit(self, headers):
+        for key in ("remaining", "used", "reset"):
+            value = headers.get(f"x-ratelimit-{key}")
+            if value is not None:
+                try:
+                    self.rate_limit[key] = float(value)
+                except ValueError:
+                    pass
+
+    async def _get_page(self, subreddit: str, listing: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self._ensure_session()
+        url = f"{self.base_url}/r/{subreddit}/{listing}"
+        params = {**params, "raw_json": 1}
+        for attempt in range(2):
+            token = await self._get_token(force=attempt > 0)
+            async with self._semaphore(url):
+                async with session.get(
+                    url, params=params, allow_redirects=False,
+                    headers={"Authorization": f"bearer {token}"},
+                ) as resp:
+                    self._record_rate_limit(resp.headers)
+                    if resp.status == 401 and attempt == 0:
+                        continue
+                    if resp.status != 200:
+                        # Reddit answers unknown subreddits with a redirect to search
+                        raise RedditFetchError(subreddit, resp.status, resp.reason or "")
+                    return await resp.json()
+        raise RedditFetchError(subreddit, 401, "Unauthorized")
+
+    async def fetch_listing(self, subreddit: str, listing: str = "hot", limit: int = 25,
+                            after: str = None, before: str = None) -> Dict[str, Any]:
+        """
+        Fetch up to ``limit`` posts from one listing, following ``after`` cursors.
+
+        Returns ``{"subreddit", "posts", "after"}`` where ``after`` is the cursor
+        for the next page (None when the listing is exhausted).
+        """
+        posts: List[Dict[str, Any]] = []
+        cursor = after
+        while len(posts) < limit:
+            params = {"limit": min(MAX_PAGE_SIZE, limit - len(posts))}
+            if cursor:
+                params["after"] = cursor
+            if before:
+                params["before"] = before
+            page = await self._get_page(subreddit, listing, params)
+            data = page.get("data", {})
+            children = data.get("children", [])
+            posts.extend(normalize_post(child) for child in children)
+            cursor = data.get("after")
+            # ``before`` pages walk towards newer items and don't chain with ``after``
+            if not cursor or not children or before:
+                break
+        return {"subreddit": subreddit, "posts": posts[:limit], "after": cursor}
+
+    async def fetch_many(self, subreddits: Iterable[str], listing: str = "hot",
+                         limit: int = 25, before: Dict[str, str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch listings for many subreddits concurrently.
+
+        ``before`` optionally maps subreddits to a fullname so only items newer
+        than it are returned (incremental polling). Returns
+        ``{subreddit: result}``; failed subreddits map to
+        ``{"subreddit", "posts": [], "error"}`` instead of raising.
+        """
+        subreddits = list(subreddits)
+        before = before or {}
+        results = await asyncio.gather(
+            *(self.fetch_listing(sub, listing, limit, before=before.get(sub)) for sub in subreddits),
+            return_exceptions=True,
+        )
+        out = {}
+        for sub, result in zip(subreddits, results):
+            if isinstance(result, Exception):
+                out[sub] = {"subreddit": sub, "posts": [], "after": None, "error": str(result)}
+            else:
+                out[sub] = result
+        return out
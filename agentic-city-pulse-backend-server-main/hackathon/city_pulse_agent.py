@@ -1,14 +1,21 @@
+import json
+import time
+import asyncio
+import functools
 import random
 import os
-from typing import List, Dict           
-from google.adk.agents import Agent
+import threading
+from datetime import datetime
+from typing import List, Dict, Any
 
 from dotenv import load_dotenv
 load_dotenv('.env')
 
-import praw
-from praw.exceptions import PRAWException
-
+from reddit_client import reddit_client, SubredditUnavailable
+from fanout import FanOut, OK
+from relevance import prefilter_titles, prefilter_tweets
+from incidents import get_incident_index
+from aggregates import get_aggregate_index
 
 
 def get_reddit_citydev_news(subreddit: str, limit: int = 5) -> dict[str, list[str]]:
@@ -22,35 +29,33 @@ def get_reddit_citydev_news(subreddit: str, limit: int = 5) -> dict[str, list[st
 
     Returns:
         A dictionary with the subreddit name as key and a list of
-        post titles as value. Returns an error message if credentials are
-        missing, the subreddit is invalid, or an API error occurs.
+        post titles as value, each prefixed with its civic category
+        (e.g. "[FLOOD] ..."); posts unrelated to civic issues are left out.
+        Returns an error message if credentials are missing, the subreddit
+        is invalid, or an API error occurs.
     """
     print(f"--- Tool called: Fetching from r/{subreddit} via Reddit API ---")
-    client_id = os.getenv("REDDIT_CLIENT_ID")
-    client_secret = os.getenv("REDDIT_CLIENT_SECRET")
-    user_agent = os.getenv("REDDIT_USER_AGENT")
+    from praw.exceptions import PRAWException
 
-    if not all([client_id, client_secret, user_agent]):
+    if reddit_client.credentials() is None:
         print("--- Tool error: Reddit API credentials missing in .env file. ---")
         return {subreddit: ["Error: Reddit API credentials not configured."]}
 
     try:
-        reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent,
-        )
-        # Check if subreddit exists and is accessible
-        reddit.subreddits.search_by_name(subreddit, exact=True)
-        sub = reddit.subreddit(subreddit)
-        top_posts = list(sub.hot(limit=limit)) # Fetch hot posts
+        # Shared client; subreddit validity is learned from this request and cached
+        top_posts = reddit_client.fetch_hot(subreddit, limit=limit) # Fetch hot posts
         titles = [post.title for post in top_posts]
         if not titles:
              return {subreddit: [f"No recent hot posts found in r/{subreddit}."]}
-        return {subreddit: titles}
+        relevant = prefilter_titles(titles)
+        if not relevant:
+            return {subreddit: [f"None of the {len(titles)} recent hot posts in r/{subreddit} are about civic issues."]}
+        return {subreddit: relevant}
+    except SubredditUnavailable as e:
+        print(f"--- Tool error: {e} ---")
+        return {subreddit: [f"Error accessing r/{subreddit}. It might be private, banned, or non-existent. Details: {e}"]}
     except PRAWException as e:
         print(f"--- Tool error: Reddit API error for r/{subreddit}: {e} ---")
-        # More specific error handling could be added here (e.g., 404 for invalid sub)
         return {subreddit: [f"Error accessing r/{subreddit}. It might be private, banned, or non-existent. Details: {e}"]}
     except Exception as e: # Catch other potential errors
         print(f"--- Tool error: Unexpected error for r/{subreddit}: {e} ---")
@@ -130,56 +135,258 @@ sample_tweets = [
     ]
 
 def scrape_city_tweets(max_results_per_hashtag: int = 20) -> List[Dict]:
-    return sample_tweets
-
-adk_agent = Agent(
-    name="city_pulse_agent",
-    description="Agent to process city problem reports from Twitter and Reddit.",
-    model="gemini-1.5-flash-latest",
-    instruction=(
-        "You are the City Issues Scout Agent. Your task is to fetch and summarize city-specific problems like floods, traffic, weather disruptions, and emergencies using both **Twitter** and **Reddit** data sources.\n\n"
-
-        "🔍 **1. Identify Intent:**\n"
-        "- Determine whether the user is asking about urban issues such as flooding, weather, traffic, construction, emergencies, or city infrastructure.\n"
-        "- Based on intent, decide whether to call Twitter, Reddit, or both data sources.\n\n"
-
-        "🧭 **2. Extract Location Context:**\n"
-        "- Extract any mentioned cities or locations from the user query.\n"
-        "- For Twitter: Use predefined hashtags like #flood, #storm, #traffic.\n"
-        "- For Reddit: Identify relevant subreddits like 'r/<city>', 'r/weather', 'r/flood', or use 'CityData' if not specified.\n\n"
-
-        "🛠️ **3. MUST CALL TOOLS:**\n"
-        "- Use `scrape_city_tweets` to fetch tweets based on hashtags.\n"
-        "- Use `get_reddit_citydev_news` to fetch Reddit posts from relevant subreddits.\n"
-        "- Do NOT fabricate summaries. Always use actual data from the tools.\n\n"
-
-        "🧠 **4. Synthesize Output:**\n"
-        "- Use the exact data returned by the tools.\n"
-        "- Include tweet content (Twitter) and post title + link (Reddit).\n\n"
-
-        "📝 **5. Format Response:**\n"
-        "- Group findings by platform and then by hashtag or subreddit/city.\n"
-        "- Present results as concise, bulleted lists.\n"
-        "- If no relevant results are found, mention that clearly."
-    ),
-    tools=[scrape_city_tweets, get_reddit_citydev_news]
-)
+    """
+    Fetches recent city-issue tweets. Each tweet is tagged with its civic
+    ``category``; tweets unrelated to civic issues are left out.
+    """
+    return prefilter_tweets(sample_tweets)
+
+def get_active_incidents(category: str = "", area: str = "", limit: int = 10) -> List[Dict]:
+    """
+    Lists current city incidents: reports, posts and tweets about the same
+    situation merged into one entry each.
+
+    Args:
+        category: Optional civic category, e.g. 'FLOOD', 'TRAFFIC_CONGESTION', 'ROAD_BLOCK'.
+        area: Optional area or road name to match.
+        limit: The maximum number of incidents to return.
+
+    Returns:
+        A list of incidents, most recently reported first, each with its
+        category, areas and roads, report count, sources, and first/last
+        report times (Unix seconds).
+    """
+    print(f"--- Tool called: Listing active incidents (category={category or 'any'}, area={area or 'any'}) ---")
+    return get_incident_index().query(category=category or None, area=area or None, limit=limit)
+
+def get_report_counts(category: str = "", area: str = "") -> Dict:
+    """
+    Counts recent civic reports (analyses, posts and tweets) for a category
+    and/or area.
+
+    Args:
+        category: Optional civic category, e.g. 'FLOOD', 'WATER_LOGGING', 'ELECTRICITY_ISSUE'.
+        area: Optional area name, e.g. 'Koramangala'.
+
+    Returns:
+        Report counts and hourly rates for the last 5 minutes ('5m'), hour
+        ('1h') and 24 hours ('24h').
+    """
+    print(f"--- Tool called: Counting reports (category={category or 'any'}, area={area or 'any'}) ---")
+    return get_aggregate_index().query(category=category or None, area=area or None)
+
+def _offload(func):
+    """
+    Wrap a blocking tool so the ADK runner awaits it in a worker thread
+    instead of running it on the event loop. Name, docstring and signature
+    are preserved so the function declaration seen by the model is unchanged.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+APP_NAME = "city_pulse"
+
+def build_adk_agent():
+    """Build the city pulse ADK agent (imports google.adk on first call)"""
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="city_pulse_agent",
+        description="Agent to process city problem reports from Twitter and Reddit.",
+        model="gemini-1.5-flash-latest",
+        instruction=(
+            "You are the City Issues Scout Agent. Your task is to fetch and summarize city-specific problems like floods, traffic, weather disruptions, and emergencies using both **Twitter** and **Reddit** data sources.\n\n"
+
+            "🔍 **1. Identify Intent:**\n"
+            "- Determine whether the user is asking about urban issues such as flooding, weather, traffic, construction, emergencies, or city infrastructure.\n"
+            "- Based on intent, decide whether to call Twitter, Reddit, or both data sources.\n\n"
+
+            "🧭 **2. Extract Location Context:**\n"
+            "- Extract any mentioned cities or locations from the user query.\n"
+            "- For Twitter: Use predefined hashtags like #flood, #storm, #traffic.\n"
+            "- For Reddit: Identify relevant subreddits like 'r/<city>', 'r/weather', 'r/flood', or use 'CityData' if not specified.\n\n"
+
+            "🛠️ **3. MUST CALL TOOLS:**\n"
+            "- Use `scrape_city_tweets` to fetch tweets based on hashtags.\n"
+            "- Use `get_reddit_citydev_news` to fetch Reddit posts from relevant subreddits.\n"
+            "- Use `get_active_incidents` for an overview of what is happening now; each incident already merges many reports.\n"
+            "- Use `get_report_counts` for questions about how many reports there were in a recent period.\n"
+            "- Do NOT fabricate summaries. Always use actual data from the tools.\n\n"
+
+            "🧠 **4. Synthesize Output:**\n"
+            "- Use the exact data returned by the tools.\n"
+            "- Include tweet content (Twitter) and post title + link (Reddit).\n\n"
+
+            "📝 **5. Format Response:**\n"
+            "- Group findings by platform and then by hashtag or subreddit/city.\n"
+            "- Present results as concise, bulleted lists.\n"
+            "- If no relevant results are found, mention that clearly."
+        ),
+        tools=[_offload(scrape_city_tweets), _offload(get_reddit_citydev_news), _offload(get_active_incidents), _offload(get_report_counts)]
+    )
+
+def build_summary_agent():
+    """
+    Build the agent that summarizes Reddit and Twitter data fetched ahead of
+    it (imports google.adk on first call). It has no data-fetching tools, so
+    the model never fetches the same sources a second time.
+    """
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="city_pulse_summarizer",
+        description="Agent to summarize city problem reports already fetched from Twitter and Reddit.",
+        model="gemini-1.5-flash-latest",
+        instruction=(
+            "You are the City Issues Scout Agent. The user's question is followed by the Reddit posts and tweets already fetched for it, as JSON. "
+            "Summarize the city-specific problems they report, like floods, traffic, weather disruptions, and emergencies.\n\n"
+
+            "🧠 **1. Synthesize Output:**\n"
+            "- Use only the data provided in the message. Do NOT fabricate summaries.\n"
+            "- Include tweet content (Twitter) and post titles (Reddit).\n"
+            "- Use `get_active_incidents` for an overview of what is happening now; each incident already merges many reports.\n"
+            "- Use `get_report_counts` for questions about how many reports there were in a recent period.\n\n"
+
+            "📝 **2. Format Response:**\n"
+            "- Group findings by platform and then by hashtag or subreddit/city.\n"
+            "- Present results as concise, bulleted lists.\n"
+            "- If no relevant results are found, mention that clearly."
+        ),
+        tools=[_offload(get_active_incidents), _offload(get_report_counts)]
+    )
 
 # Create a wrapper class to maintain compatibility with existing API
 class CityPulseAgentWrapper:
     """
     Wrapper class to maintain compatibility with existing API while using ADK agent.
+
+    The agent is executed through a single long-lived ``Runner`` backed by a
+    shared session service, so model clients and tool declarations are built
+    once per process rather than once per request.
+
+    ``analyze_city_issues`` fetches Reddit and Twitter concurrently, then
+    hands what arrived to a summary agent without data tools, all under one
+    deadline (``CITY_PULSE_DEADLINE`` seconds). Each source is fetched once
+    per request, and the call returns whatever arrived in time.
     """
     
-    def __init__(self, agent):
+    def __init__(self, agent=None, session_service=None, user_id: str = "city_pulse_api",
+                 deadline: float = None):
         self.agent = agent
+        self.user_id = user_id
+        self.session_service = session_service
+        self.runner = None
+        self.summary_agent = None
+        self.summary_runner = None
+        self._runner_lock = threading.Lock()
+        self.subreddits = ['citydata', 'weather', 'emergency', 'traffic', 'flood']
+        self.fanout = FanOut(deadline=deadline or float(os.getenv("CITY_PULSE_DEADLINE", "12")))
+        self.fanout.register("reddit", self.fetch_reddit_live, timeout=6.0)
+        self.fanout.register("twitter", self._fetch_twitter, timeout=3.0)
+        self.fanout.register("summary", self._fetch_summary, timeout=self.fanout.deadline)
+    
+    def get_runner(self):
+        """Build the agent, session service and runner on first use"""
+        if self.runner is None:
+            with self._runner_lock:
+                if self.runner is None:
+                    from google.adk.runners import Runner
+                    from google.adk.sessions import InMemorySessionService
+                    if self.agent is None:
+                        self.agent = build_adk_agent()
+                    if self.session_service is None:
+                        self.session_service = InMemorySessionService()
+                    self.runner = Runner(
+                        app_name=APP_NAME,
+                        agent=self.agent,
+                        session_service=self.session_service,
+                    )
+        return self.runner
+    
+    def get_summary_runner(self):
+        """Build the summary agent and its runner on first use (shares the session service)"""
+        if self.summary_runner is None:
+            with self._runner_lock:
+                if self.summary_runner is None:
+                    from google.adk.runners import Runner
+                    from google.adk.sessions import InMemorySessionService
+                    if self.summary_agent is None:
+                        self.summary_agent = build_summary_agent()
+                    if self.session_service is None:
+                        self.session_service = InMemorySessionService()
+                    self.summary_runner = Runner(
+                        app_name=APP_NAME,
+                        agent=self.summary_agent,
+                        session_service=self.session_service,
+                    )
+        return self.summary_runner
+    
+    async def _run_agent(self, message: str, runner=None) -> Dict[str, Any]:
+        """
+        Run one turn of an agent (default: the data-fetching one) and collect
+        the tool results and the final model response from the event stream.
+        """
+        from google.genai import types as genai_types
+
+        runner = runner or self.get_runner()
+        session = await self.session_service.create_session(app_name=APP_NAME, user_id=self.user_id)
+        reddit_data = {}
+        twitter_data = []
+        summary_parts = []
+        try:
+            content = genai_types.Content(role="user", parts=[genai_types.Part(text=message)])
+            async for event in runner.run_async(
+                user_id=self.user_id,
+                session_id=session.id,
+                new_message=content,
+            ):
+                for function_response in event.get_function_responses():
+                    response = function_response.response or {}
+                    if function_response.name == "get_reddit_citydev_news":
+                        reddit_data.update({k: v for k, v in response.items() if k != "result"})
+                    elif function_response.name == "scrape_city_tweets":
+                        twitter_data.extend(response.get("result", []))
+                if event.is_final_response() and event.content and event.content.parts:
+                    summary_parts.extend(part.text for part in event.content.parts if part.text)
+        finally:
+            # Sessions are per-turn; drop them so the shared service stays bounded
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=self.user_id, session_id=session.id
+            )
+        return {
+            "reddit_data": reddit_data,
+            "twitter_data": twitter_data,
+            "summary": "\n".join(summary_parts).strip(),
+        }
+    
+    async def fetch_reddit_live(self, **context) -> Dict[str, List[str]]:
+        """Fan-out source: hot titles from every default subreddit, fetched concurrently (one PRAW client per thread)"""
+        results = await asyncio.gather(
+            *(asyncio.to_thread(get_reddit_citydev_news, sub) for sub in self.subreddits)
+        )
+        merged = {}
+        for result in results:
+            merged.update(result)
+        return merged
+    
+    async def _fetch_twitter(self, **context) -> List[Dict]:
+        return await asyncio.to_thread(scrape_city_tweets)
+    
+    async def _fetch_summary(self, query: str, data: Dict[str, Any], **context) -> Dict[str, Any]:
+        message = f"{query}\n\nData fetched for this question:\n{json.dumps(data, ensure_ascii=False, default=str)}"
+        return await self._run_agent(message, runner=self.get_summary_runner())
     
-    def analyze_city_issues(self, query: str, include_reddit: bool = True, include_twitter: bool = True) -> dict:
+    async def analyze_city_issues(self, query: str, include_reddit: bool = True, include_twitter: bool = True) -> dict:
         """
         Analyze city issues using the ADK agent.
+
+        Reddit and Twitter are fetched concurrently first, then their data
+        goes into the summary agent's prompt; both stages share one deadline.
+        ``sources`` reports each one's status and ``partial`` is True when
+        any of them failed or missed the deadline.
         """
-        from datetime import datetime
-        
         # Build the query based on include flags
         if not include_reddit and not include_twitter:
             return {
@@ -190,53 +397,36 @@ class CityPulseAgentWrapper:
                 "summary": "No data sources selected."
             }
         
-        try:
-            # Try to run the ADK agent
-            if hasattr(self.agent, 'run'):
-                result = self.agent.run(query)
-            elif hasattr(self.agent, 'invoke'):
-                result = self.agent.invoke(query)
-            elif hasattr(self.agent, 'call'):
-                result = self.agent.call(query)
-            else:
-                # Fallback: manually collect data
-                reddit_data = {}
-                twitter_data = []
-                
-                if include_reddit:
-                    reddit_data = get_reddit_citydev_news("citydata", 5)
-                
-                if include_twitter:
-                    twitter_data = scrape_city_tweets(20)
-                
-                result = f"Query: {query}\nReddit data: {reddit_data}\nTwitter data: {twitter_data}"
-            
-            # Format the result to match the expected structure
-            return {
-                "query": query,
-                "timestamp": datetime.now().isoformat(),
-                "reddit_data": {},  # ADK agent handles this internally
-                "twitter_data": [],  # ADK agent handles this internally
-                "summary": str(result)
-            }
-        except Exception as e:
-            # Fallback to manual data collection if ADK agent fails
-            reddit_data = {}
-            twitter_data = []
-            
-            if include_reddit:
-                reddit_data = get_reddit_citydev_news("citydata", 5)
-            
-            if include_twitter:
-                twitter_data = scrape_city_tweets(20)
-            
-            return {
-                "query": query,
-                "timestamp": datetime.now().isoformat(),
-                "reddit_data": reddit_data,
-                "twitter_data": twitter_data,
-                "summary": f"Analysis completed with fallback method. Error: {str(e)}"
-            }
+        started = time.monotonic()
+        names = [name for name, included in (("reddit", include_reddit), ("twitter", include_twitter)) if included]
+        results = await self.fanout.gather(names, query=query)
+        
+        reddit_data = (results["reddit"]["data"] or {}) if include_reddit else {}
+        twitter_data = (results["twitter"]["data"] or []) if include_twitter else []
+        data = {}
+        if include_reddit:
+            data["reddit"] = reddit_data
+        if include_twitter:
+            data["twitter"] = twitter_data
+        remaining = max(self.fanout.deadline - (time.monotonic() - started), 0.0)
+        results.update(await self.fanout.gather(["summary"], deadline=remaining, query=query, data=data))
+        
+        agent_result = results["summary"]["data"] or {}
+        summary = agent_result.get("summary")
+        if results["summary"]["status"] != OK:
+            summary = f"Summary unavailable ({results['summary']['status']}): {results['summary']['error']}"
+        return {
+            "query": query,
+            "timestamp": datetime.now().isoformat(),
+            "reddit_data": reddit_data,
+            "twitter_data": twitter_data,
+            "summary": summary,
+            "sources": {
+                name: {"status": r["status"], "error": r.get("error"), "elapsed_ms": r["elapsed_ms"]}
+                for name, r in results.items()
+            },
+            "partial": any(r["status"] != OK for r in results.values())
+        }
     
     def get_reddit_news(self, subreddit: str, limit: int = 5) -> dict:
         """
@@ -250,33 +440,18 @@ class CityPulseAgentWrapper:
         """
         return scrape_city_tweets(max_results)
     
-    def run(self, query: str):
+    async def run(self, query: str) -> str:
         """
-        Direct access to the ADK agent's run method.
+        Run the ADK agent on a free-form query and return its summary.
         """
-        try:
-            if hasattr(self.agent, 'run'):
-                return self.agent.run(query)
-            elif hasattr(self.agent, 'invoke'):
-                return self.agent.invoke(query)
-            elif hasattr(self.agent, 'call'):
-                return self.agent.call(query)
-            else:
-                # Fallback: manually collect data
-                reddit_data = get_reddit_citydev_news("citydata", 5)
-                twitter_data = scrape_city_tweets(20)
-                return f"Query: {query}\nReddit data: {reddit_data}\nTwitter data: {twitter_data}"
-        except Exception as e:
-            # Fallback to manual data collection if ADK agent fails
-            reddit_data = get_reddit_citydev_news("citydata", 5)
-            twitter_data = scrape_city_tweets(20)
-            return f"Query: {query}\nReddit data: {reddit_data}\nTwitter data: {twitter_data}\nError: {str(e)}"
-
-# Create the wrapper instance
-city_pulse_agent = CityPulseAgentWrapper(adk_agent)
+        result = await self._run_agent(query)
+        return result["summary"]
+
+# Create the wrapper instance; the ADK agent and runner are built on first use
+city_pulse_agent = CityPulseAgentWrapper()
 
 if __name__ == "__main__":
     # Test the agent
-    result = city_pulse_agent.run("flooding in downtown area")
+    result = asyncio.run(city_pulse_agent.run("flooding in downtown area"))
     print("Analysis Result:")
     print(result) 
\ No newline at end of file
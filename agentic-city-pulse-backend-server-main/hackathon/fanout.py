@@ -0,0 +1,135 @@
+import time
+import asyncio
+import threading
+from typing import Dict, Any, Callable, Awaitable, Iterable
+
+OK = "ok"
+TIMEOUT = "timeout"
+ERROR = "error"
+CIRCUIT_OPEN = "circuit_open"
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are refused for ``reset_timeout`` seconds; then one trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class FanOut:
+    """
+    Query several data sources concurrently under one overall deadline.
+
+    Each registered source is an async callable with its own timeout and
+    circuit breaker. ``gather`` returns as soon as every source has finished
+    or the deadline passes, with one result per source:
+    ``{"status", "data", "error", "elapsed_ms"}``. Sources that miss their
+    timeout or the deadline are cancelled and reported as ``"timeout"``, so
+    the caller always gets whatever arrived in time.
+    """
+
+    def __init__(self, deadline: float = 10.0):
+        self.deadline = deadline
+        self.sources: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, name: str, fetch: Callable[..., Awaitable[Any]], timeout: float = 5.0,
+                 breaker: CircuitBreaker = None):
+        """Add or replace a source; ``fetch`` receives the kwargs passed to ``gather``"""
+        self.sources[name] = {
+            "fetch": fetch,
+            "timeout": timeout,
+            "breaker": breaker or CircuitBreaker(),
+        }
+
+    async def _call(self, name: str, source: Dict[str, Any], timeout: float, kwargs) -> Dict[str, Any]:
+        started = time.perf_counter()
+        breaker = source["breaker"]
+        try:
+            data = await asyncio.wait_for(source["fetch"](**kwargs), timeout)
+            breaker.record_success()
+            status, error = OK, None
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            data, status, error = None, TIMEOUT, f"{name} did not answer within {timeout:.1f}s"
+        except asyncio.CancelledError:
+            # Cancelled by the overall deadline
+            breaker.record_failure()
+            raise
+        except Exception as e:
+            breaker.record_failure()
+            data, status, error = None, ERROR, str(e)
+        return {"status": status, "data": data, "error": error,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    async def gather(self, names: Iterable[str] = None, deadline: float = None, **kwargs) -> Dict[str, Dict[str, Any]]:
+        """Run the named sources (default: all) concurrently and collect what arrives in time"""
+        deadline = self.deadline if deadline is None else deadline
+        names = list(self.sources) if names is None else list(names)
+        results: Dict[str, Dict[str, Any]] = {}
+        tasks = {}
+        for name in names:
+            source = self.sources[name]
+            if not source["breaker"].allow():
+                results[name] = {"status": CIRCUIT_OPEN, "data": None, "elapsed_ms": 0.0,
+                                 "error": f"{name} is failing; skipped until its circuit resets"}
+                continue
+            timeout = min(source["timeout"], deadline)
+            tasks[name] = asyncio.ensure_future(self._call(name, source, timeout, kwargs))
+
+        if tasks:
+            done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        for name, task in tasks.items():
+            if task.cancelled():
+                results[name] = {"status": TIMEOUT, "data": None, "elapsed_ms": round(deadline * 1000, 1),
+                                 "error": f"{name} missed the {deadline:.1f}s deadline"}
+            else:
+                results[name] = task.result()
+        return results
+
+    def status(self) -> Dict[str, str]:
+        """Circuit state per source"""
+        return {name: source["breaker"].state for name, source in self.sources.items()}
@@ -0,0 +1,139 @@
+import time
+import random
+import threading
+from typing import Dict, List, Any, Iterable
+
+class AdaptivePollPolicy:
+    """
+    Per-source polling intervals that follow each source's new-item rate.
+
+    After every poll the source's interval is recomputed: active sources are
+    polled often enough to pick up about ``target_new`` items per poll, quiet
+    or failing sources back off by ``backoff`` per poll, and everything is
+    clamped to ``[min_interval, max_interval]``. When rate-limit headroom is
+    reported, intervals are raised so the polled sources together stay within
+    the remaining budget (minus ``reserve``). Due times get +/-``jitter`` so
+    sources don't synchronize.
+    """
+
+    def __init__(self, min_interval: float = 30, max_interval: float = 900, base_interval: float = 120,
+                 target_new: float = 5, backoff: float = 1.5, smoothing: float = 0.5,
+                 jitter: float = 0.1, reserve: float = 0.2, seed: int = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = base_interval
+        self.target_new = target_new
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.jitter = jitter
+        self.reserve = reserve
+        self.random = random.Random(seed)
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _state(self, source: str) -> Dict[str, Any]:
+        state = self._sources.get(source)
+        if state is None:
+            state = {
+                'interval': self.base_interval,
+                'rate': 0.0,                 # smoothed new items per second
+                'last_polled': None,
+                'next_due': 0.0,             # never polled: due immediately
+                'last_new': 0,
+                'quiet_polls': 0,
+                'reason': 'initial poll',
+            }
+            self._sources[source] = state
+        return state
+
+    def due(self, sources: Iterable[str], now: float = None) -> List[str]:
+        """Sources whose next poll time has passed (unknown sources are due)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [s for s in sources if self._state(s)['next_due'] <= now]
+
+    def record(self, source: str, new_count: int, error: bool = False,
+               budget_floor: float = None, now: float = None) -> float:
+        """
+        Update a source after a poll and schedule its next one.
+
+        ``budget_floor`` is the smallest interval the rate limit allows for this
+        source (see ``budget_floor``). Returns the new interval in seconds.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._state(source)
+            elapsed = now - state['last_polled'] if state['last_polled'] is not None else None
+            if elapsed:
+                observed = new_count / elapsed
+                state['rate'] = self.smoothing * observed + (1 - self.smoothing) * state['rate']
+
+            if error:
+                state['quiet_polls'] += 1
+                interval = state['interval'] * self.backoff
+                reason = 'poll failed, backing off'
+            elif new_count == 0:
+                state['quiet_polls'] += 1
+                interval = state['interval'] * self.backoff
+                reason = f"quiet for {state['quiet_polls']} polls, backing off"
+            else:
+                state['quiet_polls'] = 0
+                if state['rate'] > 0:
+                    interval = self.target_new / state['rate']
+                    reason = f"active: ~{state['rate'] * 60:.1f} new items/min"
+                else:
+                    interval = self.base_interval
+                    reason = f"{new_count} new items on first poll"
+
+            interval = self._clamp(interval)
+            if interval <= self.min_interval and not error and new_count:
+                reason += ', at minimum interval'
+            elif interval >= self.max_interval and (error or not new_count):
+                reason += ', at maximum interval'
+            if budget_floor is not None and budget_floor > interval:
+                interval = min(budget_floor, self.max_interval)
+                reason = f"rate limit: slowed to {interval:.0f}s to stay within budget ({reason})"
+
+            state['interval'] = interval
+            state['reason'] = reason
+            state['last_polled'] = now
+            state['last_new'] = new_count
+            state['next_due'] = now + interval * (1 + self.random.uniform(-self.jitter, self.jitter))
+            return interval
+
+    def budget_floor(self, rate_limit: Dict[str, Any], sources: int) -> float:
+        """
+        Smallest per-source interval that keeps ``sources`` sources within the
+        remaining rate limit, from ``{"remaining", "reset"}`` (reset in seconds).
+        None when the limit is unknown.
+        """
+        remaining, reset = rate_limit.get('remaining'), rate_limit.get('reset')
+        if remaining is None or not reset or sources <= 0:
+            return None
+        usable = remaining * (1 - self.reserve)
+        if usable < 1:
+            # Budget exhausted: wait for the window to reset
+            return reset
+        return reset * sources / usable
+
+    def forget(self, source: str):
+        with self._lock:
+            self._sources.pop(source, None)
+
+    def status(self, now: float = None) -> Dict[str, Dict[str, Any]]:
+        """Current interval, reason and next poll for every source"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return {
+                source: {
+                    'interval': round(state['interval'], 1),
+                    'next_poll_in': round(max(state['next_due'] - now, 0.0), 1),
+                    'new_per_min': round(state['rate'] * 60, 2),
+                    'last_new': state['last_new'],
+                    'reason': state['reason'],
+                }
+                for source, state in self._sources.items()
+            }
@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+class SubredditUnavailable(Exception):
+    """Raised when a subreddit is known to be missing, private or banned"""
+
+    def __init__(self, subreddit: str, reason: str):
+        super().__init__(f"r/{subreddit} is unavailable ({reason})")
+        self.subreddit = subreddit
+        self.reason = reason
+
+class RedditClient:
+    """
+    Process-wide pool of PRAW clients shared by the API endpoints and the
+    scheduler.
+
+    PRAW is not thread-safe, so a request checks out one ``praw.Reddit``
+    for its duration and hands it back afterwards. Each client has its own
+    HTTP session and OAuth token, so at most ``pool_size`` clients (and
+    tokens) are created, lazily and only as concurrency demands; up to
+    ``pool_size`` requests run concurrently and any more wait for a client
+    to come back. No lock is held during a request.
+
+    Subreddit validity is learned from the listing request itself: a
+    404/403/redirect is remembered for ``invalid_ttl`` seconds so banned or
+    missing subreddits cost no requests until the entry expires.
+    """
+
+    def __init__(self, invalid_ttl: float = 900, pool_size: int = None):
+        self.invalid_ttl = invalid_ttl
+        self.pool_size = max(1, pool_size or int(os.getenv("REDDIT_CLIENT_POOL", "4")))
+        self._idle: List = []
+        self._created = 0
+        self._pool = threading.Condition()
+        self._lock = threading.Lock()
+        # subreddit (lower-case) -> (reason, expires_at)
+        self._invalid: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def credentials() -> Optional[Dict[str, str]]:
+        """Reddit API credentials from the environment, or None if incomplete"""
+        creds = {
+            "client_id": os.getenv("REDDIT_CLIENT_ID"),
+            "client_secret": os.getenv("REDDIT_CLIENT_SECRET"),
+            "user_agent": os.getenv("REDDIT_USER_AGENT"),
+        }
+        return creds if all(creds.values()) else None
+
+    def _new_reddit(self):
+        import praw
+        import requests
+
+        creds = self.credentials()
+        if creds is None:
+            raise RuntimeError("Reddit API credentials not configured.")
+        # Same overrides as the async fetcher, so both can be pointed at a fake server
+        urls = {}
+        if os.getenv("REDDIT_API_BASE_URL"):
+            urls["oauth_url"] = os.getenv("REDDIT_API_BASE_URL").rstrip("/")
+        if os.getenv("REDDIT_AUTH_URL"):
+            urls["reddit_url"] = os.getenv("REDDIT_AUTH_URL").split("/api/v1/")[0]
+        return praw.Reddit(
+            **creds,
+            **urls,
+            check_for_async=False,
+            requestor_kwargs={"session": requests.Session()},
+        )
+
+    @contextmanager
+    def _checkout(self):
+        """Borrow an idle client, creating one if the pool isn't full, else wait for one"""
+        with self._pool:
+            while not self._idle and self._created >= self.pool_size:
+                self._pool.wait()
+            reddit = self._idle.pop() if self._idle else None
+            if reddit is None:
+                self._created += 1
+        if reddit is None:
+            try:
+                reddit = self._new_reddit()
+            except Exception:
+                with self._pool:
+                    self._created -= 1
+                    self._pool.notify()
+                raise
+        try:
+            yield reddit
+        finally:
+            with self._pool:
+                self._idle.append(reddit)
+                self._pool.notify()
+
+    def _cached_invalid(self, subreddit: str) -> Optional[str]:
+        # Caller holds self._lock
+        entry = self._invalid.get(subreddit.lower())
+        if entry is None:
+            return None
+        reason, expires_at = entry
+        if expires_at < time.monotonic():
+            self._invalid.pop(subreddit.lower(), None)
+            return None
+        return reason
+
+    def _remember_invalid(self, subreddit: str, reason: str):
+        with self._lock:
+            self._invalid[subreddit.lower()] = (reason, time.monotonic() + self.invalid_ttl)
+
+    def fetch_hot(self, subreddit: str, limit: int = 5) -> List:
+        """
+        Fetch hot submissions from a subreddit with a single listing request.
+
+        Raises SubredditUnavailable for subreddits that are (or were recently
+        seen to be) missing, private or banned.
+        """
+        from prawcore.exceptions import NotFound, Forbidden, Redirect
+
+        with self._lock:
+            reason = self._cached_invalid(subreddit)
+        if reason is not None:
+            raise SubredditUnavailable(subreddit, reason)
+        try:
+            with self._checkout() as reddit:
+                return list(reddit.subreddit(subreddit).hot(limit=limit))
+        except (NotFound, Redirect):
+            self._remember_invalid(subreddit, "not found")
+            raise SubredditUnavailable(subreddit, "not found")
+        except Forbidden:
+            self._remember_invalid(subreddit, "private or banned")
+            raise SubredditUnavailable(subreddit, "private or banned")
+
+    def is_known_invalid(self, subreddit: str) -> bool:
+        with self._lock:
+            return self._cached_invalid(subreddit) is not None
+
+    def clear_cache(self):
+        with self._lock:
+            self._invalid.clear()
+
+# Global client instance
+reddit_client = RedditClient()
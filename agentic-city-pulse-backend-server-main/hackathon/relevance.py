@@ -0,0 +1,164 @@
+import os
+import re
+import json
+import zlib
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from agent_garden import CIVIC_CATEGORIES
+
+IRRELEVANT = "IRRELEVANT"
+LABELS = CIVIC_CATEGORIES + [IRRELEVANT]
+
+TRAINING_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "relevance_train.jsonl")
+
+# Unambiguous keywords and hashtags (matched as whole words); a hit decides the category outright
+KEYWORD_RULES = {
+    "ELECTRICITY_ISSUE": ["power outage", "power cut", "powercut", "poweroutage", "blackout", "no electricity",
+                          "no power", "transformer blast", "transformer exploded", "load shedding",
+                          "electricity cut", "live wire", "#bescom"],
+    "TREE_IN_BETWEEN": ["fallen tree", "tree fell", "tree fallen", "tree uprooted", "uprooted", "treefall",
+                        "tree collapsed", "#treefall"],
+    "WATER_LOGGING": ["waterlogging", "waterlogged", "water logging", "water logged", "knee-deep water",
+                      "knee deep water", "ankle-deep water"],
+    "DRAINAGE_ISSUE": ["drainage", "clogged drain", "blocked drain", "overflowing drain", "drain overflowing",
+                       "sewage", "manhole", "open drain", "sewer", "stormwater drain"],
+    "FLOOD": ["flood", "floods", "flooding", "flooded", "flash flood", "inundated", "submerged", "#flood"],
+    "ROAD_BLOCK": ["road closed", "road closure", "roadblock", "road block", "road blocked", "blocked road",
+                   "barricaded", "closed for repair", "closed to traffic"],
+    "TRAFFIC_CONGESTION": ["traffic jam", "gridlock", "bumper to bumper", "traffic congestion", "heavy traffic",
+                           "traffic snarl", "standstill traffic", "trafficjam", "#traffic"],
+}
+
+_TOKEN = re.compile(r"#?[a-z0-9']+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+class RelevanceFilter:
+    """
+    Fast local relevance and category prefilter for social posts.
+
+    Keyword/hashtag rules decide clear cases; everything else goes through a
+    multi-class linear model (averaged perceptron) over hashed word unigrams
+    and bigrams, with ``IRRELEVANT`` as one of the classes. Scoring a
+    typical title costs tens of microseconds, so it runs inline before
+    anything is sent to the model.
+    """
+
+    def __init__(self, dim: int = 1 << 18):
+        self.dim = dim
+        self.weights: Dict[str, Dict[int, float]] = {label: {} for label in LABELS}
+        self.bias: Dict[str, float] = {label: 0.0 for label in LABELS}
+        self.trained = False
+        self._rule_categories = {phrase: category for category, phrases in KEYWORD_RULES.items() for phrase in phrases}
+        alternatives = "|".join(re.escape(p) for p in sorted(self._rule_categories, key=len, reverse=True))
+        self._rules = re.compile(rf"(?<![a-z0-9])({alternatives})(?![a-z0-9])")
+
+    def features(self, text: str) -> List[int]:
+        tokens = tokenize(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        mask = self.dim - 1
+        return [zlib.crc32(gram.encode()) & mask for gram in grams]
+
+    def rule_category(self, text: str) -> Optional[str]:
+        """Category of the first keyword or hashtag found in ``text``"""
+        match = self._rules.search((text or "").lower())
+        return self._rule_categories[match.group(1)] if match else None
+
+    def _scores(self, features: List[int]) -> Dict[str, float]:
+        scores = {}
+        for label in LABELS:
+            weights = self.weights[label]
+            scores[label] = self.bias[label] + sum(weights.get(f, 0.0) for f in features)
+        return scores
+
+    def classify(self, text: str) -> Tuple[Optional[str], str]:
+        """Returns ``(category, reason)``; category is None for irrelevant text"""
+        category = self.rule_category(text)
+        if category is not None:
+            return category, "rule"
+        if not self.trained:
+            return None, "no rule match"
+        scores = self._scores(self.features(text))
+        label = max(scores, key=scores.get)
+        return (None if label == IRRELEVANT else label), "model"
+
+    def train(self, examples: Iterable[Tuple[str, str]], epochs: int = 8):
+        """Fit the averaged perceptron on ``(text, label)`` pairs"""
+        examples = [(self.features(text), label) for text, label in examples]
+        # Averaging trick: w_avg = w - u / steps, where u accumulates step-weighted updates
+        updates = {label: {} for label in LABELS}
+        bias_updates = {label: 0.0 for label in LABELS}
+        step = 1
+        for _ in range(epochs):
+            for features, label in examples:
+                scores = self._scores(features)
+                predicted = max(scores, key=scores.get)
+                if predicted != label:
+                    for target, sign in ((label, 1.0), (predicted, -1.0)):
+                        weights, update = self.weights[target], updates[target]
+                        for f in features:
+                            weights[f] = weights.get(f, 0.0) + sign
+                            update[f] = update.get(f, 0.0) + sign * step
+                        self.bias[target] += sign
+                        bias_updates[target] += sign * step
+                step += 1
+        for label in LABELS:
+            update = updates[label]
+            averaged = {f: w - update.get(f, 0.0) / step for f, w in self.weights[label].items()}
+            self.weights[label] = {f: w for f, w in averaged.items() if w}
+            self.bias[label] -= bias_updates[label] / step
+        self.trained = True
+        return self
+
+    def filter(self, items: Iterable[Any], text=lambda item: item) -> List[Tuple[Any, str]]:
+        """Keep relevant items as ``(item, category)``; ``text`` extracts the text to score"""
+        kept = []
+        for item in items:
+            category, _ = self.classify(text(item))
+            if category is not None:
+                kept.append((item, category))
+        return kept
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """Read ``{"text", "label"}`` lines from a .jsonl file"""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                examples.append((record["text"], record["label"]))
+    return examples
+
+_filter: Optional[RelevanceFilter] = None
+_filter_lock = threading.Lock()
+
+def get_relevance_filter() -> RelevanceFilter:
+    """Process-wide filter, trained from the bundled examples on first use"""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                relevance_filter = RelevanceFilter()
+                if os.path.exists(TRAINING_DATA):
+                    relevance_filter.train(load_examples(TRAINING_DATA))
+                _filter = relevance_filter
+    return _filter
+
+def prefilter_enabled() -> bool:
+    return os.getenv("RELEVANCE_PREFILTER", "true").lower() == "true"
+
+def prefilter_titles(titles: List[str]) -> List[str]:
+    """Drop non-civic titles and prefix the rest with their category, e.g. ``[FLOOD] ...``"""
+    if not prefilter_enabled():
+        return list(titles)
+    return [f"[{category}] {title}" for title, category in get_relevance_filter().filter(titles)]
+
+def prefilter_tweets(tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop non-civic tweets and tag the rest with a ``category``"""
+    if not prefilter_enabled():
+        return list(tweets)
+    kept = get_relevance_filter().filter(tweets, text=lambda tweet: tweet.get("content", ""))
+    return [dict(tweet, category=category) for tweet, category in kept]
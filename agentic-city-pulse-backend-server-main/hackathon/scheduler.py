@@ -1,12 +1,25 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.executors.pool import BasePoolExecutor
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from worker_pool import BoundedWorkerPool
 from city_pulse_agent import city_pulse_agent
+from async_reddit import AsyncRedditFetcher
+from feed import SeenIdCache, MergedFeed
+from polling import AdaptivePollPolicy
+from relevance import get_relevance_filter
+from event_store import get_event_store
+from event_hub import get_event_hub
+from incidents import get_incident_index
+from aggregates import get_aggregate_index
+from event_table import get_event_table
 
 # Configure logging
 logging.basicConfig(
@@ -30,38 +43,124 @@ def log_warning(message):
     print(f"--- Tool called: {message} ---")
     logger.warning(message)
 
+class SharedPoolExecutor(BasePoolExecutor):
+    """APScheduler executor that runs jobs on an existing worker pool"""
+
+    def __init__(self, pool):
+        super().__init__(pool)
+
 class DataScraperScheduler:
     """
-    Scheduler to run Reddit and Twitter scrapers every 2 minutes in parallel
+    Scheduler to run Reddit and Twitter scrapers in parallel. Each source
+    (every subreddit, and Twitter) is polled on its own adaptive interval.
     """
     
-    def __init__(self):
-        self.scheduler = BackgroundScheduler()
-        self.executor = ThreadPoolExecutor(max_workers=4)
-        self.scraped_data = {
-            'reddit': [],
-            'twitter': [],
-            'last_update': None
-        }
+    def __init__(self, store=None, hub=None, incidents=None, aggregates=None, table=None):
+        # One long-lived, bounded pool runs scheduled jobs and on-demand refreshes
+        self.executor = BoundedWorkerPool(max_workers=4, max_pending=8)
+        # Read-only snapshot, replaced as a whole by writers; see _publish()
+        self._snapshot: Mapping[str, Any] = MappingProxyType({
+            'reddit': (),
+            'twitter': (),
+            'last_update': None,
+            'version': 0,
+            'twitter_version': 0,
+            'twitter_fetched_at': 0.0
+        })
         self.is_running = False
+        # Relevant subreddits for city issues
+        self.subreddits = ['citydata', 'weather', 'emergency', 'traffic', 'flood']
+        # Reddit listings are fetched with asyncio on a dedicated event loop thread
+        self.reddit_fetcher = AsyncRedditFetcher()
+        # Incremental fetching: per-source high-water marks plus a bounded seen-ID set
+        self.reddit_limit = 25            # max new posts fetched per subreddit per cycle
+        self.reddit_window = 10           # recent posts kept per subreddit in scraped_data
+        self.resync_interval = 3600       # seconds between full re-fetches in case a cursor post was deleted
+        self.cursors: Dict[str, Dict[str, Any]] = {}
+        self.seen_ids = SeenIdCache(maxsize=50000)
+        self.feed = MergedFeed(maxlen=5000)
+        self.last_cycle_new = {'reddit': 0, 'twitter': 0}
+        self._recent_posts: Dict[str, List[Dict[str, Any]]] = {}
+        self._resynced_at: Dict[str, float] = {}
+        # Adaptive polling: jobs tick every poll_tick seconds and poll only the sources that are due
+        self.poll_tick = 15
+        self.polling = AdaptivePollPolicy(min_interval=30, max_interval=900, base_interval=120)
+        self.scheduler = BackgroundScheduler(
+            executors={'default': SharedPoolExecutor(self.executor)},
+            # A run that is still going when the next one is due is skipped, not stacked
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': self.poll_tick}
+        )
+        self.scheduler.add_listener(self._on_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+        self.skipped_runs: Dict[str, int] = {}
+        # Versioned read cache: endpoints serve from here and revalidate stale entries
+        self.version = 0
+        self.stale_after = 180            # seconds before an entry triggers a background refresh
+        self.invalid_ttl = 900            # seconds to remember subreddits that failed on first fetch
+        self._reddit_entries: Dict[str, Dict[str, Any]] = {}
+        self._invalid_subreddits: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Append-only history of everything scraped; opened on start() unless injected
+        self.store = store
+        # New items are pushed to connected clients through the event hub
+        self.hub = hub or get_event_hub()
+        # ...and indexed for incidents, rolling counts and columnar queries (see _index_items)
+        self.incidents = incidents or get_incident_index()
+        self.aggregates = aggregates or get_aggregate_index()
+        self.table = table if table is not None else get_event_table()
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
         
+    def _start_loop(self):
+        """Start the event loop thread that runs the async fetchers"""
+        with self._loop_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=loop.run_forever, name='scraper-loop', daemon=True)
+            self._loop_thread.start()
+            self._loop = loop
+    
+    def _stop_loop(self):
+        """Close the async fetchers and stop the event loop thread"""
+        if self._loop is not None:
+            try:
+                self._run_async(self.reddit_fetcher.close(), timeout=10)
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop_thread.join(timeout=10)
+                self._loop = None
+                self._loop_thread = None
+    
+    def _run_async(self, coro, timeout: float = 60):
+        """Run a coroutine on the fetcher loop from a scheduler thread"""
+        self._start_loop()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+    
     def start(self):
         """Start the scheduler"""
         if not self.is_running:
             try:
-                # Schedule Reddit scraper to run every 2 minutes
+                if self.store is None:
+                    self.store = get_event_store()
+                self._warm_start()
+                self._start_loop()
+                
+                # Poll due subreddits; each one's interval adapts to its activity
                 self.scheduler.add_job(
-                    func=self._run_reddit_scraper,
-                    trigger=IntervalTrigger(minutes=2),
+                    func=self._poll_reddit,
+                    trigger=IntervalTrigger(seconds=self.poll_tick),
                     id='reddit_scraper',
                     name='Reddit Scraper',
                     replace_existing=True
                 )
                 
-                # Schedule Twitter scraper to run every 2 minutes
+                # Poll Twitter when its adaptive interval has elapsed
                 self.scheduler.add_job(
-                    func=self._run_twitter_scraper,
-                    trigger=IntervalTrigger(minutes=2),
+                    func=self._poll_twitter,
+                    trigger=IntervalTrigger(seconds=self.poll_tick),
                     id='twitter_scraper',
                     name='Twitter Scraper',
                     replace_existing=True
@@ -86,87 +185,258 @@ class DataScraperScheduler:
             try:
                 self.scheduler.shutdown(wait=True)
                 self.executor.shutdown(wait=True)
+                self._stop_loop()
+                if self.store is not None:
+                    self.store.flush()
                 self.is_running = False
                 log_info("Data scraper scheduler stopped successfully")
             except Exception as e:
                 log_error(f"Failed to stop scheduler: {str(e)}")
     
+    def _on_job_skipped(self, event):
+        self.skipped_runs[event.job_id] = self.skipped_runs.get(event.job_id, 0) + 1
+    
+    @property
+    def scraped_data(self) -> Mapping[str, Any]:
+        return self._snapshot
+    
+    def _publish(self, bump: bool = True, **changes):
+        """
+        Swap in a new read-only snapshot with ``changes`` applied. Callers hold
+        ``self._lock``; readers never lock and never see a half-updated snapshot.
+        The version only moves when content changed (``bump``), so it doubles
+        as the delta-sync cursor and ETag.
+        """
+        if bump:
+            self.version += 1
+        snapshot = dict(self._snapshot, **changes)
+        snapshot['version'] = self.version
+        snapshot['last_update'] = datetime.now().isoformat()
+        self._snapshot = MappingProxyType(snapshot)
+    
+    def _warm_start(self):
+        """Restore feed, cursors and latest snapshot from the event store after a restart"""
+        try:
+            events = self.store.query(kinds=['reddit_post', 'tweet'], limit=self.feed.maxlen, newest_first=True)
+        except Exception as e:
+            log_error(f"Warm start from event store failed: {str(e)}")
+            return
+        if not events:
+            return
+        items = [event['payload'] for event in events]
+        self.feed.extend(items)
+        tweets = []
+        for item in reversed(items):
+            # Oldest first, so the last write per source is the newest item
+            self.seen_ids.add(item['id'])
+            if item['source'] == 'reddit':
+                subreddit = item.get('subreddit')
+                self.cursors[f"reddit:{subreddit}"] = {'before': item['name'], 'created_utc': item['created_utc']}
+                self._recent_posts[subreddit] = ([item] + self._recent_posts.get(subreddit, []))[:self.reddit_window]
+            elif item['source'] == 'twitter':
+                self.cursors['twitter'] = {'created_utc': item['created_utc']}
+                tweets.insert(0, item['tweet'])
+        with self._lock:
+            for subreddit, posts in self._recent_posts.items():
+                # fetched_at=0 marks restored entries stale, so the first read revalidates them
+                self._reddit_entries[subreddit.lower()] = self._reddit_entry(subreddit, posts, fetched_at=0.0)
+            self._publish(reddit=tuple(self._reddit_entries.values()), twitter=tuple(tweets[:200]),
+                          twitter_version=self.version + 1)
+            # Restored items aren't in the change log; older cursors must resync
+            self.feed.log_floor = self.version
+        log_info(f"Warm start restored {len(items)} items from the event store")
+    
     def _run_initial_scraping(self):
         """Run initial scraping when scheduler starts"""
         print("--- Tool called: Running initial data scraping... ---")
-        # Run both scrapers in parallel using ThreadPoolExecutor
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            future_reddit = executor.submit(self._run_reddit_scraper)
-            future_twitter = executor.submit(self._run_twitter_scraper)
-            
-            # Wait for both to complete
-            future_reddit.result()
-            future_twitter.result()
+        # Run both scrapers in parallel on the shared worker pool
+        future_reddit = self.executor.submit(self._run_reddit_scraper)
+        future_twitter = self.executor.submit(self._run_twitter_scraper)
+        
+        # Wait for both to complete
+        future_reddit.result()
+        future_twitter.result()
+    
+    def _poll_reddit(self):
+        """Scrape the subreddits whose polling interval has elapsed"""
+        due = self.polling.due([f"reddit:{sub}" for sub in self.subreddits])
+        if due:
+            self._run_reddit_scraper([source.split(':', 1)[1] for source in due])
+    
+    def _poll_twitter(self):
+        """Scrape Twitter if its polling interval has elapsed"""
+        if self.polling.due(['twitter']):
+            self._run_twitter_scraper()
     
-    def _run_reddit_scraper(self):
-        """Run Reddit scraper in parallel"""
+    def _run_reddit_scraper(self, subreddits: List[str] = None):
+        """Run Reddit scraper; fetches only posts newer than each subreddit's cursor"""
         try:
             print("--- Tool called: Starting Reddit scraper... ---")
             
-            # Define relevant subreddits for city issues
-            subreddits = ['citydata', 'weather', 'emergency', 'traffic', 'flood']
-            
-            # Run scraping for each subreddit in parallel using ThreadPoolExecutor
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                future_to_subreddit = {
-                    executor.submit(self._scrape_reddit_subreddit, subreddit): subreddit 
-                    for subreddit in subreddits
-                }
-                
-                reddit_data = []
-                for future in concurrent.futures.as_completed(future_to_subreddit):
-                    subreddit = future_to_subreddit[future]
-                    try:
-                        result = future.result()
-                        reddit_data.append({
-                            'subreddit': subreddit,
-                            'data': result,
-                            'timestamp': datetime.now().isoformat()
-                        })
-                    except Exception as e:
-                        print(f"--- Tool error: Error scraping r/{subreddit}: {str(e)} ---")
-            
-            # Update scraped data
-            self.scraped_data['reddit'] = reddit_data
-            self.scraped_data['last_update'] = datetime.now().isoformat()
+            subreddits = list(subreddits or self.subreddits)
+            now = time.time()
+            resync = [sub for sub in subreddits if now - self._resynced_at.get(sub, 0.0) >= self.resync_interval]
+            for sub in resync:
+                self._resynced_at[sub] = now
+            results = self._run_async(self._fetch_reddit(subreddits, resync=resync))
+            new_count = self._apply_reddit_results(results)
+            self.last_cycle_new['reddit'] = new_count
             
-            print(f"--- Tool called: Reddit scraper completed. Scraped {len(reddit_data)} subreddits ---")
+            print(f"--- Tool called: Reddit scraper completed. Scraped {len(results)} subreddits, {new_count} new posts ---")
             
         except Exception as e:
             print(f"--- Tool error: Reddit scraper failed: {str(e)} ---")
+            for sub in subreddits or []:
+                self.polling.record(f"reddit:{sub}", 0, error=True)
+    
+    async def _fetch_reddit(self, subreddits: List[str], resync: List[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """Fetch posts newer than each subreddit's cursor (all recent posts for ``resync`` ones)"""
+        before = {
+            sub: self.cursors[f"reddit:{sub}"]['before']
+            for sub in subreddits if f"reddit:{sub}" in self.cursors and sub not in resync
+        }
+        return await self.reddit_fetcher.fetch_many(
+            subreddits, listing='new', limit=self.reddit_limit, before=before
+        )
+    
+    def _apply_reddit_results(self, results: Dict[str, Dict[str, Any]]) -> int:
+        """Merge fetched listings into cursors, feed, store and the read cache"""
+        new_items = []
+        changed = False
+        budget_floor = self.polling.budget_floor(self.reddit_fetcher.rate_limit, len(self.subreddits))
+        with self._lock:
+            for subreddit, result in results.items():
+                if 'error' in result:
+                    print(f"--- Tool error: Error scraping r/{subreddit}: {result['error']} ---")
+                posts = result['posts']
+                if posts:
+                    # Listings are newest first; the newest post is the next cursor
+                    self.cursors[f"reddit:{subreddit}"] = {
+                        'before': posts[0]['name'],
+                        'created_utc': posts[0]['created_utc'],
+                    }
+                fresh = [self._reddit_feed_item(post) for post in posts
+                         if self.seen_ids.add(f"reddit:{post['name']}")]
+                new_items.extend(fresh)
+                self.polling.record(f"reddit:{subreddit}", len(fresh), error='error' in result,
+                                    budget_floor=budget_floor)
+                recent = (fresh + self._recent_posts.get(subreddit, []))[:self.reddit_window]
+                self._recent_posts[subreddit] = recent
+                old = self._reddit_entries.get(subreddit.lower())
+                if old is not None and not fresh and old['error'] == result.get('error'):
+                    # Unchanged: keep its version so delta sync and ETags don't see a change
+                    self._reddit_entries[subreddit.lower()] = dict(old, fetched_at=time.time(), new_count=0)
+                else:
+                    self._reddit_entries[subreddit.lower()] = self._reddit_entry(
+                        subreddit, recent, error=result.get('error'), new_count=len(fresh)
+                    )
+                    changed = True
+            
+            self.feed.extend(new_items, version=self.version + 1)
+            if self.store is not None:
+                self.store.append_many('reddit_post', new_items)
+            self.hub.publish('reddit_post', new_items)
+            self._index_items(new_items)
+            
+            # Publish the updated snapshot
+            self._publish(bump=changed, reddit=tuple(self._reddit_entries.values()))
+        return len(new_items)
+    
+    def _reddit_entry(self, subreddit: str, recent: List[Dict[str, Any]], error: str = None,
+                      new_count: int = 0, fetched_at: float = None) -> Dict[str, Any]:
+        if error and not recent:
+            data = {subreddit: [f"Error: {error}"]}
+        elif not recent:
+            data = {subreddit: [f"No recent posts found in r/{subreddit}."]}
+        else:
+            data = {subreddit: [post['title'] for post in recent]}
+        return {
+            'subreddit': subreddit,
+            'data': data,
+            'posts': recent,
+            'new_count': new_count,
+            'error': error,
+            'version': self.version + 1,
+            'fetched_at': time.time() if fetched_at is None else fetched_at,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def _run_twitter_scraper(self):
-        """Run Twitter scraper in parallel"""
+        """Run Twitter scraper; only tweets newer than the cursor are added"""
         try:
             print("--- Tool called: Starting Twitter scraper... ---")
             
             # Run Twitter scraping
             twitter_data = self._scrape_twitter_data()
             
-            # Update scraped data
-            self.scraped_data['twitter'] = twitter_data
-            self.scraped_data['last_update'] = datetime.now().isoformat()
+            with self._lock:
+                cursor = self.cursors.get('twitter', {}).get('created_utc', 0.0)
+                fresh = []
+                for tweet in twitter_data:
+                    item = self._twitter_feed_item(tweet)
+                    if item['created_utc'] > cursor and self.seen_ids.add(item['id']):
+                        fresh.append(item)
+                if fresh:
+                    self.cursors['twitter'] = {'created_utc': max(item['created_utc'] for item in fresh)}
+                self.feed.extend(fresh, version=self.version + 1)
+                self.last_cycle_new['twitter'] = len(fresh)
+                self.polling.record('twitter', len(fresh), error=not twitter_data)
+                if self.store is not None:
+                    self.store.append_many('tweet', fresh)
+                self.hub.publish('tweet', fresh)
+                self._index_items(fresh)
+                
+                # Publish the updated snapshot
+                fresh_tweets = tuple(item['tweet'] for item in sorted(fresh, key=lambda i: i['created_utc'], reverse=True))
+                if fresh:
+                    self._publish(twitter=(fresh_tweets + self._snapshot['twitter'])[:200],
+                                  twitter_version=self.version + 1, twitter_fetched_at=time.time())
+                else:
+                    self._publish(bump=False, twitter_fetched_at=time.time())
             
-            print(f"--- Tool called: Twitter scraper completed. Scraped {len(twitter_data)} tweets ---")
+            print(f"--- Tool called: Twitter scraper completed. Scraped {len(twitter_data)} tweets, {len(fresh)} new ---")
             
         except Exception as e:
             print(f"--- Tool error: Twitter scraper failed: {str(e)} ---")
+            self.polling.record('twitter', 0, error=True)
+    
+    def _index_items(self, items: List[Dict[str, Any]]):
+        """Feed new items to the in-memory indexes"""
+        if not items:
+            return
+        self.incidents.ingest(items)
+        self.aggregates.ingest(items)
+        self.table.extend(items)
+    
+    @staticmethod
+    def _reddit_feed_item(post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'id': f"reddit:{post['name']}",
+            'source': 'reddit',
+            'name': post['name'],
+            'subreddit': post.get('subreddit'),
+            'title': post.get('title'),
+            'url': post.get('url'),
+            'permalink': post.get('permalink'),
+            'category': get_relevance_filter().classify(post.get('title'))[0],
+            'created_utc': post.get('created_utc') or 0.0,
+        }
     
-    def _scrape_reddit_subreddit(self, subreddit: str) -> Dict[str, Any]:
-        """Scrape data from a specific subreddit"""
+    @staticmethod
+    def _twitter_feed_item(tweet: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            result = city_pulse_agent.get_reddit_news(subreddit, limit=5)
-            return result
-        except Exception as e:
-            print(f"--- Tool error: Error scraping subreddit {subreddit}: {str(e)} ---")
-            return {subreddit: [f"Error: {str(e)}"]}
+            created = datetime.fromisoformat(tweet['date']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            created = 0.0
+        return {
+            'id': f"twitter:{tweet.get('id')}",
+            'source': 'twitter',
+            'title': tweet.get('content'),
+            'hashtag': tweet.get('hashtag'),
+            'category': tweet.get('category') or get_relevance_filter().classify(tweet.get('content'))[0],
+            'created_utc': created,
+            'tweet': tweet,
+        }
     
     def _scrape_twitter_data(self) -> List[Dict[str, Any]]:
         """Scrape Twitter data"""
@@ -177,18 +447,129 @@ class DataScraperScheduler:
             print(f"--- Tool error: Error scraping Twitter data: {str(e)} ---")
             return []
     
-    def get_scraped_data(self) -> Dict[str, Any]:
-        """Get the latest scraped data"""
-        return self.scraped_data.copy()
+    def get_scraped_data(self) -> Mapping[str, Any]:
+        """Get the latest scraped data as a read-only snapshot (no copy needed)"""
+        return self._snapshot
+    
+    def get_subreddit(self, subreddit: str) -> Dict[str, Any]:
+        """Cached entry for a subreddit, or None if it has never been fetched"""
+        return self._reddit_entries.get(subreddit.lower())
+    
+    def get_twitter(self) -> Dict[str, Any]:
+        """Cached tweets with their fetch time and the version they last changed at"""
+        snapshot = self._snapshot
+        return {'tweets': snapshot['twitter'], 'fetched_at': snapshot['twitter_fetched_at'],
+                'version': snapshot['twitter_version']}
+    
+    def is_stale(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at > self.stale_after
+    
+    def is_known_invalid(self, subreddit: str) -> bool:
+        """True if the subreddit failed its first fetch within ``invalid_ttl``"""
+        expires = self._invalid_subreddits.get(subreddit.lower())
+        return expires is not None and expires > time.time()
+    
+    def _single_flight(self, key: str, func, *args):
+        """Submit ``func`` to the worker pool unless a refresh for ``key`` is already running"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.executor.submit(func, *args)
+                self._inflight[key] = future
+                future.add_done_callback(lambda f: self._clear_inflight(key, f))
+            return future
+    
+    def _clear_inflight(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+    
+    def refresh_subreddit(self, subreddit: str, add_to_poll: bool = False):
+        """
+        Refresh one subreddit in the background (at most one refresh in flight
+        per subreddit). Returns a Future resolving to its cache entry; raises
+        PoolSaturated if the worker pool is full.
+        """
+        return self._single_flight(f"reddit:{subreddit.lower()}", self._refresh_subreddit, subreddit, add_to_poll)
+    
+    def _refresh_subreddit(self, subreddit: str, add_to_poll: bool) -> Dict[str, Any]:
+        results = self._run_async(self._fetch_reddit([subreddit]))
+        result = results[subreddit]
+        known = subreddit.lower() in self._reddit_entries
+        if 'error' in result and not known:
+            # Don't cache or poll subreddits that fail on first sight
+            self._invalid_subreddits[subreddit.lower()] = time.time() + self.invalid_ttl
+            return self._reddit_entry(subreddit, [], error=result['error'])
+        self._apply_reddit_results(results)
+        if add_to_poll:
+            with self._lock:
+                if subreddit.lower() not in {s.lower() for s in self.subreddits}:
+                    self.subreddits.append(subreddit)
+                    log_info(f"Added r/{subreddit} to the poll set")
+        return self.get_subreddit(subreddit)
+    
+    def fetch_recent(self, subreddit: str, limit: int):
+        """
+        Live fetch of the newest ``limit`` posts of a subreddit on the fetcher
+        loop, for reads beyond the cached ``reddit_window``. Returns a Future
+        resolving to the fetcher's result; the cache is left untouched.
+        """
+        self._start_loop()
+        return asyncio.run_coroutine_threadsafe(
+            self.reddit_fetcher.fetch_many([subreddit], listing='new', limit=limit), self._loop
+        )
+    
+    def refresh_twitter(self):
+        """Refresh tweets in the background (single flight); returns a Future"""
+        return self._single_flight('twitter', self._run_twitter_scraper)
+    
+    def get_feed(self, since: float = None, limit: int = 100, source: str = None) -> List[Dict[str, Any]]:
+        """Merged, deduplicated feed of all sources, newest first"""
+        return self.feed.items(since=since, limit=limit, source=source)
+    
+    def get_changes(self, since: int = 0, limit: int = 100, source: str = None) -> Dict[str, Any]:
+        """
+        Feed items added after version ``since`` (oldest first) for delta sync.
+
+        ``next`` is the cursor for the following call. ``reset`` is True when
+        ``since`` is older than the retained change log or newer than the
+        current version (e.g. after a restart); the client should then drop
+        its copy and use ``items`` from ``get_feed`` instead.
+        """
+        # Read the version first: items published meanwhile may be returned
+        # twice (clients dedupe by id) but are never skipped
+        version = self._snapshot['version']
+        if since > version or since < self.feed.log_floor:
+            return {'version': version, 'since': since, 'reset': True,
+                    'items': self.get_feed(limit=limit, source=source), 'next': version}
+        items, last_version = self.feed.changes(since, limit=limit, source=source)
+        return {'version': version, 'since': since, 'reset': False, 'items': items,
+                'next': last_version if last_version is not None else version}
+    
+    def get_subreddit_changes(self, since: int = 0) -> List[Dict[str, Any]]:
+        """Cache entries of subreddits whose content changed after version ``since``"""
+        return [entry for entry in self._snapshot['reddit'] if entry['version'] > since]
     
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status"""
+        snapshot = self._snapshot
         return {
             'is_running': self.is_running,
             'jobs': [job.id for job in self.scheduler.get_jobs()],
-            'last_update': self.scraped_data['last_update'],
-            'reddit_count': len(self.scraped_data['reddit']),
-            'twitter_count': len(self.scraped_data['twitter'])
+            'last_update': snapshot['last_update'],
+            'reddit_count': len(snapshot['reddit']),
+            'twitter_count': len(snapshot['twitter']),
+            'version': snapshot['version'],
+            'subreddits': list(self.subreddits),
+            'feed_size': len(self.feed),
+            'last_cycle_new': dict(self.last_cycle_new),
+            'cursors': dict(self.cursors),
+            'polling': self.polling.status(),
+            'workers': self.executor.stats(),
+            'skipped_runs': dict(self.skipped_runs),
+            'incidents': self.incidents.stats(),
+            'aggregates': self.aggregates.stats(),
+            'event_table': self.table.stats()
         }
 
 # Global scheduler instance
@@ -210,12 +591,16 @@ def get_scheduler_status():
     """Get status from the global scheduler"""
     return data_scheduler.get_status()
 
+def get_scheduler_feed(since: float = None, limit: int = 100, source: str = None):
+    """Get the merged feed from the global scheduler"""
+    return data_scheduler.get_feed(since=since, limit=limit, source=source)
+
 if __name__ == "__main__":
     # Run the scheduler continuously
     try:
         start_scheduler()
         print("Data scraper scheduler started successfully")
-        print("Running every 2 minutes in background...")
+        print("Polling sources on adaptive intervals in background...")
         
         # Keep the script running
         try:
@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class PoolSaturated(RuntimeError):
+    """Raised when a task is submitted to a full BoundedWorkerPool"""
+
+class BoundedWorkerPool(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor with a cap on running plus queued tasks.
+
+    ``submit`` waits up to ``submit_timeout`` seconds for a free slot and
+    then raises ``PoolSaturated``, so callers get backpressure instead of an
+    ever-growing queue.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 8, submit_timeout: float = 0.0,
+                 thread_name_prefix: str = 'scraper-worker'):
+        super().__init__(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.capacity = max_workers + max_pending
+        self.submit_timeout = submit_timeout
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._count_lock = threading.Lock()
+        self._in_use = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        if self.submit_timeout > 0:
+            acquired = self._slots.acquire(timeout=self.submit_timeout)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._count_lock:
+                self.rejected += 1
+            raise PoolSaturated(f"Worker pool is full ({self.capacity} tasks running or queued)")
+        with self._count_lock:
+            self._in_use += 1
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda f: self._release())
+        return future
+
+    def _release(self):
+        with self._count_lock:
+            self._in_use -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._count_lock:
+            return {'capacity': self.capacity, 'in_use': self._in_use, 'rejected': self.rejected}